@@ -0,0 +1,27 @@
+"""Run every benchmark module, or those named on the command line.
+
+python -m benchmarks [module ...]
+"""
+
+from __future__ import annotations
+
+import importlib
+import pkgutil
+import sys
+
+import benchmarks
+
+
+def main(names: list[str]) -> None:
+    modules = names or sorted(
+        info.name for info in pkgutil.iter_modules(benchmarks.__path__) if not info.name.startswith("_")
+    )
+    for name in modules:
+        module = importlib.import_module(f"benchmarks.{name}")
+        print(f"== {name} ==")
+        module.main()
+        print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
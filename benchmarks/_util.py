@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+import timeit
+import typing
+
+
+def measure(fn: typing.Callable[[], typing.Any], number: int = 1000, repeat: int = 5) -> float:
+    """Return the best per-call time in microseconds."""
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def report(label: str, usec: float, **extra: typing.Any) -> None:
+    suffix = "".join(f"  {k}={v}" for k, v in extra.items())
+    print(f"{label:<48} {usec:>12.2f} us{suffix}")
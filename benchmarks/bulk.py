@@ -0,0 +1,63 @@
+"""Memory and throughput of bulk results at the 100k item scale.
+
+Compares collecting HttpExceptions and rendering a list of dicts with
+BulkResult's compact storage and streamed encoding.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+
+from benchmarks._util import report
+from web_error import error
+from web_error.bulk import BulkResult
+
+
+class InvalidItemError(error.BadRequestException):
+    title = "Invalid item."
+
+
+def exceptions(count: int) -> bytes:
+    failures = []
+    for i in range(count):
+        if i % 10:
+            failures.append((i, None))
+        else:
+            failures.append((i, InvalidItemError(f"item {i} is invalid")))
+
+    results = [{"index": i, "status": 200} if exc is None else {"index": i, **exc.marshal()} for i, exc in failures]
+    return json.dumps({"results": results}).encode()
+
+
+def bulk_result(count: int) -> bytes:
+    result = BulkResult()
+    for i in range(count):
+        if i % 10:
+            result.succeed(i)
+        else:
+            result.fail(i, InvalidItemError, details=f"item {i} is invalid")
+
+    return b"".join(result.iter_encode())
+
+
+def main() -> None:
+    for count in (10000, 100000):
+        for label, fn in (("exceptions+dicts", exceptions), ("BulkResult", bulk_result)):
+            tracemalloc.start()
+            start = time.perf_counter()
+            body = fn(count)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            report(
+                f"{label} items={count}",
+                elapsed * 1e6,
+                peak_kib=peak // 1024,
+                bytes=len(body),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Handler throughput scaling per thread count.
+
+Runs a mixed error workload (handled, starlette, unhandled exceptions, with
+and without CORS origins) through a single handler from N threads. On GIL
+builds throughput is expected to stay flat, on free-threaded builds it should
+scale with the thread count.
+"""
+
+from __future__ import annotations
+
+import http
+import logging
+import sys
+import sysconfig
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from starlette.exceptions import HTTPException
+
+from benchmarks._util import report
+from web_error import cache, error
+from web_error.cors import CorsConfiguration
+from web_error.handler import starlette
+
+ITERATIONS = 20000
+
+
+class NotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+def workload() -> list:
+    origins = [None, "localhost", "https://denied.example"]
+    exceptions = [
+        NotFoundError("missing"),
+        HTTPException(http.HTTPStatus.NOT_FOUND, "Item not found"),
+        HTTPException(http.HTTPStatus.UNAUTHORIZED, "no", headers={"WWW-Authenticate": "Basic"}),
+        Exception("Something went bad"),
+    ]
+    return [(mock.Mock(headers={"origin": origin} if origin else {}), exc) for origin in origins for exc in exceptions]
+
+
+def main() -> None:
+    logger = logging.getLogger("benchmarks.concurrency")
+    logger.disabled = True
+    cors = CorsConfiguration(
+        allow_origins=["localhost"],
+        allow_methods=["*"],
+        allow_headers=["*"],
+        allow_credentials=True,
+    )
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"free-threaded build: {bool(sysconfig.get_config_var('Py_GIL_DISABLED'))}, gil enabled: {gil}")
+
+    for label, render_cache in (("no cache", None), ("render cache", cache.RenderCache())):
+        eh = starlette.generate_handler(logger=logger, cors=cors, render_cache=render_cache)
+        cases = workload()
+        baseline = None
+        for threads in (1, 2, 4, 8):
+            per_thread = ITERATIONS // threads
+
+            def work(offset: int, per_thread: int = per_thread, eh=eh, cases=cases) -> None:
+                for n in range(per_thread):
+                    eh(*cases[(n + offset) % len(cases)])
+
+            with ThreadPoolExecutor(threads) as pool:
+                start = time.perf_counter()
+                list(pool.map(work, range(threads)))
+                elapsed = time.perf_counter() - start
+
+            throughput = per_thread * threads / elapsed
+            baseline = baseline or throughput
+            report(
+                f"{label} threads={threads}",
+                elapsed / (per_thread * threads) * 1e6,
+                errors_per_s=int(throughput),
+                scaling=f"{throughput / baseline:.2f}x",
+            )
+
+
+if __name__ == "__main__":
+    main()
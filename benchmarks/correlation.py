@@ -0,0 +1,57 @@
+"""Overhead of request correlation on the error path."""
+
+from __future__ import annotations
+
+import logging
+import uuid
+
+from starlette.requests import Request
+
+from benchmarks._util import measure, report
+from web_error import cache, error
+from web_error.correlation import CorrelationConfiguration, generate_request_id
+from web_error.handler import starlette
+
+TRACEPARENT = b"00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+
+class ItemNotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+def request(headers: list[tuple[bytes, bytes]]) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def main() -> None:
+    logger = logging.getLogger("benchmarks.correlation")
+    logger.disabled = True
+    exc = ItemNotFoundError("missing")
+
+    report("generate_request_id", measure(generate_request_id))
+    report("uuid4().hex", measure(lambda: uuid.uuid4().hex))
+
+    for label, render_cache in (("", None), (" (render cache)", cache.RenderCache())):
+        plain = starlette.generate_handler(logger=logger, render_cache=render_cache)
+        request_id = starlette.generate_handler(
+            logger=logger,
+            render_cache=render_cache,
+            correlation=CorrelationConfiguration(),
+        )
+        traceparent = starlette.generate_handler(
+            logger=logger,
+            render_cache=render_cache,
+            correlation=CorrelationConfiguration(header="traceparent"),
+        )
+
+        report(f"no correlation{label}", measure(lambda eh=plain: eh(request([]), exc)))
+        report(
+            f"x-request-id header{label}",
+            measure(lambda eh=request_id: eh(request([(b"x-request-id", b"abc")]), exc)),
+        )
+        report(f"generated id{label}", measure(lambda eh=request_id: eh(request([]), exc)))
+        report(f"traceparent{label}", measure(lambda eh=traceparent: eh(request([(b"traceparent", TRACEPARENT)]), exc)))
+
+
+if __name__ == "__main__":
+    main()
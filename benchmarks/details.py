@@ -0,0 +1,40 @@
+"""Cost of details for unhandled exceptions with an expensive __str__."""
+
+from __future__ import annotations
+
+import logging
+
+from starlette.requests import Request
+
+from benchmarks._util import measure, report
+from web_error.handler import starlette
+
+
+class QueryError(Exception):
+    """Renders the statement with a multi-megabyte bound parameter, like some DB drivers."""
+
+    def __str__(self) -> str:
+        return "statement failed, parameters: " + repr(["x" * (2 * 1024 * 1024)])
+
+
+def request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+
+def main() -> None:
+    logger = logging.getLogger("benchmarks.details")
+    logger.disabled = True
+    exc = QueryError()
+
+    for label, strip_debug, details_limit in (
+        ("unbounded", False, None),
+        ("bounded", False, starlette.DETAILS_LIMIT),
+        ("strip_debug", True, starlette.DETAILS_LIMIT),
+    ):
+        eh = starlette.generate_handler(logger=logger, strip_debug=strip_debug, details_limit=details_limit)
+        body = len(eh(request(), exc).body)
+        report(label, measure(lambda eh=eh: eh(request(), exc), number=20), body_kib=body // 1024)
+
+
+if __name__ == "__main__":
+    main()
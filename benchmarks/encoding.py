@@ -0,0 +1,68 @@
+"""Encoding non JSON native values, default hook vs a json round trip."""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import decimal
+import enum
+import json
+import uuid
+
+from benchmarks._util import measure, report
+from web_error.encoding import DefaultEncoder
+from web_error.negotiation import encode_json
+
+
+class Status(enum.Enum):
+    ACTIVE = "active"
+
+
+@dataclasses.dataclass
+class Item:
+    id: uuid.UUID
+    price: decimal.Decimal
+    status: Status
+
+
+def validation_errors(n: int) -> list[dict]:
+    return [
+        {
+            "type": "value_error",
+            "loc": ("body", "items", i, "at"),
+            "msg": "Value error, too late",
+            "input": datetime.date(2024, 1, 2),
+            "ctx": {"error": ValueError("too late")},
+        }
+        for i in range(n)
+    ]
+
+
+def round_trip(content: dict) -> bytes:
+    # Previous fastapi handler behaviour, normalise to json types before rendering.
+    return encode_json(json.loads(json.dumps(content, default=str)))
+
+
+def main() -> None:
+    for n in (1, 10, 100):
+        content = {"type": "request-validation-failed", "status": 422, "errors": validation_errors(n)}
+        report(f"validation errors x{n} round trip", measure(lambda c=content: round_trip(c)))
+        report(f"validation errors x{n} default hook", measure(lambda c=content: encode_json(c)))
+
+    extras = {
+        "type": "conflict",
+        "status": 409,
+        "at": datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc),
+        "items": [Item(uuid.UUID(int=i), decimal.Decimal("1.10"), Status.ACTIVE) for i in range(10)],
+    }
+    report("extras round trip (default=str)", measure(lambda: round_trip(extras)))
+    report("extras default hook", measure(lambda: encode_json(extras)))
+
+    cached = DefaultEncoder()
+    value = Item(uuid.UUID(int=1), decimal.Decimal("1.10"), Status.ACTIVE)
+    report("dispatch cached", measure(lambda: cached(value), number=100000))
+    report("dispatch resolved per call", measure(lambda: cached.resolve(type(value))(value), number=100000))
+
+
+if __name__ == "__main__":
+    main()
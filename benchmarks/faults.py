@@ -0,0 +1,70 @@
+"""Request throughput through an app under controlled, seeded error mixes."""
+
+from __future__ import annotations
+
+import asyncio
+import http
+import logging
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from benchmarks._util import report
+from web_error import error, faults
+from web_error.handler import starlette
+
+REQUESTS = 2000
+
+
+class ItemNotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+def endpoint(_request):
+    return PlainTextResponse("ok")
+
+
+def app(rate: float) -> Starlette:
+    logger = logging.getLogger("benchmarks.faults")
+    logger.disabled = True
+
+    app = Starlette(routes=[Route("/", endpoint)])
+    starlette.add_exception_handler(app, logger=logger)
+    faults.add_fault_injection(
+        app,
+        faults.FaultConfiguration(
+            faults=[
+                faults.http_code_fault(ItemNotFoundError, rate * 0.6),
+                faults.http_fault(http.HTTPStatus.CONFLICT, rate * 0.3),
+                faults.unhandled_fault(rate * 0.1),
+            ],
+            seed=1,
+        ),
+    )
+    return app
+
+
+async def drive(rate: float) -> tuple[float, int]:
+    # Unhandled faults are re-raised by ServerErrorMiddleware after the error response is sent.
+    transport = httpx.ASGITransport(app=app(rate), raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="https://test") as client:
+        start = time.perf_counter()
+        errors = 0
+        for _ in range(REQUESTS):
+            r = await client.get("/")
+            errors += r.status_code >= http.HTTPStatus.BAD_REQUEST
+        return time.perf_counter() - start, errors
+
+
+def main() -> None:
+    for rate in (0.0, 0.1, 0.5, 1.0):
+        elapsed, errors = asyncio.run(drive(rate))
+        throughput = int(REQUESTS / elapsed)
+        report(f"error rate {rate:.0%}", elapsed / REQUESTS * 1e6, errors=errors, requests_per_s=throughput)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Cost of per-request legacy/RFC9457 negotiation compared to a single format."""
+
+from __future__ import annotations
+
+import logging
+import warnings
+
+from starlette.requests import Request
+
+from benchmarks._util import measure, report
+from web_error import cache, error
+from web_error.handler import starlette
+from web_error.negotiation import FormatConfiguration
+
+
+class ItemNotFoundError(error.NotFoundException):
+    title = "Item not found."
+    code = "E404"
+
+
+def request(accept: bytes) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"accept", accept)]})
+
+
+def main() -> None:
+    logger = logging.getLogger("benchmarks.formats")
+    logger.disabled = True
+    exc = ItemNotFoundError("missing")
+
+    for label, render_cache in (("", None), (" (render cache)", cache.RenderCache())):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            legacy = starlette.generate_handler(logger=logger, legacy=True, render_cache=render_cache)
+        rfc = starlette.generate_handler(logger=logger, render_cache=render_cache)
+        negotiated = starlette.generate_handler(logger=logger, formats=FormatConfiguration(), render_cache=render_cache)
+
+        report(f"legacy only{label}", measure(lambda eh=legacy: eh(request(b"application/json"), exc)))
+        report(f"rfc9457 only{label}", measure(lambda eh=rfc: eh(request(b"application/problem+json"), exc)))
+        report(
+            f"negotiated legacy{label}",
+            measure(lambda eh=negotiated: eh(request(b"application/json"), exc)),
+        )
+        report(
+            f"negotiated rfc9457{label}",
+            measure(lambda eh=negotiated: eh(request(b"application/problem+json"), exc)),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Overhead of handler hooks with zero, one and five hooks per stage."""
+
+from __future__ import annotations
+
+import logging
+
+from starlette.requests import Request
+
+from benchmarks._util import measure, report
+from web_error import error
+from web_error.handler import starlette
+from web_error.hooks import Hooks
+
+
+class ItemNotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+def request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+
+def pre_convert(_request, exc):
+    return exc
+
+
+def post_render(_request, _exc, response):
+    return response
+
+
+def main() -> None:
+    logger = logging.getLogger("benchmarks.hooks")
+    logger.disabled = True
+    exc = ItemNotFoundError("missing")
+
+    baseline = starlette.generate_handler(logger=logger)
+    report("no hooks argument", measure(lambda: baseline(request(), exc)))
+
+    for n in (0, 1, 5):
+        for stage in ("pre_convert", "post_render", "both"):
+            hooks = Hooks(
+                pre_convert=[pre_convert] * n if stage in ("pre_convert", "both") else (),
+                post_render=[post_render] * n if stage in ("post_render", "both") else (),
+            )
+            eh = starlette.generate_handler(logger=logger, hooks=hooks)
+            report(f"{n} hooks {stage}", measure(lambda eh=eh: eh(request(), exc)))
+
+
+if __name__ == "__main__":
+    main()
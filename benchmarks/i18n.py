@@ -0,0 +1,49 @@
+"""Cost of a localized error compared to an unlocalized one."""
+
+from __future__ import annotations
+
+import logging
+
+from starlette.requests import Request
+
+from benchmarks._util import measure, report
+from web_error import error
+from web_error.handler import starlette
+from web_error.i18n import TitleCatalog
+
+
+class ItemNotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+def request(accept_language: str | None) -> Request:
+    headers = [(b"accept-language", accept_language.encode())] if accept_language else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def main() -> None:
+    logger = logging.getLogger("benchmarks.i18n")
+    logger.disabled = True
+    titles = TitleCatalog(
+        {
+            "de": {"Item not found.": "Artikel nicht gefunden."},
+            "fr": {"Item not found.": "Article introuvable."},
+        },
+    )
+    plain = starlette.generate_handler(logger=logger)
+    localized = starlette.generate_handler(logger=logger, titles=titles)
+    exc = ItemNotFoundError("missing")
+
+    report("unlocalized", measure(lambda: plain(request(None), exc)))
+    report("localized, no match", measure(lambda: localized(request("en-GB,en;q=0.9"), exc)))
+    report("localized, cached negotiation", measure(lambda: localized(request("de-DE,de;q=0.9,en;q=0.8"), exc)))
+
+    def uncached():
+        titles.negotiate.cache_clear()
+        return localized(request("de-DE,de;q=0.9,en;q=0.8"), exc)
+
+    report("localized, uncached negotiation", measure(uncached))
+
+
+if __name__ == "__main__":
+    main()
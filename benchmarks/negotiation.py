@@ -0,0 +1,47 @@
+"""Payload size and encode time of problem formats for large 422 responses."""
+
+from __future__ import annotations
+
+import json
+
+from benchmarks._util import measure, report
+from web_error import negotiation
+
+
+def validation_problem(count: int) -> dict:
+    return {
+        "type": "request-validation-failed",
+        "title": "Request validation error.",
+        "status": 422,
+        "errors": [
+            {
+                "type": "missing",
+                "loc": ["body", "items", i, "name"],
+                "msg": "Field required",
+                "input": {"id": i},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def main() -> None:
+    encoders = [
+        ("json", lambda c: json.dumps(c).encode()),
+        *[(encoder.media_type, encoder.encode) for encoder in negotiation.available_encoders()],
+    ]
+    for count in (10, 1000, 10000):
+        content = validation_problem(count)
+        number = max(1, 10000 // count)
+        for label, encode in encoders:
+            size = len(encode(content))
+            report(f"{label} errors={count}", measure(lambda e=encode, c=content: e(c), number=number), bytes=size)
+
+    negotiator = negotiation.ContentNegotiator(negotiation.available_encoders())
+    accept = "text/html, application/problem+json;q=0.5, application/problem+msgpack"
+    report("negotiate uncached", measure(lambda: negotiator._negotiate(accept)))  # noqa: SLF001
+    report("negotiate cached", measure(lambda: negotiator.negotiate(accept)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""OpenAPI generation time with problem details injected, for large apps."""
+
+from __future__ import annotations
+
+from fastapi import FastAPI
+
+from benchmarks._util import measure, report
+from web_error import error, openapi
+
+
+class ItemNotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+class InvalidItemError(error.BadRequestException):
+    title = "Invalid item."
+
+
+def build_app(routes: int) -> FastAPI:
+    app = FastAPI()
+    for i in range(routes):
+
+        def endpoint(item_id: int) -> dict:
+            return {"id": item_id}
+
+        app.get(f"/items{i}/{{item_id}}", name=f"item{i}")(endpoint)
+    return app
+
+
+def generate(app: FastAPI) -> None:
+    app.openapi_schema = None
+    app.openapi()
+
+
+def main() -> None:
+    for routes in (100, 1000, 3000):
+        for label, inject in (("plain", False), ("problem details", True)):
+            app = build_app(routes)
+            if inject:
+                openapi.add_openapi_problem_details(app, exceptions=[ItemNotFoundError, InvalidItemError])
+            report(f"{label} routes={routes}", measure(lambda app=app: generate(app), number=1, repeat=5))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Peak memory and time rendering large validation errors, buffered vs streamed."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import tracemalloc
+
+from fastapi.exceptions import RequestValidationError
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+from benchmarks._util import report
+from web_error.handler import fastapi
+
+
+def request() -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": []})
+
+
+def errors(n: int) -> list[dict]:
+    return [
+        {"type": "missing", "loc": ("body", "items", i, "name"), "msg": "Field required", "input": {"id": i}}
+        for i in range(n)
+    ]
+
+
+async def drain(response: StreamingResponse) -> int:
+    size = 0
+    async for chunk in response.body_iterator:
+        size += len(chunk)
+    return size
+
+
+def consume(eh, exc) -> int:
+    response = eh(request(), exc)
+    return asyncio.run(drain(response)) if isinstance(response, StreamingResponse) else len(response.body)
+
+
+def render(eh, exc) -> tuple[float, int, int]:
+    """Return (usec, peak bytes, body bytes) for a single rendered response."""
+    start = time.perf_counter()
+    size = consume(eh, exc)
+    usec = (time.perf_counter() - start) * 1e6
+
+    tracemalloc.start()
+    try:
+        consume(eh, exc)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return usec, peak, size
+
+
+def main() -> None:
+    logger = logging.getLogger("benchmarks.streaming")
+    logger.disabled = True
+    buffered = fastapi.generate_handler(logger=logger)
+    streamed = fastapi.generate_handler(logger=logger, stream_threshold=1000)
+
+    for n in (1000, 10000, 50000):
+        exc = RequestValidationError(errors=errors(n))
+        for label, eh in (("buffered", buffered), ("streamed", streamed)):
+            usec, peak, size = render(eh, exc)
+            report(f"{n} errors {label}", usec, peak_kib=peak // 1024, body_kib=size // 1024)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Cost of rendering problem types as absolute URIs compared to bare slugs."""
+
+from __future__ import annotations
+
+import logging
+
+from starlette.requests import Request
+
+from benchmarks._util import measure, report
+from web_error import error
+from web_error.handler import starlette
+from web_error.type_uri import TypeConfiguration
+
+
+class ItemNotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+def request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+
+def main() -> None:
+    logger = logging.getLogger("benchmarks.type_uri")
+    logger.disabled = True
+    exc = ItemNotFoundError("missing")
+
+    slugs = starlette.generate_handler(logger=logger)
+    uris = starlette.generate_handler(logger=logger, types=TypeConfiguration("https://errors.example.com/problems/"))
+
+    report("bare slugs", measure(lambda: slugs(request(), exc)))
+    report("absolute uris", measure(lambda: uris(request(), exc)))
+
+
+if __name__ == "__main__":
+    main()
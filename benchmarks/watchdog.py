@@ -0,0 +1,39 @@
+"""Overhead of the slow-error watchdog on errors handled below its threshold."""
+
+from __future__ import annotations
+
+import logging
+
+from starlette.requests import Request
+
+from benchmarks._util import measure, report
+from web_error import error
+from web_error.handler import starlette
+from web_error.watchdog import SlowErrorWatchdog
+
+
+class ItemNotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+def request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+
+def main() -> None:
+    logger = logging.getLogger("benchmarks.watchdog")
+    logger.disabled = True
+    exc = ItemNotFoundError("missing")
+
+    baseline = starlette.generate_handler(logger=logger)
+    report("no watchdog", measure(lambda: baseline(request(), exc)))
+
+    for sample_stacks in (False, True):
+        wd = SlowErrorWatchdog(threshold=1.0, sample_stacks=sample_stacks)
+        eh = starlette.generate_handler(logger=logger, watchdog=wd)
+        report(f"watchdog sample_stacks={sample_stacks}", measure(lambda eh=eh: eh(request(), exc)))
+        wd.stop()
+
+
+if __name__ == "__main__":
+    main()
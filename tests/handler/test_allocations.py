@@ -0,0 +1,177 @@
+"""Allocation budgets for every handler path.
+
+Throughput on the error path is allocation bound, each scenario measures the
+blocks and bytes retained per handled error (the response and anything leaked)
+and the transient peak of a single call, failing when a checked-in budget in
+allocation_budgets.json is exceeded.
+
+Scenarios are measured in a fresh interpreter, retained bytes are process
+wide and state left behind by other tests (in random order) skews them.
+
+Regenerate budgets after an intentional change with:
+
+    WEB_ERROR_UPDATE_BUDGETS=1 pytest tests/handler/test_allocations.py
+"""
+
+import gc
+import http
+import json
+import logging
+import os
+import pathlib
+import subprocess
+import sys
+import tracemalloc
+
+import pytest
+from fastapi.exceptions import RequestValidationError
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+
+from web_error import error
+from web_error.cors import CorsConfiguration
+from web_error.handler import fastapi, starlette
+
+BUDGETS = pathlib.Path(__file__).parent / "allocation_budgets.json"
+UPDATE = os.environ.get("WEB_ERROR_UPDATE_BUDGETS") == "1"
+CALLS = 50
+RUNS = 3
+# Budgets are recorded with headroom to absorb differences between python versions.
+HEADROOM = 1.25
+
+
+class NotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+SCENARIOS = {
+    "http_exception": lambda: NotFoundError("missing"),
+    "starlette_http_exception": lambda: HTTPException(http.HTTPStatus.NOT_FOUND, "Item not found"),
+    "request_validation_error": lambda: RequestValidationError(
+        errors=[{"type": "missing", "loc": ("body", "name"), "msg": "Field required", "input": None}],
+    ),
+    "exception": lambda: Exception("Something went bad"),
+}
+
+MODULES = {"starlette": starlette, "fastapi": fastapi}
+
+# RequestValidationError is handled by the fastapi handler only.
+CASES = [
+    (module, scenario, with_cors)
+    for module in MODULES
+    for scenario in SCENARIOS
+    for with_cors in (False, True)
+    if not (module == "starlette" and scenario == "request_validation_error")
+]
+
+
+def request():
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [(b"origin", b"localhost"), (b"accept", b"application/json")],
+        },
+    )
+
+
+def measure_once(eh, exc_factory):
+    requests = [request() for _ in range(CALLS)]
+    exceptions = [exc_factory() for _ in range(CALLS)]
+    responses = []
+    filters = [tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__)]
+
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(filters)
+        for r, exc in zip(requests, exceptions):
+            responses.append(eh(r, exc))
+        after = tracemalloc.take_snapshot().filter_traces(filters)
+
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        eh(request(), exc_factory())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+
+    stats = after.compare_to(before, "filename")
+    return {
+        "blocks": sum(s.count_diff for s in stats) / CALLS,
+        "bytes": sum(s.size_diff for s in stats) / CALLS,
+        "peak_bytes": peak - current,
+    }
+
+
+def measure(eh, exc_factory):
+    # Warm up caches populated on first use.
+    for _ in range(3):
+        eh(request(), exc_factory())
+
+    # Take the best of several runs to filter out unrelated interpreter allocations.
+    runs = [measure_once(eh, exc_factory) for _ in range(RUNS)]
+    return {k: min(run[k] for run in runs) for k in runs[0]}
+
+
+def case_name(module, scenario, with_cors):
+    return f"{module}.{scenario}.{'cors' if with_cors else 'plain'}"
+
+
+def measure_cases():
+    logger = logging.getLogger("tests.allocations")
+    logger.disabled = True
+    cors = CorsConfiguration(
+        allow_origins=["localhost"],
+        allow_methods=["*"],
+        allow_headers=["*"],
+        allow_credentials=True,
+    )
+
+    measured = {}
+    for module, scenario, with_cors in CASES:
+        eh = MODULES[module].generate_handler(logger=logger, cors=cors if with_cors else None)
+        measured[case_name(module, scenario, with_cors)] = measure(eh, SCENARIOS[scenario])
+    return measured
+
+
+@pytest.fixture(scope="module")
+def measured():
+    result = subprocess.run(
+        [sys.executable, "-m", "tests.handler.test_allocations"],  # noqa: S603
+        cwd=pathlib.Path(__file__).parents[2],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.fixture(scope="module")
+def budgets():
+    data = json.loads(BUDGETS.read_text()) if BUDGETS.exists() else {}
+    yield data
+    if UPDATE:
+        BUDGETS.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.mark.parametrize(("module", "scenario", "with_cors"), CASES, ids=[case_name(*case) for case in CASES])
+def test_allocation_budget(budgets, measured, module, scenario, with_cors):
+    name = case_name(module, scenario, with_cors)
+    result = measured[name]
+
+    if UPDATE:
+        budgets[name] = {k: int(v * HEADROOM) + 1 for k, v in result.items()}
+        return
+
+    budget = budgets.get(name)
+    assert budget is not None, f"No allocation budget recorded for {name}"
+    over = {k: (v, budget[k]) for k, v in result.items() if v > budget[k]}
+    assert not over, f"{name} exceeded allocation budget (measured, budget): {over}"
+
+
+if __name__ == "__main__":
+    print(json.dumps(measure_cases()))  # noqa: T201
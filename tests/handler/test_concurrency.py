@@ -0,0 +1,196 @@
+"""Stress handlers from many threads and asyncio tasks.
+
+The sync exception handlers run on starlette's threadpool, any shared state
+(render cache, negotiation cache, shedding window) must be race free.
+"""
+
+import asyncio
+import http
+import itertools
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from starlette.exceptions import HTTPException
+
+from web_error import cache, error, negotiation, shedding
+from web_error.cors import CorsConfiguration
+from web_error.handler import fastapi, starlette
+
+THREADS = 8
+ITERATIONS = 250
+
+
+class NotFoundError(error.NotFoundException):
+    title = "a 404 message"
+
+
+class SomethingWrongError(error.ServerException):
+    title = "This is an error."
+
+
+# Shared instances, raised concurrently from many requests.
+SHARED_HTTP_EXCEPTION = HTTPException(http.HTTPStatus.UNAUTHORIZED, "no", headers={"WWW-Authenticate": "Basic"})
+
+ORIGINS = [None, "localhost", "https://allowed.example", "https://denied.example"]
+
+
+def exceptions():
+    return [
+        NotFoundError("item not found"),
+        NotFoundError("other item not found"),
+        NotFoundError(errors=[{"loc": "body"}]),
+        SomethingWrongError("bad"),
+        HTTPException(http.HTTPStatus.NOT_FOUND, "Item not found"),
+        SHARED_HTTP_EXCEPTION,
+        Exception("Something went bad"),
+    ]
+
+
+def request(origin, accept=None):
+    headers = {}
+    if origin:
+        headers["origin"] = origin
+    if accept:
+        headers["accept"] = accept
+    return mock.Mock(headers=headers)
+
+
+def snapshot(response):
+    return (
+        response.status_code,
+        response.body,
+        sorted((k, v) for k, v in response.headers.items() if k != "content-length"),
+    )
+
+
+@pytest.fixture(autouse=True)
+def _switch_interval():
+    # Force frequent thread switches to surface races.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.fixture()
+def cors():
+    return CorsConfiguration(
+        allow_origins=["localhost", "https://allowed.example"],
+        allow_methods=["*"],
+        allow_headers=["*"],
+        allow_credentials=True,
+    )
+
+
+def cases():
+    accepts = [None, "application/problem+msgpack", "application/json"]
+    return list(itertools.product(range(len(exceptions())), ORIGINS, accepts))
+
+
+@pytest.mark.parametrize("module", [starlette, fastapi])
+def test_threads(module, cors):
+    render_cache = cache.RenderCache(maxsize=4)
+    config = shedding.SheddingConfiguration(threshold=1e9)
+    kwargs = {
+        "cors": cors,
+        "render_cache": render_cache,
+        "encoders": negotiation.available_encoders(),
+        "shedding": config,
+        "logger": mock.Mock(),
+    }
+
+    reference = module.generate_handler(**kwargs)
+    expected = {
+        (i, origin, accept): snapshot(reference(request(origin, accept), exceptions()[i]))
+        for i, origin, accept in cases()
+    }
+    render_cache.clear()
+
+    eh = module.generate_handler(**kwargs)
+
+    def work(offset):
+        mismatches = []
+        keys = cases()
+        for n in range(ITERATIONS):
+            key = keys[(n + offset) % len(keys)]
+            i, origin, accept = key
+            if snapshot(eh(request(origin, accept), exceptions()[i])) != expected[key]:
+                mismatches.append(key)
+        return mismatches
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        results = list(pool.map(work, range(THREADS)))
+
+    assert results == [[]] * THREADS
+    stats = render_cache.stats()
+    assert stats.hits + stats.misses + stats.bypassed == THREADS * ITERATIONS
+    assert stats.size <= stats.maxsize
+    assert SHARED_HTTP_EXCEPTION.headers == {"WWW-Authenticate": "Basic"}
+
+
+def test_shedding_window_threads():
+    clock = mock.Mock(return_value=1000.0)
+    shedder = shedding.LoadShedder(shedding.SheddingConfiguration(threshold=1e9, window=10), clock=clock)
+
+    def work(_):
+        for _ in range(ITERATIONS):
+            shedder.record()
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        list(pool.map(work, range(THREADS)))
+
+    assert shedder.rate() * 10 == THREADS * ITERATIONS
+
+
+def test_negotiation_threads():
+    negotiator = negotiation.ContentNegotiator(negotiation.available_encoders(), cache_size=4)
+    accepts = [f"application/x-{i}, application/problem+msgpack;q=0.{i}" for i in range(1, 9)]
+    expected = {accept: negotiator._negotiate(accept) for accept in accepts}
+
+    def work(offset):
+        return [
+            negotiator.negotiate(accepts[(n + offset) % len(accepts)]) == expected[accepts[(n + offset) % len(accepts)]]
+            for n in range(ITERATIONS)
+        ]
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        results = list(pool.map(work, range(THREADS)))
+
+    assert all(all(r) for r in results)
+
+
+async def test_asyncio_tasks(cors):
+    render_cache = cache.RenderCache()
+    app = FastAPI()
+    fastapi.add_exception_handler(app, cors=cors, render_cache=render_cache, logger=mock.Mock())
+
+    @app.get("/error/{i}")
+    async def raise_error(i: int):
+        raise exceptions()[i]
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False, client=("1.2.3.4", 123))
+    async with httpx.AsyncClient(transport=transport, base_url="https://test") as client:
+
+        async def call(n):
+            i = n % len(exceptions())
+            origin = ORIGINS[n % len(ORIGINS)]
+            r = await client.get(f"/error/{i}", headers={"origin": origin} if origin else {})
+            return i, origin, r
+
+        responses = await asyncio.gather(*(call(n) for n in range(200)))
+
+    for i, origin, r in responses:
+        exc = exceptions()[i]
+        status = getattr(exc, "status", getattr(exc, "status_code", 500))
+        assert r.status_code == status
+        assert r.headers["content-type"] == "application/problem+json"
+        assert json.loads(r.content)["status"] == status
+        if origin in ("localhost", "https://allowed.example"):
+            assert r.headers["access-control-allow-origin"] == origin
+        else:
+            assert "access-control-allow-origin" not in r.headers
@@ -1,5 +1,9 @@
+import datetime
+import gc
 import http
 import json
+import tracemalloc
+import weakref
 from unittest import mock
 
 import httpx
@@ -7,16 +11,34 @@ import pytest
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException
-
-from web_error import error
+from starlette.responses import StreamingResponse
+
+from web_error import (
+    cache,
+    correlation,
+    error,
+    group,
+    hooks,
+    i18n,
+    negotiation,
+    policy,
+    recent,
+    shedding,
+    type_uri,
+    watchdog,
+)
 from web_error.cors import CorsConfiguration
-from web_error.handler import fastapi
+from web_error.handler import fastapi, starlette
 
 
 class SomethingWrongError(error.ServerException):
     title = "This is an error."
 
 
+class CachedNotFoundError(error.NotFoundException):
+    cache_control = "public, max-age=60"
+
+
 class CustomUnhandledException(error.ServerException):
     title = "Unhandled exception occurred."
 
@@ -42,6 +64,35 @@ class LegacyValidationError(error.HttpCodeException):
     title = "Request validation error."
 
 
+PAYLOAD_SIZE = 1024 * 1024
+
+
+class Payload:
+    def __init__(self):
+        self.body = bytearray(PAYLOAD_SIZE)
+
+
+def raise_with_payload(exc):
+    payload = Payload()
+    ref = weakref.ref(payload)
+
+    def fail(body):
+        raise ValueError(len(body.body))
+
+    def inner(body):
+        try:
+            fail(body)
+        except ValueError:
+            raise exc  # noqa: B904
+
+    try:
+        inner(payload)
+    except Exception as e:  # noqa: BLE001
+        caught = e
+    del payload
+    return ref, caught
+
+
 @pytest.fixture()
 def cors():
     return CorsConfiguration(
@@ -313,6 +364,654 @@ class TestExceptionHandler:
 
         assert "access-control-allow-origin" not in response.headers
 
+    def test_negotiated_binary_format(self):
+        msgpack = pytest.importorskip("msgpack")
+        request = mock.Mock(headers={"accept": "application/problem+msgpack"})
+        exc = SomethingWrongError("something bad")
+
+        eh = fastapi.generate_handler(encoders=negotiation.available_encoders())
+        response = eh(request, exc)
+
+        assert response.status_code == http.HTTPStatus.INTERNAL_SERVER_ERROR
+        assert response.headers["content-type"] == "application/problem+msgpack"
+        assert response.headers["vary"] == "Accept"
+        assert msgpack.unpackb(response.body) == {
+            "title": "This is an error.",
+            "details": "something bad",
+            "type": "something-wrong",
+            "status": 500,
+        }
+
+    def test_negotiated_json_fallback(self):
+        request = mock.Mock(headers={"accept": "application/problem+cbor"})
+        exc = SomethingWrongError("something bad")
+
+        eh = fastapi.generate_handler(encoders=[])
+        response = eh(request, exc)
+
+        assert response.headers["content-type"] == "application/problem+json"
+        assert json.loads(response.body)["type"] == "something-wrong"
+
+    @pytest.mark.backwards_compat()
+    def test_negotiation_ignored_legacy(self):
+        request = mock.Mock(headers={"accept": "application/problem+msgpack"})
+        exc = ALegacyError("something bad")
+
+        eh = fastapi.generate_handler(encoders=negotiation.available_encoders(), legacy=True)
+        response = eh(request, exc)
+
+        assert response.headers["content-type"] == "application/json"
+        assert json.loads(response.body)["code"] == "E123"
+
+    def test_render_cache(self):
+        request = mock.Mock()
+        render_cache = cache.RenderCache()
+
+        eh = fastapi.generate_handler(render_cache=render_cache)
+        first = eh(request, HTTPException(http.HTTPStatus.NOT_FOUND, "Item not found"))
+        second = eh(request, HTTPException(http.HTTPStatus.NOT_FOUND, "Item not found"))
+
+        assert first.body == second.body
+        assert json.loads(second.body) == {
+            "title": "Not Found",
+            "details": "Item not found",
+            "type": "http-not-found",
+            "status": 404,
+        }
+        assert second.headers["content-type"] == "application/problem+json"
+        stats = render_cache.stats()
+        assert (stats.hits, stats.misses) == (1, 1)
+
+    def test_shedding(self):
+        logger = mock.Mock()
+        request = mock.Mock()
+        transitions = []
+        config = shedding.SheddingConfiguration(
+            threshold=0.2,
+            retry_after=30,
+            log_sample_rate=0.5,
+            on_shed=lambda rate: transitions.append(rate),
+        )
+
+        eh = fastapi.generate_handler(logger=logger, shedding=config)
+        eh(request, Exception("Something went bad"))
+        logger.reset_mock()
+        responses = [eh(request, Exception("Something went bad")) for _ in range(3)]
+
+        assert transitions == [0.2]
+        assert [r.status_code for r in responses] == [500] * 3
+        assert json.loads(responses[0].body) == {
+            "title": "Internal Server Error",
+            "type": "http-internal-server-error",
+            "status": 500,
+        }
+        assert responses[0].headers["retry-after"] == "30"
+        assert responses[0].headers["content-type"] == "application/problem+json"
+        assert [c.args for c in logger.exception.call_args_list] == [("Unhandled exception occurred.",)] * 2
+
+    def test_shedding_status(self):
+        request = mock.Mock()
+        config = shedding.SheddingConfiguration(threshold=0.1)
+
+        eh = fastapi.generate_handler(shedding=config, unhandled_wrappers={"default": SomethingWrongError})
+        responses = [
+            eh(request, HTTPException(http.HTTPStatus.UNAUTHORIZED, headers={"WWW-Authenticate": "Basic"})),
+            eh(request, error.NotFoundException()),
+            eh(request, Exception()),
+        ]
+
+        assert [r.status_code for r in responses] == [401, 404, 500]
+        assert responses[0].headers["www-authenticate"] == "Basic"
+
+    def test_shedding_non_standard_status(self):
+        eh = fastapi.generate_handler(logger=mock.Mock(), shedding=shedding.SheddingConfiguration(threshold=0.1))
+
+        response = eh(mock.Mock(headers={}), error.HttpException("Client closed request.", status=499))
+
+        assert response.status_code == 499  # noqa: PLR2004
+        assert json.loads(response.body) == {"type": "http-499", "title": "Client Error", "status": 499}
+
+    @pytest.mark.backwards_compat()
+    def test_shedding_validation_error_legacy(self):
+        request = mock.Mock()
+        config = shedding.SheddingConfiguration(threshold=0.1)
+
+        eh = fastapi.generate_handler(shedding=config, legacy=True)
+        response = eh(request, RequestValidationError(errors=[]))
+
+        assert response.status_code == http.HTTPStatus.UNPROCESSABLE_ENTITY
+        assert response.headers["content-type"] == "application/json"
+        assert json.loads(response.body) == {
+            "code": "http-unprocessable-entity",
+            "message": "Unprocessable Entity",
+        }
+
+    @pytest.mark.skipif(not group.GROUP_TYPES, reason="ExceptionGroup not available")
+    def test_exception_group(self):
+        logger = mock.Mock()
+        request = mock.Mock()
+        exc = ExceptionGroup("group", [error.NotFoundException("a"), error.BadRequestException("b")])
+
+        eh = fastapi.generate_handler(logger=logger)
+        response = eh(request, exc)
+
+        assert response.status_code == http.HTTPStatus.BAD_REQUEST
+        assert json.loads(response.body) == {
+            "type": "multiple-errors",
+            "title": "Multiple errors occurred.",
+            "status": 400,
+            "errors": [
+                {"type": "not-found-exception", "title": "Base http exception.", "details": "a", "status": 404},
+                {"type": "bad-request-exception", "title": "Base http exception.", "details": "b", "status": 400},
+            ],
+        }
+        assert logger.exception.call_count == 0
+
+    @pytest.mark.skipif(not group.GROUP_TYPES, reason="ExceptionGroup not available")
+    def test_exception_group_unhandled_member(self):
+        request = mock.Mock()
+        exc = ExceptionGroup("group", [error.NotFoundException("a"), ValueError("b")])
+
+        eh = fastapi.generate_handler(strip_debug=True)
+        response = eh(request, exc)
+
+        assert response.status_code == http.HTTPStatus.INTERNAL_SERVER_ERROR
+        assert json.loads(response.body)["type"] == "unhandled-exception"
+
+    def test_release_traceback_frames_freed(self):
+        request = mock.Mock()
+        eh = fastapi.generate_handler(release_tracebacks=range(400, 500))
+        tracemalloc.start()
+        ref, exc = raise_with_payload(error.NotFoundException("missing"))
+        gc.collect()
+        before, _ = tracemalloc.get_traced_memory()
+        response = eh(request, exc)
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert response.status_code == http.HTTPStatus.NOT_FOUND
+        assert ref() is None
+        # The 1MiB payload pinned by the traceback frames has been released.
+        assert before - after > PAYLOAD_SIZE // 2
+        assert exc.__traceback__ is None
+        assert exc.__context__ is None
+
+    def test_release_traceback_logged_status_kept(self):
+        request = mock.Mock()
+        ref, exc = raise_with_payload(SomethingWrongError("bad"))
+
+        eh = fastapi.generate_handler(logger=mock.Mock(), release_tracebacks=range(600))
+        eh(request, exc)
+        gc.collect()
+
+        assert ref() is not None
+        assert exc.__traceback__ is not None
+
+    def test_release_traceback_disabled(self):
+        request = mock.Mock()
+        ref, exc = raise_with_payload(HTTPException(http.HTTPStatus.NOT_FOUND))
+
+        eh = fastapi.generate_handler()
+        eh(request, exc)
+        gc.collect()
+
+        assert ref() is not None
+
+    def test_release_traceback_after_post_render(self):
+        tracebacks = []
+
+        def post_render(_request, exc, response):
+            tracebacks.append(exc.__traceback__)
+            return response
+
+        _, exc = raise_with_payload(error.NotFoundException("missing"))
+        eh = fastapi.generate_handler(
+            release_tracebacks=range(400, 500),
+            hooks=hooks.Hooks(post_render=[post_render]),
+        )
+        eh(mock.Mock(headers={}), exc)
+
+        assert tracebacks[0] is not None
+        assert exc.__traceback__ is None
+
+    def test_class_response_policy(self):
+        request = mock.Mock()
+
+        eh = fastapi.generate_handler()
+        response = eh(request, CachedNotFoundError("missing"))
+
+        assert response.headers["cache-control"] == "public, max-age=60"
+        assert "retry-after" not in response.headers
+
+    def test_status_response_policy(self, cors):
+        request = mock.Mock(headers={"origin": "localhost"})
+
+        eh = fastapi.generate_handler(
+            cors=cors,
+            logger=mock.Mock(),
+            policies={
+                404: policy.ResponsePolicy(cache_control="public, max-age=10"),
+                503: policy.ResponsePolicy(retry_after=30),
+            },
+        )
+        unavailable = eh(request, HTTPException(http.HTTPStatus.SERVICE_UNAVAILABLE))
+        not_found = eh(request, CachedNotFoundError("missing"))
+        starlette_not_found = eh(
+            request,
+            HTTPException(http.HTTPStatus.NOT_FOUND, headers={"Cache-Control": "no-store"}),
+        )
+
+        assert unavailable.headers["retry-after"] == "30"
+        assert unavailable.headers["access-control-allow-origin"] == "*"
+        assert not_found.headers["cache-control"] == "public, max-age=60"
+        assert starlette_not_found.headers["cache-control"] == "no-store"
+
+    def test_localized_title(self):
+        titles = i18n.TitleCatalog(
+            {
+                "de": {"Not Found": "Nicht gefunden", "This is an error.": "Das ist ein Fehler."},
+            },
+        )
+        render_cache = cache.RenderCache()
+
+        eh = fastapi.generate_handler(titles=titles, render_cache=render_cache, logger=mock.Mock())
+        localized = eh(mock.Mock(headers={"accept-language": "de-DE, en;q=0.5"}), SomethingWrongError("bad"))
+        fallback = eh(mock.Mock(headers={"accept-language": "en"}), SomethingWrongError("bad"))
+        starlette_error = eh(mock.Mock(headers={"accept-language": "de"}), HTTPException(http.HTTPStatus.NOT_FOUND))
+
+        assert json.loads(localized.body)["title"] == "Das ist ein Fehler."
+        assert localized.headers["content-language"] == "de"
+        assert localized.headers["vary"] == "Accept-Language"
+        assert json.loads(fallback.body)["title"] == "This is an error."
+        assert "content-language" not in fallback.headers
+        assert json.loads(starlette_error.body)["title"] == "Nicht gefunden"
+        assert (render_cache.stats().hits, render_cache.stats().misses) == (0, 3)
+
+    def test_localized_title_language_tag_casing(self):
+        titles = i18n.TitleCatalog({"pt-BR": {"This is an error.": "Isto é um erro."}})
+
+        eh = fastapi.generate_handler(titles=titles, logger=mock.Mock())
+        localized = eh(mock.Mock(headers={"accept-language": "pt-br"}), SomethingWrongError("bad"))
+
+        assert json.loads(localized.body)["title"] == "Isto é um erro."
+        assert localized.headers["content-language"] == "pt-BR"
+
+    @pytest.mark.backwards_compat()
+    def test_localized_title_legacy(self):
+        titles = i18n.TitleCatalog({"de": {"This is an error.": "Das ist ein Fehler."}})
+
+        eh = fastapi.generate_handler(titles=titles, legacy=True, logger=mock.Mock())
+        response = eh(mock.Mock(headers={"accept-language": "de"}), ALegacyError("bad"))
+
+        assert json.loads(response.body) == {
+            "message": "Das ist ein Fehler.",
+            "debug_message": "bad",
+            "code": "E123",
+        }
+
+    def test_correlation(self):
+        logger = mock.Mock()
+        request = mock.Mock(headers={"x-request-id": "req-123"})
+        exc = SomethingWrongError("bad")
+        render_cache = cache.RenderCache()
+
+        eh = fastapi.generate_handler(
+            logger=logger,
+            correlation=correlation.CorrelationConfiguration(),
+            render_cache=render_cache,
+        )
+        response = eh(request, exc)
+        other = eh(mock.Mock(headers={"x-request-id": "req-456"}), SomethingWrongError("bad"))
+
+        assert json.loads(response.body) == {
+            "title": "This is an error.",
+            "details": "bad",
+            "type": "something-wrong",
+            "status": 500,
+            "instance": "req-123",
+        }
+        assert json.loads(other.body)["instance"] == "req-456"
+        assert render_cache.stats().hits == 1
+        assert logger.exception.call_args_list[0] == mock.call(
+            "This is an error.",
+            exc_info=(type(exc), exc, None),
+            extra={"request_id": "req-123"},
+        )
+
+    @pytest.mark.parametrize("render_cache", [None, cache.RenderCache()])
+    def test_correlation_exception_instance(self, render_cache):
+        request = mock.Mock(headers={"x-request-id": "req-123"})
+
+        eh = fastapi.generate_handler(
+            logger=mock.Mock(),
+            correlation=correlation.CorrelationConfiguration(),
+            render_cache=render_cache,
+        )
+        response = eh(request, error.NotFoundException("missing", instance="/items/1"))
+
+        assert response.body.count(b'"instance"') == 1
+        assert json.loads(response.body)["instance"] == "/items/1"
+
+    def test_correlation_binary_format(self):
+        msgpack = pytest.importorskip("msgpack")
+        request = mock.Mock(
+            headers={
+                "traceparent": "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01",
+                "accept": "application/problem+msgpack",
+            },
+        )
+
+        eh = fastapi.generate_handler(
+            encoders=negotiation.available_encoders(),
+            correlation=correlation.CorrelationConfiguration(header="traceparent"),
+        )
+        response = eh(request, error.NotFoundException())
+
+        assert msgpack.unpackb(response.body)["instance"] == "4bf92f3577b34da6a3ce929d0e0e4736"
+
+    @pytest.mark.backwards_compat()
+    def test_correlation_legacy(self):
+        logger = mock.Mock()
+        exc = ALegacyError("bad")
+
+        eh = fastapi.generate_handler(
+            logger=logger,
+            legacy=True,
+            correlation=correlation.CorrelationConfiguration(log_key="rid"),
+        )
+        response = eh(mock.Mock(headers={"x-request-id": "req-123"}), exc)
+
+        assert "instance" not in json.loads(response.body)
+        assert logger.exception.call_args.kwargs["extra"] == {"rid": "req-123"}
+
+    def test_exporter(self):
+        exporter = mock.Mock()
+        request = mock.Mock(headers={"x-request-id": "req-123"})
+        exc = SomethingWrongError("bad")
+
+        eh = fastapi.generate_handler(
+            logger=mock.Mock(),
+            correlation=correlation.CorrelationConfiguration(),
+            exporter=exporter,
+        )
+        eh(request, exc)
+        eh(request, error.NotFoundException())
+        unhandled = ValueError("boom")
+        eh(request, unhandled)
+
+        assert exporter.submit.call_args_list == [
+            mock.call(exc, "something-wrong", 500, request, "req-123", None),
+            # Converted details are reused rather than calling str(exc) again.
+            mock.call(unhandled, "unhandled-exception", 500, request, "req-123", "boom"),
+        ]
+
+    def test_recent_errors(self):
+        buffer = recent.RecentErrors(capacity=10)
+        request = mock.Mock(headers={}, scope={"route": mock.Mock(path="/items/{id}")})
+        unrouted = mock.Mock(headers={}, scope={})
+        unrouted.url.path = "/missing"
+
+        eh = fastapi.generate_handler(logger=mock.Mock(), recent=buffer)
+        eh(request, SomethingWrongError("bad"))
+        eh(unrouted, HTTPException(404))
+
+        assert [(r["status"], r["type"], r["route"]) for r in buffer.recent()] == [
+            (404, "http-not-found", "/missing"),
+            (500, "something-wrong", "/items/{id}"),
+        ]
+
+    def test_validation_error_non_json_native(self):
+        request = mock.Mock(headers={})
+        exc = RequestValidationError(
+            errors=[
+                {
+                    "type": "value_error",
+                    "loc": ("body", "at"),
+                    "msg": "Value error, too late",
+                    "input": datetime.date(2024, 1, 2),
+                    "ctx": {"error": ValueError("too late")},
+                },
+            ],
+        )
+
+        eh = fastapi.generate_handler(logger=mock.Mock())
+        response = eh(request, exc)
+
+        assert json.loads(response.body)["errors"] == [
+            {
+                "type": "value_error",
+                "loc": ["body", "at"],
+                "msg": "Value error, too late",
+                "input": "2024-01-02",
+                "ctx": {"error": "too late"},
+            },
+        ]
+
+    def test_hooks(self, cors):
+        on_log = mock.Mock()
+        request = mock.Mock(headers={"origin": "localhost"})
+
+        def pre_convert(_request, exc):
+            return error.NotFoundException(str(exc)) if isinstance(exc, KeyError) else exc
+
+        def post_render(_request, exc, response):
+            response.headers["x-error-type"] = type(exc).__name__
+            return response
+
+        eh = fastapi.generate_handler(
+            logger=mock.Mock(),
+            cors=cors,
+            hooks=hooks.Hooks(pre_convert=[pre_convert], post_render=[post_render], on_log=[on_log]),
+        )
+        not_found = eh(request, KeyError("item"))
+        exc = SomethingWrongError("bad")
+        server_error = eh(request, exc)
+
+        assert not_found.status_code == http.HTTPStatus.NOT_FOUND
+        assert not_found.headers["x-error-type"] == "NotFoundException"
+        assert not_found.headers["access-control-allow-origin"] == "*"
+        assert server_error.headers["x-error-type"] == "SomethingWrongError"
+        on_log.assert_called_once_with(request, exc, exc)
+
+    def test_status_class_wrapper(self):
+        request = mock.Mock(headers={})
+
+        eh = fastapi.generate_handler(
+            logger=mock.Mock(),
+            unhandled_wrappers={"4xx": CustomValidationError, "404": error.NotFoundException},
+        )
+
+        assert json.loads(eh(request, HTTPException(409, "conflict")).body) == {
+            "type": "custom-validation",
+            "title": "Request validation error.",
+            "details": "conflict",
+            "status": 422,
+        }
+        assert eh(request, HTTPException(404)).status_code == http.HTTPStatus.NOT_FOUND
+        assert eh(request, HTTPException(503)).status_code == http.HTTPStatus.SERVICE_UNAVAILABLE
+
+    def test_unknown_wrapper_key(self):
+        with pytest.raises(ValueError, match=r"Unknown unhandled_wrappers keys \['40x'\]"):
+            fastapi.generate_handler(unhandled_wrappers={"40x": CustomValidationError})
+
+    def test_formats(self):
+        render_cache = cache.RenderCache()
+        exc = ALegacyError("bad")
+
+        eh = fastapi.generate_handler(
+            logger=mock.Mock(),
+            formats=negotiation.FormatConfiguration(),
+            render_cache=render_cache,
+            correlation=correlation.CorrelationConfiguration(),
+        )
+        legacy = eh(mock.Mock(headers={"accept": "application/json", "x-request-id": "abc"}), exc)
+        rfc = eh(mock.Mock(headers={"accept": "application/problem+json", "x-request-id": "abc"}), exc)
+        versioned = eh(mock.Mock(headers={"x-problem-version": "2", "x-request-id": "abc"}), exc)
+
+        assert legacy.headers["content-type"] == "application/json"
+        assert legacy.headers["vary"] == "Accept, x-problem-version"
+        assert json.loads(legacy.body) == {
+            "code": "E123",
+            "message": "This is an error.",
+            "debug_message": "bad",
+        }
+        assert rfc.headers["content-type"] == "application/problem+json"
+        assert rfc.headers["vary"] == "Accept, x-problem-version"
+        assert json.loads(rfc.body) == {
+            "type": "E123",
+            "title": "This is an error.",
+            "details": "bad",
+            "status": 500,
+            "instance": "abc",
+        }
+        assert versioned.body == rfc.body
+        assert render_cache.stats().hits == 1
+
+    def test_formats_binary_encoders(self):
+        msgpack = pytest.importorskip("msgpack")
+
+        eh = fastapi.generate_handler(
+            logger=mock.Mock(),
+            formats=negotiation.FormatConfiguration(),
+            encoders=negotiation.available_encoders(),
+        )
+        response = eh(mock.Mock(headers={"accept": "application/problem+msgpack"}), error.NotFoundException())
+
+        assert response.headers["vary"] == "Accept, x-problem-version"
+        assert msgpack.unpackb(response.body)["status"] == http.HTTPStatus.NOT_FOUND
+
+    def test_formats_validation_error(self):
+        errors = [{"type": "missing", "loc": ["body", "name"], "msg": "Field required", "input": None}]
+        exc = RequestValidationError(errors=errors)
+
+        eh = fastapi.generate_handler(logger=mock.Mock(), formats=negotiation.FormatConfiguration())
+        legacy = eh(mock.Mock(headers={"accept": "application/json"}), exc)
+        rfc = eh(mock.Mock(headers={"accept": "application/problem+json"}), exc)
+
+        assert json.loads(legacy.body)["debug_message"] == errors
+        assert json.loads(rfc.body)["errors"] == errors
+
+    def test_watchdog(self, cors):
+        wd = watchdog.SlowErrorWatchdog(threshold=0, sample_stacks=False)
+        request = mock.Mock(headers={"origin": "localhost"})
+
+        eh = fastapi.generate_handler(logger=mock.Mock(), cors=cors, watchdog=wd)
+        eh(request, SomethingWrongError("bad"))
+        eh(request, RequestValidationError([{"loc": ("body", "name"), "msg": "Field required", "type": "missing"}]))
+
+        server_error, validation = wd.dump()
+        assert set(server_error["stages"]) == {"convert", "report", "render"}
+        assert validation["status"] == http.HTTPStatus.UNPROCESSABLE_ENTITY
+        assert validation["sizes"]["errors"] == 1
+        assert set(validation["stages"]) == {"convert", "render"}
+
+    @pytest.mark.parametrize(("debug", "calls"), [(False, 0), (True, 1)])
+    def test_details_lazy(self, debug, calls):
+        str_ = mock.Mock(return_value="SELECT ...")
+
+        class QueryError(Exception):
+            __str__ = str_
+
+        logger = mock.Mock()
+        logger.isEnabledFor.return_value = debug
+
+        eh = fastapi.generate_handler(logger=logger, strip_debug=True)
+        response = eh(mock.Mock(headers={}), QueryError())
+
+        assert json.loads(response.body) == {
+            "type": "unhandled-exception",
+            "title": "Unhandled exception occurred.",
+            "status": 500,
+        }
+        assert str_.call_count == calls
+
+    def test_details_limit(self):
+        eh = fastapi.generate_handler(
+            logger=mock.Mock(),
+            unhandled_wrappers={"default": CustomUnhandledException},
+            details_limit=32,
+        )
+        response = eh(mock.Mock(headers={}), Exception("x" * 1000))
+
+        assert json.loads(response.body)["details"] == "x" * 17 + "... (truncated)"
+
+    def test_type_uris(self):
+        types = type_uri.TypeConfiguration(
+            "https://errors.example.com/",
+            overrides={error.BadRequestException: "https://docs.example.com/bad-request"},
+        )
+        request = mock.Mock(headers={})
+
+        eh = fastapi.generate_handler(logger=mock.Mock(), types=types)
+
+        assert json.loads(eh(request, SomethingWrongError("bad")).body)["type"] == (
+            "https://errors.example.com/something-wrong"
+        )
+        assert json.loads(eh(request, HTTPException(409)).body)["type"] == "https://errors.example.com/http-conflict"
+        assert json.loads(eh(request, Exception("bad")).body)["type"] == (
+            "https://errors.example.com/unhandled-exception"
+        )
+
+        content = json.loads(
+            eh(request, ExceptionGroup("group", [error.NotFoundException("a"), error.BadRequestException("b")])).body,
+        )
+        assert content["type"] == "https://errors.example.com/multiple-errors"
+        assert [e["type"] for e in content["errors"]] == [
+            "https://errors.example.com/not-found-exception",
+            "https://docs.example.com/bad-request",
+        ]
+
+    @pytest.mark.backwards_compat()
+    def test_type_uris_legacy(self):
+        types = type_uri.TypeConfiguration("https://errors.example.com/")
+        request = mock.Mock(headers={})
+
+        eh = fastapi.generate_handler(
+            logger=mock.Mock(),
+            types=types,
+            formats=negotiation.FormatConfiguration(default_legacy=True),
+        )
+
+        assert json.loads(eh(request, ALegacyError("bad")).body)["code"] == "E123"
+        content = json.loads(
+            eh(request, ExceptionGroup("group", [error.NotFoundException("a"), error.BadRequestException("b")])).body,
+        )
+        assert [e["code"] for e in content["debug_message"]] == ["not-found-exception", "bad-request-exception"]
+
+
+async def test_streamed_validation_errors():
+    errors = [{"type": "missing", "loc": ("body", i), "msg": "Field required", "input": None} for i in range(25)]
+
+    eh = fastapi.generate_handler(
+        logger=mock.Mock(),
+        stream_threshold=10,
+        correlation=correlation.CorrelationConfiguration(),
+    )
+    response = eh(mock.Mock(headers={"x-request-id": "abc"}), RequestValidationError(errors=errors))
+    body = b"".join([chunk async for chunk in response.body_iterator])
+
+    assert isinstance(response, StreamingResponse)
+    assert json.loads(body) == {
+        "type": "request-validation-failed",
+        "title": "Request validation error.",
+        "status": 422,
+        "instance": "abc",
+        "errors": [{**e, "loc": list(e["loc"])} for e in errors],
+    }
+
+
+@pytest.mark.backwards_compat()
+async def test_streamed_validation_errors_legacy():
+    errors = [{"type": "missing", "loc": ("body", i), "msg": "Field required", "input": None} for i in range(25)]
+
+    eh = fastapi.generate_handler(logger=mock.Mock(), stream_threshold=10, legacy=True)
+    response = eh(mock.Mock(headers={}), RequestValidationError(errors=errors))
+    body = b"".join([chunk async for chunk in response.body_iterator])
+
+    assert isinstance(response, StreamingResponse)
+    assert json.loads(body)["debug_message"] == [{**e, "loc": list(e["loc"])} for e in errors]
+
 
 async def test_exception_handler_in_app():
     exception_handler = fastapi.generate_handler(
@@ -362,3 +1061,51 @@ async def test_exception_handler_in_app_post_register():
         "details": "Not Found",
         "status": 404,
     }
+
+
+async def test_recent_errors_route():
+    buffer = recent.RecentErrors(capacity=10)
+    app = FastAPI()
+    fastapi.add_exception_handler(app, logger=mock.Mock(), recent=buffer)
+    app.routes.append(starlette.recent_errors_route(buffer))
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        raise error.NotFoundException(item_id)
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False, client=("1.2.3.4", 123))
+    client = httpx.AsyncClient(transport=transport, app=app, base_url="https://test")
+
+    await client.get("/items/1")
+    await client.get("/items/2")
+    r = await client.get("/_errors", params={"limit": 1})
+
+    assert r.status_code == http.HTTPStatus.OK
+    assert r.headers["content-type"] == "application/problem+json"
+    assert r.json() == {
+        "type": "recent-errors",
+        "title": "Recent errors.",
+        "status": 200,
+        "total": 2,
+        "statuses": {"404": 2},
+        "types": {"not-found-exception": 2},
+        "fingerprints": mock.ANY,
+        "recent": [
+            {
+                "timestamp": mock.ANY,
+                "status": 404,
+                "type": "not-found-exception",
+                "route": "/items/{item_id}",
+                "fingerprint": mock.ANY,
+            },
+        ],
+    }
+    assert list(r.json()["fingerprints"].values()) == [2]
+
+
+def test_legacy_warning_attributed_to_caller():
+    with pytest.warns(DeprecationWarning) as record:
+        fastapi.generate_handler(legacy=True)
+        fastapi.add_exception_handler(FastAPI(), legacy=True)
+
+    assert [w.filename for w in record] == [__file__, __file__]
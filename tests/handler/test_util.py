@@ -1,5 +1,11 @@
+import contextlib
+import gc
+import weakref
+from unittest import mock
+
 import pytest
 
+from web_error import error
 from web_error.handler import util
 
 
@@ -12,7 +18,120 @@ from web_error.handler import util
         (404, "Not Found", "http-not-found"),
         (409, "Conflict", "http-conflict"),
         (422, "Unprocessable Entity", "http-unprocessable-entity"),
+        (499, "Client Error", "http-499"),
+        (599, "Server Error", "http-599"),
+        (299, "Unknown Status", "http-299"),
     ],
 )
 def test_convert_status_code(status_code, title, code):
     assert util.convert_status_code(status_code) == (title, code)
+
+
+class Payload:
+    """Stand in for a large request body / ORM session held in a frame local."""
+
+
+def fail():
+    raise ValueError
+
+
+def raise_with_local(exc, payload):
+    local = payload  # noqa: F841
+    try:
+        fail()
+    except ValueError:
+        raise exc  # noqa: B904
+
+
+def test_release_traceback():
+    payload = Payload()
+    ref = weakref.ref(payload)
+    exc = RuntimeError("boom")
+    with contextlib.suppress(RuntimeError):
+        raise_with_local(exc, payload)
+    del payload
+
+    gc.collect()
+    assert ref() is not None
+    assert exc.__context__ is not None
+
+    util.release_traceback(exc)
+    gc.collect()
+
+    assert ref() is None
+    assert exc.__traceback__ is None
+    assert exc.__context__ is None
+
+
+def test_release_traceback_group_members():
+    member = ValueError()
+    with contextlib.suppress(ValueError):
+        raise_with_local(member, Payload())
+    group = mock.Mock(exceptions=[member], __traceback__=None, __context__=None, __cause__=None)
+
+    util.release_traceback(group)
+
+    assert member.__traceback__ is None
+
+
+class NotFoundError(error.NotFoundException): ...
+
+
+class ClientError(error.BadRequestException): ...
+
+
+class UnhandledError(error.ServerException): ...
+
+
+def test_wrapper_table():
+    table = util.WrapperTable({"404": NotFoundError, "4xx": ClientError, 500: UnhandledError})
+
+    assert table.get(404) is NotFoundError
+    assert table.get(409) is ClientError
+    assert table.get(500) is UnhandledError
+    assert table.get(503) is None
+    assert table.get(200) is None
+    assert table.get(999) is None
+    assert table.get(-1) is None
+    assert table.default is None
+
+
+@pytest.mark.parametrize(
+    ("wrappers", "default_keys", "expected"),
+    [
+        ({}, ("default",), None),
+        ({"default": UnhandledError}, ("default",), UnhandledError),
+        ({"500": UnhandledError}, ("default",), None),
+        ({"500": UnhandledError}, ("default", "500"), UnhandledError),
+        ({"default": ClientError, "500": UnhandledError}, ("default", "500"), ClientError),
+        ({"DEFAULT": ClientError}, ("default",), ClientError),
+    ],
+)
+def test_wrapper_table_default(wrappers, default_keys, expected):
+    assert util.WrapperTable(wrappers, default_keys=default_keys).default is expected
+
+
+@pytest.mark.parametrize("key", ["unknown", "4XX0", "600", "99", "6xx", "44x"])
+def test_wrapper_table_unknown_key(key):
+    with pytest.raises(ValueError, match="Unknown unhandled_wrappers keys"):
+        util.WrapperTable({key: UnhandledError})
+
+
+@pytest.mark.parametrize(
+    ("message", "limit", "expected"),
+    [
+        ("short", None, "short"),
+        ("short", 20, "short"),
+        ("x" * 20, 20, "x" * 20),
+        ("x" * 21, 20, "xxxxx... (truncated)"),
+        ("é" * 20, 20, "éé... (truncated)"),
+        ("x" * 21, 15, "... (truncated)"),
+        ("x" * 21, 5, "xxxxx"),
+        ("é" * 20, 5, "éé"),
+    ],
+)
+def test_bounded_details(message, limit, expected):
+    details = util.bounded_details(ValueError(message), limit)
+
+    assert details == expected
+    assert limit is None or len(details.encode()) <= limit
@@ -0,0 +1,73 @@
+import json
+
+from web_error import bulk, error
+
+
+class NotFoundError(error.NotFoundException):
+    title = "a 404 message"
+
+
+class BadRequestError(error.BadRequestException):
+    title = "a 400 message"
+
+
+def test_empty():
+    result = bulk.BulkResult()
+
+    assert json.loads(result.encode()) == {
+        "type": "multi-status",
+        "title": "Multi-Status",
+        "status": 207,
+        "succeeded": 0,
+        "failed": 0,
+        "results": [],
+    }
+
+
+def test_encode():
+    result = bulk.BulkResult()
+    result.succeed(0)
+    result.fail(1, NotFoundError, details="item 1 missing")
+    result.fail(2, BadRequestError("bad item", extra="dropped"))
+    result.succeed(3, status=201)
+    result.fail(4, NotFoundError)
+    result.fail(5, BadRequestError("bad item"), details={"field": "name"})
+
+    assert len(result) == 6  # noqa: PLR2004
+    assert (result.succeeded, result.failed) == (2, 4)
+    assert json.loads(result.encode()) == {
+        "type": "multi-status",
+        "title": "Multi-Status",
+        "status": 207,
+        "succeeded": 2,
+        "failed": 4,
+        "results": [
+            {"index": 0, "status": 200},
+            {"index": 1, "status": 404, "type": "not-found", "title": "a 404 message", "details": "item 1 missing"},
+            {"index": 2, "status": 400, "type": "bad-request", "title": "a 400 message", "details": "bad item"},
+            {"index": 3, "status": 201},
+            {"index": 4, "status": 404, "type": "not-found", "title": "a 404 message"},
+            {"index": 5, "status": 400, "type": "bad-request", "title": "a 400 message", "details": {"field": "name"}},
+        ],
+    }
+
+
+def test_kinds_interned():
+    result = bulk.BulkResult()
+    for i in range(100):
+        result.fail(i, NotFoundError)
+        result.fail(i, BadRequestError(str(i)))
+        result.succeed(i)
+
+    assert len(result._fragments) == 3  # noqa: PLR2004
+
+
+def test_iter_encode_chunks():
+    result = bulk.BulkResult()
+    for i in range(5):
+        result.succeed(i)
+
+    chunks = list(result.iter_encode(chunk_size=2))
+
+    assert len(chunks) == 5  # noqa: PLR2004
+    assert [r["index"] for r in json.loads(b"".join(chunks))["results"]] == [0, 1, 2, 3, 4]
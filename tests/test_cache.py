@@ -0,0 +1,96 @@
+from web_error import cache, error
+
+
+class NotFoundError(error.NotFoundException):
+    title = "a 404 message"
+
+
+def render(exc):
+    calls = []
+
+    def inner():
+        calls.append(exc)
+        return repr(exc.marshal()).encode()
+
+    return inner, calls
+
+
+def test_key_includes_content():
+    key = cache.RenderCache.key
+
+    assert key(NotFoundError("details"), "application/json") == key(NotFoundError("details"), "application/json")
+    assert key(NotFoundError("details"), "application/json") != key(NotFoundError("other"), "application/json")
+    assert key(NotFoundError("details"), "application/json") != key(NotFoundError("details"), "application/cbor")
+    assert key(NotFoundError(a=1), "application/json") != key(NotFoundError(a=True), "application/json")
+    assert key(NotFoundError(a=1, b=2), "application/json") == key(NotFoundError(b=2, a=1), "application/json")
+
+
+def test_key_unhashable():
+    assert cache.RenderCache.key(NotFoundError(errors=[1]), "application/json") is None
+    assert cache.RenderCache.key(NotFoundError(["details"]), "application/json") is None
+
+
+def test_render_hit_and_miss():
+    render_cache = cache.RenderCache()
+    exc = NotFoundError("details")
+    fn, calls = render(exc)
+
+    first = render_cache.render(exc, "application/json", fn)
+    second = render_cache.render(NotFoundError("details"), "application/json", fn)
+
+    assert first is second
+    assert len(calls) == 1
+    assert render_cache.stats() == cache.CacheStats(hits=1, misses=1, evictions=0, bypassed=0, size=1, maxsize=1024)
+
+
+def test_render_unhashable_bypasses():
+    render_cache = cache.RenderCache()
+    exc = NotFoundError(errors=[{"loc": "body"}])
+    fn, calls = render(exc)
+
+    render_cache.render(exc, "application/json", fn)
+    render_cache.render(exc, "application/json", fn)
+
+    assert calls == [exc, exc]
+    assert render_cache.stats() == cache.CacheStats(hits=0, misses=0, evictions=0, bypassed=2, size=0, maxsize=1024)
+
+
+def test_render_evicts_least_recently_used():
+    render_cache = cache.RenderCache(maxsize=2)
+
+    for details in ("a", "b", "a", "c"):
+        exc = NotFoundError(details)
+        render_cache.render(exc, "application/json", render(exc)[0])
+
+    exc = NotFoundError("a")
+    fn, calls = render(exc)
+    render_cache.render(exc, "application/json", fn)
+
+    assert calls == []
+    assert render_cache.stats() == cache.CacheStats(hits=2, misses=3, evictions=1, bypassed=0, size=2, maxsize=2)
+
+
+def test_clear():
+    render_cache = cache.RenderCache()
+    exc = NotFoundError("details")
+    render_cache.render(exc, "application/json", render(exc)[0])
+
+    render_cache.clear()
+
+    assert render_cache.stats() == cache.CacheStats(hits=0, misses=0, evictions=0, bypassed=0, size=0, maxsize=1024)
+
+
+def test_key_title_override():
+    key = cache.RenderCache.key
+    exc = NotFoundError("details")
+
+    assert key(exc, "application/json", title="a 404 message") == key(exc, "application/json")
+    assert key(exc, "application/json", title="Nicht gefunden") != key(exc, "application/json")
+
+
+def test_key_render_mode():
+    key = cache.RenderCache.key
+    exc = NotFoundError("details")
+
+    assert key(exc, "application/json", strip_debug=True) != key(exc, "application/json")
+    assert key(exc, "application/json", legacy=True) != key(exc, "application/json")
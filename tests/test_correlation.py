@@ -0,0 +1,49 @@
+import pytest
+
+from web_error import correlation
+
+TRACEPARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+
+def test_generate_request_id_unique():
+    ids = {correlation.generate_request_id() for _ in range(1000)}
+
+    assert len(ids) == 1000  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ("traceparent", "expected"),
+    [
+        (TRACEPARENT, "4bf92f3577b34da6a3ce929d0e0e4736"),
+        ("00-short-00f067aa0ba902b7-01", None),
+        ("garbage", None),
+    ],
+)
+def test_trace_id(traceparent, expected):
+    assert correlation.trace_id(traceparent) == expected
+
+
+def test_request_id_header():
+    config = correlation.CorrelationConfiguration()
+
+    assert correlation.request_id({"x-request-id": "abc"}, config) == "abc"
+
+
+def test_request_id_traceparent():
+    config = correlation.CorrelationConfiguration(header="traceparent")
+
+    assert correlation.request_id({"traceparent": TRACEPARENT}, config) == "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+def test_request_id_generated(monkeypatch):
+    monkeypatch.setattr(correlation, "generate_request_id", lambda: "generated")
+    config = correlation.CorrelationConfiguration(header="traceparent")
+
+    assert correlation.request_id({}, config) == "generated"
+    assert correlation.request_id({"traceparent": "garbage"}, config) == "generated"
+
+
+def test_request_id_not_generated():
+    config = correlation.CorrelationConfiguration(generate=False)
+
+    assert correlation.request_id({}, config) is None
@@ -0,0 +1,103 @@
+import dataclasses
+import datetime
+import decimal
+import enum
+import json
+import pathlib
+import uuid
+
+import pytest
+
+from web_error import encoding
+from web_error.negotiation import encode_json
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: datetime.date
+
+
+class Money(decimal.Decimal):
+    pass
+
+
+class Unknown:
+    def __str__(self):
+        return "unknown"
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc), "2024-01-02T03:04:05+00:00"),
+        (datetime.date(2024, 1, 2), "2024-01-02"),
+        (datetime.time(3, 4), "03:04:00"),
+        (datetime.timedelta(minutes=1), 60.0),
+        (uuid.UUID("12345678-1234-5678-1234-567812345678"), "12345678-1234-5678-1234-567812345678"),
+        (decimal.Decimal("1.10"), "1.10"),
+        (Money("2.5"), "2.5"),
+        (Color.RED, "red"),
+        ({1}, [1]),
+        (frozenset(), []),
+        (pathlib.PurePosixPath("/tmp/a"), "/tmp/a"),  # noqa: S108
+        (Point(1, datetime.date(2024, 1, 2)), {"x": 1, "y": "2024-01-02"}),
+        (Unknown(), "unknown"),
+    ],
+)
+def test_encode_json(value, expected):
+    assert json.loads(encode_json({"value": value})) == {"value": expected}
+
+
+def test_pydantic_model():
+    pydantic = pytest.importorskip("pydantic")
+
+    class Model(pydantic.BaseModel):
+        id: uuid.UUID
+        at: datetime.date
+
+    model = Model(id=uuid.UUID(int=1), at=datetime.date(2024, 1, 2))
+
+    assert json.loads(encode_json({"model": model})) == {
+        "model": {"id": "00000000-0000-0000-0000-000000000001", "at": "2024-01-02"},
+    }
+
+
+def test_dispatch_cached():
+    encoder = encoding.DefaultEncoder()
+    encoder(Color.RED)
+
+    assert encoder._dispatch == {Color: encoding.ENCODERS[enum.Enum]}
+
+
+def test_register():
+    encoder = encoding.DefaultEncoder()
+    assert encoder(Money("1")) == "1"
+
+    encoder.register(Money, float)
+
+    assert encoder(Money("1")) == 1.0
+    assert encoder(decimal.Decimal("1")) == "1"
+
+
+def test_custom_fallback():
+    encoder = encoding.DefaultEncoder(fallback=repr)
+
+    assert encoder(Unknown()).startswith("<")
+
+
+def test_binary_encoders():
+    msgpack = pytest.importorskip("msgpack")
+    cbor2 = pytest.importorskip("cbor2")
+    from web_error import negotiation
+
+    content = {"at": datetime.date(2024, 1, 2), "color": Color.RED, "point": Point(1, datetime.date(2024, 1, 2))}
+    expected = {"at": "2024-01-02", "color": "red", "point": {"x": 1, "y": "2024-01-02"}}
+
+    assert msgpack.unpackb(negotiation.msgpack_encoder().encode(content)) == expected
+    # cbor2 encodes dates natively.
+    assert cbor2.loads(negotiation.cbor_encoder().encode({"color": Color.RED})) == {"color": "red"}
@@ -1,6 +1,6 @@
 import pytest
 
-from web_error import error
+from web_error import error, type_uri
 
 
 class NotFoundError(error.NotFoundException):
@@ -53,3 +53,35 @@ def test_marshal_legacy():
         "message": "a 500 message",
         "debug_message": "debug_message",
     }
+
+
+class CachedNotFoundError(error.NotFoundException):
+    cache_control = "public, max-age=60"
+
+
+class RetryCachedNotFoundError(CachedNotFoundError):
+    retry_after = 5
+
+
+def test_policy_headers():
+    assert error.HttpException("title").policy_headers == ()
+    assert NotFoundError().policy_headers == ()
+    assert CachedNotFoundError().policy_headers == (("cache-control", "public, max-age=60"),)
+    assert RetryCachedNotFoundError.policy_headers == (
+        ("cache-control", "public, max-age=60"),
+        ("retry-after", "5"),
+    )
+
+
+def test_type_slug_per_class():
+    assert NotFoundError.type_slug == "not-found"
+    assert error.HttpException.type_slug == "http-exception"
+    assert error.HttpException("title").type == "http-exception"
+    assert error.HttpException("title", code="custom").type == "custom"
+
+
+def test_marshal_types():
+    types = type_uri.TypeResolver(type_uri.TypeConfiguration("https://errors.example.com/"))
+
+    assert NotFoundError().marshal(types=types)["type"] == "https://errors.example.com/not-found"
+    assert ALegacyError().marshal(types=types, legacy=True)["code"] == "E500"
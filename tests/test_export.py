@@ -0,0 +1,251 @@
+import asyncio
+import http.server
+import json
+import threading
+from unittest import mock
+
+import pytest
+
+from web_error import export
+
+
+class Sink:
+    def __init__(self):
+        self.batches = []
+        self.sent = asyncio.Event()
+
+    async def send(self, reports):
+        self.batches.append(reports)
+        self.sent.set()
+
+
+class FailingSink:
+    async def send(self, reports):  # noqa: ARG002
+        msg = "tracker unavailable"
+        raise ConnectionError(msg)
+
+
+class SlowSink(Sink):
+    def __init__(self):
+        super().__init__()
+        self.entered = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def send(self, reports):
+        self.entered.set()
+        await self.release.wait()
+        await super().send(reports)
+
+
+def raise_error(message="bad"):
+    raise ValueError(message)
+
+
+def caught(message="bad"):
+    try:
+        raise_error(message)
+    except ValueError as e:
+        return e
+
+
+def request():
+    r = mock.Mock(method="GET")
+    r.url.path = "/items/1"
+    return r
+
+
+@pytest.fixture()
+def tracker():
+    received = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):  # noqa: N802
+            received.append(json.loads(self.rfile.read(int(self.headers["content-length"]))))
+            self.send_response(202)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/reports", received
+    server.shutdown()
+    server.server_close()
+
+
+def test_capture():
+    exc = caught()
+
+    report = export.capture(exc, "unhandled-exception", 500, request(), "req-1", max_frames=1)
+
+    assert report.as_dict() == {
+        "timestamp": report.timestamp,
+        "type": "unhandled-exception",
+        "status": 500,
+        "fingerprint": report.fingerprint,
+        "exception": "builtins.ValueError",
+        "message": "bad",
+        "traceback": mock.ANY,
+        "method": "GET",
+        "path": "/items/1",
+        "request_id": "req-1",
+    }
+    assert len(report.stack) == 1
+    assert report.stack[0].name == "raise_error"
+
+
+def test_fingerprint_ignores_message():
+    a = export.capture(caught("a"), "unhandled-exception", 500)
+    b = export.capture(caught("b"), "unhandled-exception", 500)
+
+    assert a.fingerprint == b.fingerprint
+    assert a.fingerprint != export.capture(ValueError("a"), "unhandled-exception", 500).fingerprint
+
+
+async def test_flush_on_batch_size():
+    sink = Sink()
+    exporter = export.ErrorExporter(sink, batch_size=2, flush_interval=60)
+    await exporter.start()
+
+    exporter.submit(caught(), "unhandled-exception", 500)
+    exporter.submit(caught(), "unhandled-exception", 500)
+    await asyncio.wait_for(sink.sent.wait(), 1)
+    await exporter.stop()
+
+    assert [len(batch) for batch in sink.batches] == [2]
+    assert exporter.stats() == export.ExporterStats(submitted=2, dropped=0, exported=2, failed=0, queued=0)
+
+
+async def test_flush_on_interval():
+    sink = Sink()
+    exporter = export.ErrorExporter(sink, batch_size=100, flush_interval=0.01)
+    await exporter.start()
+
+    exporter.submit(caught(), "unhandled-exception", 500)
+    await asyncio.wait_for(sink.sent.wait(), 1)
+    await exporter.stop()
+
+    assert [len(batch) for batch in sink.batches] == [1]
+
+
+async def test_submit_from_thread():
+    sink = Sink()
+    exporter = export.ErrorExporter(sink, batch_size=1, flush_interval=60)
+    await exporter.start()
+
+    await asyncio.to_thread(exporter.submit, caught(), "unhandled-exception", 500)
+    await asyncio.wait_for(sink.sent.wait(), 1)
+    await exporter.stop()
+
+    assert exporter.stats().exported == 1
+
+
+async def test_bounded_queue_drops():
+    sink = Sink()
+    exporter = export.ErrorExporter(sink, max_queue=2, batch_size=10)
+
+    results = [exporter.submit(caught(), "unhandled-exception", 500) for _ in range(3)]
+
+    assert results == [True, True, False]
+    assert exporter.stats() == export.ExporterStats(submitted=3, dropped=1, exported=0, failed=0, queued=2)
+
+    await exporter.stop()
+
+    assert exporter.stats().exported == 2  # noqa: PLR2004
+
+
+async def test_stop_finishes_in_flight_flush():
+    sink = SlowSink()
+    exporter = export.ErrorExporter(sink, batch_size=5, flush_interval=60)
+    await exporter.start()
+
+    for _ in range(5):
+        exporter.submit(caught(), "unhandled-exception", 500)
+    await asyncio.wait_for(sink.entered.wait(), 1)
+    stopping = asyncio.create_task(exporter.stop())
+    await asyncio.sleep(0)
+    sink.release.set()
+    await asyncio.wait_for(stopping, 1)
+
+    assert [len(batch) for batch in sink.batches] == [5]
+    assert exporter.stats() == export.ExporterStats(submitted=5, dropped=0, exported=5, failed=0, queued=0)
+
+
+async def test_cancelled_flush_requeues_batch():
+    sink = SlowSink()
+    exporter = export.ErrorExporter(sink, batch_size=10)
+    for _ in range(3):
+        exporter.submit(caught(), "unhandled-exception", 500)
+
+    flushing = asyncio.create_task(exporter.flush())
+    await asyncio.wait_for(sink.entered.wait(), 1)
+    flushing.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flushing
+
+    assert exporter.stats() == export.ExporterStats(submitted=3, dropped=0, exported=0, failed=0, queued=3)
+
+
+async def test_sink_failure_counted():
+    exporter = export.ErrorExporter(FailingSink(), batch_size=10)
+    exporter.submit(caught(), "unhandled-exception", 500)
+
+    await exporter.flush()
+
+    assert exporter.stats() == export.ExporterStats(submitted=1, dropped=0, exported=0, failed=1, queued=0)
+
+
+async def test_http_sink(tracker):
+    url, received = tracker
+    exporter = export.ErrorExporter(export.HttpSink(url), batch_size=2)
+    for i in range(3):
+        exporter.submit(caught(f"bad {i}"), "unhandled-exception", 500, request(), f"req-{i}")
+
+    await exporter.flush()
+
+    assert [[report["request_id"] for report in batch] for batch in received] == [["req-0", "req-1"], ["req-2"]]
+    assert received[0][0]["path"] == "/items/1"
+    assert "raise_error" in received[0][0]["traceback"]
+
+
+async def test_file_spool_sink(tmp_path):
+    exporter = export.ErrorExporter(export.FileSpoolSink(tmp_path / "spool"), batch_size=2)
+    for _ in range(3):
+        exporter.submit(caught(), "unhandled-exception", 500)
+
+    await exporter.flush()
+
+    files = sorted((tmp_path / "spool").iterdir())
+    assert all(f.suffix == ".jsonl" for f in files)
+    lines = [json.loads(line) for f in files for line in f.read_text().splitlines()]
+    assert len(files) == 2  # noqa: PLR2004
+    assert [line["exception"] for line in lines] == ["builtins.ValueError"] * 3
+
+
+def test_capture_message_bounded():
+    str_ = mock.Mock(return_value="x" * 10000)
+
+    class QueryError(Exception):
+        __str__ = str_
+
+    assert len(export.capture(QueryError(), "unhandled-exception", 500).message) == export.MESSAGE_LIMIT
+    assert export.capture(QueryError(), "unhandled-exception", 500, message="rendered").message == "rendered"
+    assert str_.call_count == 1
+
+
+def test_bounded_queue_concurrent_submit():
+    exporter = export.ErrorExporter(mock.Mock(), max_queue=1)
+    capture = export.capture
+
+    def capture_during_submit(*args):
+        # Another thread submitting while this report is captured.
+        assert exporter.submit(ValueError("other"), "unhandled-exception", 500) is False
+        return capture(*args)
+
+    with mock.patch.object(export, "capture", capture_during_submit):
+        assert exporter.submit(ValueError("bad"), "unhandled-exception", 500) is True
+
+    stats = exporter.stats()
+    assert (stats.queued, stats.dropped) == (1, 1)
@@ -0,0 +1,110 @@
+import http
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from web_error import error, faults
+from web_error.handler import fastapi, starlette
+
+
+class ItemNotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+def config(seed=0, **kwargs):
+    return faults.FaultConfiguration(
+        faults=[
+            faults.http_code_fault(ItemNotFoundError, 0.25),
+            faults.http_fault(http.HTTPStatus.CONFLICT, 0.25),
+            faults.unhandled_fault(0.25),
+        ],
+        seed=seed,
+        **kwargs,
+    )
+
+
+def test_injector_reproducible():
+    a, b = faults.FaultInjector(config(seed=1)), faults.FaultInjector(config(seed=1))
+
+    def indices(injector):
+        return [injector.faults.index(fault) if fault else None for fault in (injector.choose() for _ in range(100))]
+
+    assert indices(a) == indices(b)
+    assert a.injected == b.injected
+
+
+def test_injector_rates():
+    injector = faults.FaultInjector(config())
+
+    chosen = [injector.choose() for _ in range(10000)]
+
+    assert sum(injector.injected) == sum(fault is not None for fault in chosen)
+    for count in injector.injected:
+        assert 2300 < count < 2700  # noqa: PLR2004
+
+
+@pytest.mark.parametrize("rates", [(0.6, 0.6), (-0.1,), (1.5,)])
+def test_injector_invalid_rates(rates):
+    with pytest.raises(ValueError, match="Fault rates must be between 0 and 1"):
+        faults.FaultInjector(faults.FaultConfiguration([faults.unhandled_fault(rate) for rate in rates]))
+
+
+def test_fault_factories():
+    assert isinstance(faults.http_code_fault(ItemNotFoundError, 1).factory(), ItemNotFoundError)
+    assert faults.http_fault(http.HTTPStatus.CONFLICT, 1).factory().status_code == http.HTTPStatus.CONFLICT
+    assert isinstance(faults.unhandled_fault(1).factory(), faults.InjectedFaultError)
+    assert faults.validation_fault(1).factory().errors()[0]["type"] == "missing"
+
+
+def endpoint(_request):
+    return PlainTextResponse("ok")
+
+
+async def test_injected_in_app():
+    app = Starlette(routes=[Route("/endpoint", endpoint), Route("/health", endpoint)])
+    starlette.add_exception_handler(app)
+    config = faults.FaultConfiguration(
+        faults=[faults.http_code_fault(ItemNotFoundError, 0.25), faults.http_fault(http.HTTPStatus.CONFLICT, 0.25)],
+        exclude_paths=frozenset({"/health"}),
+    )
+    middleware = faults.add_fault_injection(app, config)
+
+    injector = faults.FaultInjector(config)
+    status = dict(zip(injector.faults, (404, 409)))
+    expected = [status.get(injector.choose(), 200) for _ in range(20)]
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://test") as client:
+        assert [(await client.get("/endpoint")).status_code for _ in range(20)] == expected
+        assert {(await client.get("/health")).status_code for _ in range(20)} == {200}
+
+    assert middleware.injector.injected == injector.injected
+
+
+async def test_injected_unhandled():
+    app = Starlette(routes=[Route("/endpoint", endpoint)])
+    starlette.add_exception_handler(app)
+    faults.add_fault_injection(app, faults.FaultConfiguration([faults.unhandled_fault(1)]))
+
+    # Exception handlers run in ServerErrorMiddleware, which re-raises after responding.
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="https://test") as client:
+        r = await client.get("/endpoint")
+
+    assert r.status_code == http.HTTPStatus.INTERNAL_SERVER_ERROR
+    assert r.json()["details"] == "Injected fault."
+
+
+async def test_injected_validation_fault():
+    app = FastAPI()
+    fastapi.add_exception_handler(app)
+    faults.add_fault_injection(app, faults.FaultConfiguration([faults.validation_fault(1)]))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://test") as client:
+        r = await client.get("/endpoint")
+
+    assert r.status_code == http.HTTPStatus.UNPROCESSABLE_ENTITY
+    assert r.json()["errors"] == [{"type": "missing", "loc": ["body", "name"], "msg": "Field required", "input": None}]
@@ -0,0 +1,101 @@
+import sys
+
+import pytest
+
+from web_error import error, group
+
+pytestmark = pytest.mark.skipif(not group.GROUP_TYPES, reason="ExceptionGroup not available")
+
+if sys.version_info < (3, 11):  # pragma: no cover
+    from exceptiongroup import ExceptionGroup
+
+
+class NotFoundError(error.NotFoundException):
+    title = "a 404 message"
+
+
+class BadRequestError(error.BadRequestException):
+    title = "a 400 message"
+
+
+class ServerExceptionError(error.ServerException):
+    title = "a 500 message"
+
+
+@pytest.mark.parametrize(
+    ("statuses", "expected"),
+    [
+        ([404], 404),
+        ([404, 404], 404),
+        ([404, 409], 400),
+        ([404, 503], 500),
+        ([502, 503], 500),
+    ],
+)
+def test_aggregate_status(statuses, expected):
+    assert group.aggregate_status(statuses) == expected
+
+
+def test_is_exception_group():
+    assert group.is_exception_group(ExceptionGroup("group", [NotFoundError()]))
+    assert not group.is_exception_group(NotFoundError())
+
+
+def test_convert_group_flattens_nested():
+    exc = ExceptionGroup(
+        "group",
+        [
+            NotFoundError("a"),
+            ExceptionGroup("nested", [BadRequestError("b"), ExceptionGroup("deeper", [NotFoundError("c")])]),
+            NotFoundError("d"),
+        ],
+    )
+
+    ret = group.convert_group(exc)
+
+    assert ret.marshal() == {
+        "type": "multiple-errors",
+        "title": "Multiple errors occurred.",
+        "status": 400,
+        "errors": [
+            {"type": "not-found", "title": "a 404 message", "details": "a", "status": 404},
+            {"type": "bad-request", "title": "a 400 message", "details": "b", "status": 400},
+            {"type": "not-found", "title": "a 404 message", "details": "c", "status": 404},
+            {"type": "not-found", "title": "a 404 message", "details": "d", "status": 404},
+        ],
+    }
+    assert group.group_status(exc) == ret.status
+
+
+def test_convert_group_single_member():
+    member = NotFoundError("a")
+
+    assert group.convert_group(ExceptionGroup("group", [ExceptionGroup("nested", [member])])) is member
+
+
+def test_convert_group_unhandled_member():
+    exc = ExceptionGroup("group", [NotFoundError("a"), ValueError("b")])
+
+    assert group.convert_group(exc) is None
+    assert group.group_status(exc) is None
+
+
+def test_convert_group_capped():
+    exc = ExceptionGroup("group", [NotFoundError(str(i)) for i in range(5)])
+
+    ret = group.convert_group(exc, max_members=2)
+
+    assert [e["details"] for e in ret.extras["errors"]] == ["0", "1"]
+    assert ret.extras["omitted"] == 3  # noqa: PLR2004
+
+
+def test_convert_group_strip_debug_legacy():
+    exc = ExceptionGroup("group", [NotFoundError("a"), ServerExceptionError("b")])
+
+    ret = group.convert_group(exc, strip_debug=True, legacy=True)
+
+    assert ret.status == 500  # noqa: PLR2004
+    assert ret.details == [
+        {"code": "not-found", "message": "a 404 message"},
+        {"code": "server-exception", "message": "a 500 message"},
+    ]
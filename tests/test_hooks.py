@@ -0,0 +1,87 @@
+from unittest import mock
+
+from starlette.requests import Request
+
+from web_error import error, hooks
+from web_error.handler import starlette
+
+
+class ItemNotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+def request():
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+
+def handler(h):
+    return starlette.exception_handler_factory(mock.Mock(), {}, hooks=h)
+
+
+def test_no_hooks():
+    h = hooks.Hooks()
+
+    assert h.pre_convert_stage() is None
+    assert h.post_render_stage() is None
+    assert h.on_log_stage() is None
+
+
+def test_single_hook_called_directly():
+    def hook(_request, exc):
+        return exc
+
+    assert hooks.Hooks(pre_convert=[hook]).pre_convert_stage() is hook
+
+
+def test_pre_convert_order():
+    h = hooks.Hooks(
+        pre_convert=[
+            lambda _request, exc: ItemNotFoundError(f"{exc.details} a"),
+            lambda _request, exc: ItemNotFoundError(f"{exc.details} b"),
+        ],
+    )
+
+    r = handler(h)(request(), ItemNotFoundError("x"))
+
+    assert b'"details":"x a b"' in r.body
+
+
+def test_post_render_order():
+    calls = []
+
+    def hook(name):
+        def post_render(_request, _exc, response):
+            calls.append(name)
+            response.headers[name] = name
+            return response
+
+        return post_render
+
+    r = handler(hooks.Hooks(post_render=[hook("a"), hook("b")]))(request(), ItemNotFoundError("x"))
+
+    assert (r.headers["a"], r.headers["b"]) == ("a", "b")
+    assert calls == ["a", "b"]
+
+
+def test_pre_convert_and_post_render():
+    replaced = ItemNotFoundError("y")
+    seen = []
+    h = hooks.Hooks(
+        pre_convert=[lambda _request, _exc: replaced],
+        post_render=[lambda _request, exc, response: seen.append(exc) or response],
+    )
+
+    r = handler(h)(request(), ValueError("x"))
+
+    assert r.status_code == 404  # noqa: PLR2004
+    assert seen == [replaced]
+
+
+def test_on_log():
+    a, b = mock.Mock(), mock.Mock()
+    request, exc, ret = mock.Mock(), ValueError("x"), mock.Mock()
+
+    hooks.Hooks(on_log=[a, b]).on_log_stage()(request, exc, ret)
+
+    a.assert_called_once_with(request, exc, ret)
+    b.assert_called_once_with(request, exc, ret)
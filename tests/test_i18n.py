@@ -0,0 +1,65 @@
+import pytest
+
+from web_error import i18n
+
+
+@pytest.fixture()
+def catalog():
+    return i18n.TitleCatalog(
+        {
+            "de": {"Not Found": "Nicht gefunden", "Item not found.": "Artikel nicht gefunden."},
+            "de-AT": {"Item not found.": "Artikel ned gfundn."},
+            "fr": {"Not Found": "Introuvable"},
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    ("accept_language", "expected"),
+    [
+        ("de", ["de"]),
+        ("de-AT,de;q=0.9,en;q=0.8", ["de-at", "de", "en"]),
+        ("en;q=0.5, fr", ["fr", "en"]),
+        ("*, fr;q=0", []),
+    ],
+)
+def test_parse_accept_language(accept_language, expected):
+    assert i18n.parse_accept_language(accept_language) == expected
+
+
+@pytest.mark.parametrize(
+    ("accept_language", "locale"),
+    [
+        (None, None),
+        ("", None),
+        ("en", None),
+        ("de", "de"),
+        ("de-CH", "de"),
+        ("DE-at", "de-AT"),
+        ("de-at", "de-AT"),
+        ("en, fr;q=0.5, de;q=0.8", "de"),
+        ("*", None),
+    ],
+)
+def test_negotiate(catalog, accept_language, locale):
+    assert catalog.negotiate(accept_language) == locale
+
+
+def test_negotiate_cached(catalog):
+    catalog.negotiate("de")
+    catalog.negotiate("de")
+
+    assert catalog.negotiate.cache_info().hits == 1
+
+
+def test_translate(catalog):
+    assert catalog.translate("Not Found", None) is None
+    assert catalog.translate("Not Found", "de") == "Nicht gefunden"
+    assert catalog.translate("Unknown", "de") is None
+    # Region catalogs fall back to the base language.
+    assert catalog.translate("Item not found.", "de-AT") == "Artikel ned gfundn."
+    assert catalog.translate("Not Found", "de-AT") == "Nicht gefunden"
+
+
+def test_missing(catalog):
+    assert catalog.missing(["Not Found", "Item not found."]) == {"fr": ["Item not found."]}
@@ -0,0 +1,183 @@
+import json
+import sys
+
+import pytest
+
+from web_error import negotiation
+
+
+@pytest.fixture()
+def negotiator():
+    pytest.importorskip("msgpack")
+    pytest.importorskip("cbor2")
+    return negotiation.ContentNegotiator(negotiation.available_encoders())
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        ("application/json", ["application/json"]),
+        ("text/html, application/json;q=0.9, */*;q=0.1", ["text/html", "application/json", "*/*"]),
+        ("application/json;q=0.5, application/problem+msgpack", ["application/problem+msgpack", "application/json"]),
+        ("application/json;q=0, text/html", ["text/html"]),
+        ("application/json;q=nope, text/html", ["text/html"]),
+        ("Application/CBOR, ,", ["application/cbor"]),
+    ],
+)
+def test_parse_accept(accept, expected):
+    assert negotiation.parse_accept(accept) == expected
+
+
+@pytest.mark.parametrize(
+    ("accept", "media_type"),
+    [
+        (None, None),
+        ("", None),
+        ("application/json", None),
+        ("*/*", None),
+        ("text/html", None),
+        ("application/problem+msgpack", negotiation.PROBLEM_MSGPACK),
+        ("application/x-msgpack", negotiation.PROBLEM_MSGPACK),
+        ("application/problem+cbor", negotiation.PROBLEM_CBOR),
+        ("application/cbor", negotiation.PROBLEM_CBOR),
+        ("application/problem+json, application/problem+msgpack", None),
+        ("application/problem+json;q=0.5, application/problem+msgpack", negotiation.PROBLEM_MSGPACK),
+        ("text/html, application/problem+cbor;q=0.2", negotiation.PROBLEM_CBOR),
+    ],
+)
+def test_negotiate(negotiator, accept, media_type):
+    encoder = negotiator.negotiate(accept)
+
+    assert (encoder.media_type if encoder else None) == media_type
+
+
+def test_negotiate_without_encoders():
+    negotiator = negotiation.ContentNegotiator([])
+
+    assert negotiator.negotiate("application/problem+msgpack") is None
+
+
+def test_negotiate_cached(negotiator):
+    negotiator.negotiate("application/problem+msgpack")
+    negotiator.negotiate("application/problem+msgpack")
+    negotiator.negotiate("application/json")
+
+    info = negotiator.negotiate.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+
+
+def test_negotiate_cache_bounded():
+    cache_size = 2
+    negotiator = negotiation.ContentNegotiator(negotiation.available_encoders(), cache_size=cache_size)
+
+    for i in range(10):
+        negotiator.negotiate(f"application/x-{i}")
+
+    assert negotiator.negotiate.cache_info().currsize == cache_size
+
+
+def test_encoders_round_trip():
+    msgpack = pytest.importorskip("msgpack")
+    cbor2 = pytest.importorskip("cbor2")
+    content = {"type": "not-found", "title": "Not Found", "status": 404}
+
+    msgpack_encoder = negotiation.msgpack_encoder()
+    cbor_encoder = negotiation.cbor_encoder()
+
+    assert msgpack.unpackb(msgpack_encoder.encode(content)) == content
+    assert cbor2.loads(cbor_encoder.encode(content)) == content
+
+
+def test_missing_encoder_dependency(monkeypatch):
+    monkeypatch.setitem(sys.modules, "msgpack", None)
+    monkeypatch.setitem(sys.modules, "cbor2", None)
+
+    assert negotiation.msgpack_encoder() is None
+    assert negotiation.cbor_encoder() is None
+    assert negotiation.available_encoders() == []
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 10])
+@pytest.mark.parametrize(
+    "content",
+    [
+        {"type": "request-validation-failed", "status": 422, "errors": [{"loc": ["body", i]} for i in range(5)]},
+        {"errors": [1, 2, 3]},
+        {"title": "empty", "errors": []},
+    ],
+)
+def test_iter_encode_json(content, chunk_size):
+    expected = json.loads(negotiation.encode_json(content))
+
+    chunks = list(negotiation.iter_encode_json(dict(content), "errors", chunk_size))
+
+    assert json.loads(b"".join(chunks)) == expected
+    assert len(chunks) == 2 + -(-len(content["errors"]) // chunk_size)
+
+
+@pytest.mark.parametrize(
+    ("headers", "legacy"),
+    [
+        ({}, True),
+        ({"accept": "*/*"}, True),
+        ({"accept": "application/json"}, True),
+        ({"accept": "application/problem+json"}, False),
+        ({"accept": "application/problem+msgpack, application/json;q=0.5"}, False),
+        ({"accept": "application/json, application/problem+json;q=0.5"}, True),
+        ({"accept": "text/html, */*;q=0.1"}, True),
+        ({"accept": "application/json", "x-problem-version": "2"}, False),
+        ({"accept": "application/problem+json", "x-problem-version": "legacy"}, True),
+        ({"accept": "application/problem+json", "x-problem-version": "3"}, False),
+    ],
+)
+def test_format_negotiator(headers, legacy):
+    negotiator = negotiation.FormatNegotiator(negotiation.FormatConfiguration(default_legacy=True))
+
+    assert negotiator.negotiate(headers) is legacy
+
+
+def test_format_negotiator_default_rfc():
+    negotiator = negotiation.FormatNegotiator(
+        negotiation.FormatConfiguration(default_legacy=False, version_header=None),
+    )
+
+    assert negotiator.negotiate({"x-problem-version": "1"}) is False
+    assert negotiator.negotiate({"accept": "application/json"}) is True
+    assert negotiator.vary == "Accept"
+
+
+@pytest.mark.parametrize(
+    ("default_legacy", "legacy", "expected"),
+    [(None, False, False), (None, True, True), (False, True, False)],
+)
+def test_format_negotiator_default(default_legacy, legacy, expected):
+    negotiator = negotiation.FormatNegotiator(
+        negotiation.FormatConfiguration(default_legacy=default_legacy),
+        legacy=legacy,
+    )
+
+    assert negotiator.negotiate({}) is expected
+    assert negotiator.negotiate({"accept": "application/problem+json"}) is False
+
+
+def test_format_negotiator_cached():
+    negotiator = negotiation.FormatNegotiator(negotiation.FormatConfiguration())
+
+    negotiator.negotiate({"accept": "application/json"})
+    negotiator.negotiate({"accept": "application/json", "other": "header"})
+
+    info = negotiator._negotiate_headers.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    assert negotiator.vary == "Accept, x-problem-version"
+
+
+def test_format_negotiator_raw_headers():
+    from starlette.datastructures import Headers
+
+    negotiator = negotiation.FormatNegotiator(negotiation.FormatConfiguration(version_header="X-Problem-Version"))
+    headers = Headers(
+        raw=[(b"accept", b"application/problem+json"), (b"x-problem-version", b"1"), (b"accept", b"application/json")],
+    )
+
+    assert negotiator.negotiate(headers) is True
+    assert negotiator.negotiate(Headers(raw=[(b"accept", b"application/problem+json")])) is False
@@ -0,0 +1,147 @@
+import pytest
+from fastapi import FastAPI
+
+from web_error import error, openapi
+
+
+class ItemNotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+class ItemGoneError(error.HttpCodeException):
+    status = 410
+    title = "Item gone."
+    code = "item-gone"
+
+
+class ArgumentRequiredError(error.BadRequestException):
+    title = "Argument required."
+
+    def __init__(self, argument):
+        super().__init__(argument)
+
+
+@pytest.fixture()
+def app():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/health", responses=openapi.problem_responses(ItemGoneError))
+    def health():
+        return {}
+
+    return app
+
+
+def test_exception_classes():
+    classes = openapi.exception_classes()
+
+    assert error.ServerException in classes
+    assert ItemNotFoundError in classes
+    assert classes.index(error.NotFoundException) < classes.index(ItemNotFoundError)
+    assert ItemNotFoundError in openapi.exception_classes(error.NotFoundException)
+    assert error.ServerException not in openapi.exception_classes(error.NotFoundException)
+
+
+def test_problem_responses():
+    responses = openapi.problem_responses(ItemGoneError)
+
+    assert responses == {
+        410: {
+            "description": "Gone",
+            "content": {
+                "application/problem+json": {
+                    "schema": {"$ref": "#/components/schemas/ProblemDetails"},
+                    "examples": {
+                        "ItemGoneError": {
+                            "summary": "Item gone.",
+                            "value": {"type": "item-gone", "title": "Item gone.", "status": 410},
+                        },
+                    },
+                },
+            },
+        },
+    }
+    # Computed once per set of exceptions.
+    assert openapi.problem_responses(ItemGoneError)[410] is responses[410]
+
+
+def test_example_requires_arguments():
+    responses = openapi.problem_responses(ArgumentRequiredError)
+
+    assert responses[400]["content"]["application/problem+json"]["examples"]["ArgumentRequiredError"] == {
+        "summary": "Argument required.",
+        "value": {"title": "Argument required.", "status": 400},
+    }
+
+
+def test_add_openapi_problem_details(app):
+    openapi.add_openapi_problem_details(app, [ItemNotFoundError, ItemGoneError])
+
+    schema = app.openapi()
+
+    assert schema["components"]["schemas"]["ProblemDetails"] == openapi.PROBLEM_DETAILS_SCHEMA
+    assert set(schema["components"]["responses"]) == {"Problem", "Problem404", "Problem410", "Problem422"}
+    assert schema["components"]["responses"]["Problem404"]["content"]["application/problem+json"]["examples"] == {
+        "ItemNotFoundError": {
+            "summary": "Item not found.",
+            "value": {"type": "item-not-found", "title": "Item not found.", "status": 404},
+        },
+    }
+
+    item_responses = schema["paths"]["/items/{item_id}"]["get"]["responses"]
+    assert item_responses["404"] == {"$ref": "#/components/responses/Problem404"}
+    assert item_responses["422"] == {"$ref": "#/components/responses/Problem422"}
+    assert item_responses["default"] == {"$ref": "#/components/responses/Problem"}
+    assert "200" in item_responses
+
+    health_responses = schema["paths"]["/health"]["get"]["responses"]
+    assert "422" not in health_responses
+    assert health_responses["410"]["content"]["application/problem+json"]["schema"] == {
+        "$ref": "#/components/schemas/ProblemDetails",
+    }
+
+    # Shared refs, not a copy per operation.
+    assert health_responses["404"] is item_responses["404"]
+    assert app.openapi() is schema
+
+
+def test_add_openapi_problem_details_discovered(app):
+    openapi.add_openapi_problem_details(app, openapi.exception_classes(), default=False)
+
+    schema = app.openapi()
+
+    responses = schema["paths"]["/health"]["get"]["responses"]
+    assert "default" not in responses
+    assert responses["404"] == {"$ref": "#/components/responses/Problem404"}
+    assert responses["500"] == {"$ref": "#/components/responses/Problem500"}
+    assert (
+        "ItemNotFoundError"
+        in schema["components"]["responses"]["Problem404"]["content"]["application/problem+json"]["examples"]
+    )
+
+
+def test_add_openapi_problem_details_explicit(app):
+    openapi.add_openapi_problem_details(app)
+
+    schema = app.openapi()
+
+    assert set(schema["components"]["responses"]) == {"Problem", "Problem422"}
+    item_responses = schema["paths"]["/items/{item_id}"]["get"]["responses"]
+    assert item_responses["422"] == {"$ref": "#/components/responses/Problem422"}
+    assert "404" not in item_responses
+
+
+def test_non_standard_status(app):
+    class ClientClosedError(error.HttpCodeException):
+        status = 499
+        title = "Client closed request."
+
+    openapi.add_openapi_problem_details(app, [ClientClosedError])
+
+    responses = app.openapi()["components"]["responses"]
+
+    assert responses["Problem499"]["description"] == "Client Error"
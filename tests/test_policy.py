@@ -0,0 +1,26 @@
+from web_error import policy
+
+
+def test_policy_headers():
+    assert policy.policy_headers() == ()
+    assert policy.policy_headers(cache_control="no-store") == (("cache-control", "no-store"),)
+    assert policy.policy_headers(cache_control="public, max-age=60", retry_after=30) == (
+        ("cache-control", "public, max-age=60"),
+        ("retry-after", "30"),
+    )
+
+
+def test_response_policy_headers():
+    assert policy.ResponsePolicy(retry_after=5).headers == (("retry-after", "5"),)
+
+
+def test_apply_policy_headers_precedence():
+    headers = {"retry-after": "1"}
+
+    policy.apply_policy_headers(
+        headers,
+        (("cache-control", "public, max-age=60"),),
+        (("cache-control", "no-store"), ("retry-after", "30")),
+    )
+
+    assert headers == {"retry-after": "1", "cache-control": "public, max-age=60"}
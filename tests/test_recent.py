@@ -0,0 +1,94 @@
+import pytest
+
+from web_error import recent
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+def raise_error(message="bad"):
+    raise ValueError(message)
+
+
+def caught(message="bad"):
+    try:
+        raise_error(message)
+    except ValueError as e:
+        return e
+
+
+@pytest.fixture()
+def buffer():
+    return recent.RecentErrors(capacity=3, clock=Clock())
+
+
+def test_fingerprint():
+    assert recent.fingerprint(caught("a")) == recent.fingerprint(caught("b"))
+    assert recent.fingerprint(caught()) != recent.fingerprint(ValueError("bad"))
+    assert recent.fingerprint(ValueError()) != recent.fingerprint(KeyError())
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError, match="capacity must be positive"):
+        recent.RecentErrors(capacity=0)
+
+
+def test_recent_newest_first(buffer):
+    buffer.record(404, "not-found", "/items/{id}", caught())
+    buffer.record(500, "unhandled-exception", "/items", caught())
+
+    assert len(buffer) == 2  # noqa: PLR2004
+    assert buffer.recent() == [
+        {
+            "timestamp": 1002.0,
+            "status": 500,
+            "type": "unhandled-exception",
+            "route": "/items",
+            "fingerprint": recent.fingerprint(caught()),
+        },
+        {
+            "timestamp": 1001.0,
+            "status": 404,
+            "type": "not-found",
+            "route": "/items/{id}",
+            "fingerprint": recent.fingerprint(caught()),
+        },
+    ]
+    assert buffer.recent(limit=1)[0]["status"] == 500  # noqa: PLR2004
+
+
+def test_overwrites_oldest(buffer):
+    for status in (400, 401, 403, 404, 500):
+        buffer.record(status, f"error-{status}", None, caught())
+
+    assert len(buffer) == 3  # noqa: PLR2004
+    assert [r["status"] for r in buffer.recent()] == [500, 404, 403]
+
+
+def test_summary(buffer):
+    for status in (404, 404, 500, 404):
+        buffer.record(status, f"error-{status}", None, caught())
+
+    summary = buffer.summary(limit=2)
+
+    assert summary["total"] == 4  # noqa: PLR2004
+    assert summary["statuses"] == {"404": 3, "500": 1}
+    # Types and fingerprints are counted over the buffered records.
+    assert summary["types"] == {"error-404": 2, "error-500": 1}
+    assert summary["fingerprints"] == {recent.fingerprint(caught()): 3}
+    assert [r["status"] for r in summary["recent"]] == [404, 500]
+
+
+def test_clear(buffer):
+    buffer.record(404, "not-found", None, caught())
+    buffer.clear()
+
+    assert len(buffer) == 0
+    assert buffer.summary()["total"] == 0
+    assert buffer.recent() == []
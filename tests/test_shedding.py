@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from web_error import shedding, type_uri
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return Clock()
+
+
+@pytest.fixture()
+def transitions():
+    return []
+
+
+@pytest.fixture()
+def shedder(clock, transitions):
+    config = shedding.SheddingConfiguration(
+        threshold=1.0,
+        window=10.0,
+        buckets=10,
+        on_shed=lambda rate: transitions.append(("shed", rate)),
+        on_recover=lambda rate: transitions.append(("recover", rate)),
+    )
+    return shedding.LoadShedder(config, clock=clock)
+
+
+def test_below_threshold(shedder):
+    assert [shedder.record() for _ in range(9)] == [False] * 9
+    assert shedder.rate() == pytest.approx(0.9)
+
+
+def test_threshold_crossed(shedder, transitions):
+    results = [shedder.record() for _ in range(10)]
+
+    assert results == [False] * 9 + [True]
+    assert shedder.shedding
+    assert transitions == [("shed", 1.0)]
+
+
+def test_window_rolls(shedder, clock):
+    for _ in range(9):
+        shedder.record()
+
+    clock.now += 10
+    assert shedder.rate() == 0
+
+    assert shedder.record() is False
+
+
+def test_recovers(shedder, clock, transitions):
+    for _ in range(10):
+        shedder.record()
+
+    clock.now += 6
+    # 10 errors still in the window, rate above recovery threshold
+    assert shedder.record() is True
+
+    clock.now += 5
+    assert shedder.record() is False
+    assert transitions == [("shed", 1.0), ("recover", 0.2)]
+
+
+def test_log_sampling(clock):
+    config = shedding.SheddingConfiguration(threshold=1.0, log_sample_rate=0.25)
+    shedder = shedding.LoadShedder(config, clock=clock)
+
+    assert [shedder.should_log() for _ in range(8)] == [True, False, False, False] * 2
+
+
+def test_log_sampling_disabled(clock):
+    config = shedding.SheddingConfiguration(threshold=1.0, log_sample_rate=0)
+    shedder = shedding.LoadShedder(config, clock=clock)
+
+    assert shedder.should_log() is False
+
+
+def test_body_pre_encoded(shedder):
+    body = shedder.body(503)
+
+    assert shedder.body(503) is body
+    assert json.loads(body) == {"type": "http-service-unavailable", "title": "Service Unavailable", "status": 503}
+    assert json.loads(shedder.body(503, legacy=True)) == {
+        "code": "http-service-unavailable",
+        "message": "Service Unavailable",
+    }
+
+
+def test_body_non_standard_status(shedder):
+    assert json.loads(shedder.body(499)) == {"type": "http-499", "title": "Client Error", "status": 499}
+
+
+def test_body_type_uri():
+    types = type_uri.TypeResolver(type_uri.TypeConfiguration("https://errors.example.com/"))
+    shedder = shedding.LoadShedder(shedding.SheddingConfiguration(threshold=1), types=types)
+
+    assert json.loads(shedder.body(409))["type"] == "https://errors.example.com/http-conflict"
+    assert json.loads(shedder.body(409, legacy=True))["code"] == "http-conflict"
@@ -0,0 +1,65 @@
+from web_error import error, type_uri
+
+
+class ItemNotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+class CodedError(error.BadRequestException):
+    code = "E400"
+
+
+BASE = "https://errors.example.com/problems/"
+
+
+def test_precomputed():
+    resolver = type_uri.TypeResolver(type_uri.TypeConfiguration(BASE))
+
+    assert resolver.uri("item-not-found") == BASE + "item-not-found"
+    assert resolver.uri("E400") == BASE + "E400"
+    assert resolver.uri("http-conflict") == BASE + "http-conflict"
+    assert resolver.uri("unhandled-exception") == BASE + "unhandled-exception"
+    # Precomputed values are returned as is, not joined per call.
+    assert resolver.uri("item-not-found") is resolver.uri("item-not-found")
+
+
+def test_overrides():
+    resolver = type_uri.TypeResolver(
+        type_uri.TypeConfiguration(
+            BASE,
+            overrides={ItemNotFoundError: "https://docs.example.com/items#missing", "http-conflict": "urn:conflict"},
+        ),
+    )
+
+    assert resolver.resolve(ItemNotFoundError()) == "https://docs.example.com/items#missing"
+    assert resolver.uri("http-conflict") == "urn:conflict"
+    assert resolver.resolve(error.NotFoundException()) == BASE + "not-found-exception"
+
+
+def test_class_overrides_by_class():
+    class ItemNotFound(error.NotFoundException):
+        pass
+
+    resolver = type_uri.TypeResolver(
+        type_uri.TypeConfiguration(BASE, overrides={ItemNotFoundError: "https://docs.example.com/items#missing"}),
+    )
+
+    # Both classes derive the slug "item-not-found", only the overridden class is affected.
+    assert type_uri.class_type(ItemNotFound) == type_uri.class_type(ItemNotFoundError)
+    assert resolver.resolve(ItemNotFoundError()) == "https://docs.example.com/items#missing"
+    assert resolver.resolve(ItemNotFound()) == BASE + "item-not-found"
+    assert resolver.uri("item-not-found") == BASE + "item-not-found"
+
+
+def test_dynamic_slugs_bounded():
+    resolver = type_uri.TypeResolver(type_uri.TypeConfiguration(BASE, max_dynamic=1))
+
+    assert resolver.uri("dynamic-a") == BASE + "dynamic-a"
+    assert resolver.uri("dynamic-a") is resolver.uri("dynamic-a")
+    assert resolver.uri("dynamic-b") == BASE + "dynamic-b"
+    assert resolver.uri("dynamic-b") is not resolver.uri("dynamic-b")
+
+
+def test_class_type():
+    assert type_uri.class_type(ItemNotFoundError) == "item-not-found"
+    assert type_uri.class_type(CodedError) == "E400"
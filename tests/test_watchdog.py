@@ -0,0 +1,138 @@
+import http
+import itertools
+import time
+from unittest import mock
+
+from starlette.responses import Response
+
+from web_error import error, watchdog
+
+
+class ItemNotFoundError(error.NotFoundException):
+    title = "Item not found."
+
+
+def ticking_clock(step):
+    counter = itertools.count()
+    return lambda: next(counter) * step
+
+
+def handler(_request, _exc):
+    return Response(b"content", status_code=404)
+
+
+def test_fast_errors_not_recorded():
+    wd = watchdog.SlowErrorWatchdog(threshold=10, sample_stacks=False, clock=ticking_clock(1))
+
+    wd.wrap(handler)(mock.Mock(), ItemNotFoundError("missing"))
+
+    assert wd.dump() == []
+
+
+def test_slow_error_recorded():
+    wd = watchdog.SlowErrorWatchdog(threshold=1, sample_stacks=False, clock=ticking_clock(1))
+    request = mock.Mock()
+    request.url.path = "/item"
+
+    wd.wrap(handler)(request, ItemNotFoundError("missing", errors=[1, 2, 3]))
+
+    [record] = wd.dump()
+    assert record["duration"] == 1
+    assert record["exception"] == "tests.test_watchdog.ItemNotFoundError"
+    assert record["status"] == http.HTTPStatus.NOT_FOUND
+    assert record["path"] == "/item"
+    assert record["sizes"] == {"args": 15, "errors": 3, "body": 7}
+    assert record["stack"] is None
+
+
+def test_stage_breakdown():
+    wd = watchdog.SlowErrorWatchdog(threshold=1, sample_stacks=False, clock=ticking_clock(1))
+    convert = wd.stage("convert", lambda exc: exc)
+    render = wd.stage("render", handler)
+
+    def staged_handler(request, exc):
+        convert(exc)
+        convert(exc)
+        return render(request, exc)
+
+    wd.wrap(staged_handler)(mock.Mock(), ValueError("x"))
+
+    [record] = wd.dump()
+    assert record["stages"] == {"convert": 2, "render": 1}
+
+
+def test_stage_outside_handler():
+    wd = watchdog.SlowErrorWatchdog(sample_stacks=False)
+
+    assert wd.stage("convert", lambda exc: exc)(1) == 1
+
+
+def test_capacity_bounded():
+    wd = watchdog.SlowErrorWatchdog(threshold=0, capacity=2, sample_stacks=False)
+    eh = wd.wrap(handler)
+
+    for i in range(5):
+        eh(mock.Mock(), ValueError("x" * i))
+
+    assert [r["sizes"]["args"] for r in wd.dump()] == [3, 4]
+
+    wd.clear()
+    assert wd.dump() == []
+
+
+def test_stack_sampled():
+    def blocking_handler(request, exc):
+        time.sleep(0.1)
+        return handler(request, exc)
+
+    wd = watchdog.SlowErrorWatchdog(threshold=0.01)
+    try:
+        wd.wrap(blocking_handler)(mock.Mock(), ValueError("x"))
+    finally:
+        wd.stop()
+
+    [record] = wd.dump()
+    assert any("in blocking_handler" in frame for frame in record["stack"])
+
+
+def test_monitor_lazy():
+    monitors = []
+
+    def recording_handler(request, exc):
+        monitors.append(wd._monitor)
+        return handler(request, exc)
+
+    wd = watchdog.SlowErrorWatchdog(threshold=0.01, idle_timeout=0.02)
+    eh = wd.wrap(recording_handler)
+    assert wd._monitor is None
+
+    eh(mock.Mock(), ValueError("x"))
+
+    [monitor] = monitors
+    monitor.join(timeout=5)
+    assert not monitor.is_alive()
+    assert wd._monitor is None
+
+
+def test_monitor_stop_restarts():
+    wd = watchdog.SlowErrorWatchdog(threshold=0.01, idle_timeout=60)
+    eh = wd.wrap(handler)
+
+    try:
+        eh(mock.Mock(), ValueError("x"))
+        first = wd._monitor
+        wd.stop()
+        assert not first.is_alive()
+        assert wd._monitor is None
+
+        eh(mock.Mock(), ValueError("x"))
+        assert wd._monitor is not None
+        assert wd._monitor is not first
+    finally:
+        wd.stop()
+
+
+def test_payload_sizes_validation_errors():
+    exc = mock.Mock(args=("a", b"bc", 1), errors=lambda: [{}, {}])
+
+    assert watchdog.payload_sizes(exc, mock.Mock(spec=[])) == {"args": 3, "errors": 2, "body": None}
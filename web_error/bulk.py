@@ -0,0 +1,128 @@
+"""Compact per-item results for bulk endpoints.
+
+Bulk endpoints should not fail an entire request on one bad item, but keeping
+an HttpException (and its traceback) per failed item is memory heavy. Results
+are stored as parallel arrays of (index, kind) where a kind is an interned
+(type, title, status), details are only stored for the items that have them.
+Rendering streams a 207 multi-status document from precomputed per-kind
+fragments without building a dict per item.
+"""
+
+from __future__ import annotations
+
+import array
+import http
+import json
+import typing
+
+from web_error.encoding import default
+
+if typing.TYPE_CHECKING:
+    from web_error.error import HttpCodeException, HttpException
+
+MULTI_STATUS = http.HTTPStatus.MULTI_STATUS
+
+
+def _dumps(value: object) -> str:
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=default)
+
+
+class BulkResult:
+    """Accumulate per-item successes and failures."""
+
+    def __init__(self: typing.Self) -> None:
+        self._indexes = array.array("q")
+        self._kinds = array.array("I")
+        self._details: dict[int, bytes] = {}
+        self._fragments: list[bytes] = []
+        self._kind_lookup: dict[typing.Hashable, int] = {}
+        self._failed = 0
+
+    def __len__(self: typing.Self) -> int:
+        return len(self._indexes)
+
+    @property
+    def failed(self: typing.Self) -> int:
+        return self._failed
+
+    @property
+    def succeeded(self: typing.Self) -> int:
+        return len(self._indexes) - self._failed
+
+    def _kind(self: typing.Self, key: typing.Hashable, fragment: typing.Callable[[], str]) -> int:
+        kind = self._kind_lookup.get(key)
+        if kind is None:
+            kind = self._kind_lookup[key] = len(self._fragments)
+            self._fragments.append(fragment().encode())
+        return kind
+
+    def succeed(self: typing.Self, index: int, status: int = http.HTTPStatus.OK) -> None:
+        """Record a successful item."""
+        self._indexes.append(index)
+        self._kinds.append(self._kind(status, lambda: f',"status":{int(status)}'))
+
+    def fail(
+        self: typing.Self,
+        index: int,
+        exc: HttpException | type[HttpCodeException],
+        details: str | None = None,
+    ) -> None:
+        """Record a failed item.
+
+        Args:
+        ----
+            index: Position of the item in the request.
+            exc: An HttpException, or an HttpCodeException subclass to avoid
+                instantiating one per item.
+            details: Item specific details, defaults to the exception details.
+        """
+        if isinstance(exc, type):
+            kind = self._kind_lookup.get(exc)
+            if kind is None:
+                kind = self._kind_lookup[exc] = self._failure_kind(exc())
+        else:
+            kind = self._failure_kind(exc)
+            details = details if details is not None else exc.details
+
+        if details is not None:
+            self._details[len(self._indexes)] = _dumps(details).encode()
+        self._indexes.append(index)
+        self._kinds.append(kind)
+        self._failed += 1
+
+    def _failure_kind(self: typing.Self, exc: HttpException) -> int:
+        return self._kind(
+            (exc.type, exc.title, exc.status),
+            lambda: f',"status":{exc.status},"type":{_dumps(exc.type)},"title":{_dumps(exc.title)}',
+        )
+
+    def iter_encode(self: typing.Self, chunk_size: int = 1000) -> typing.Iterator[bytes]:
+        """Encode the multi-status document in chunks of `chunk_size` items."""
+        yield (
+            f'{{"type":"multi-status","title":"Multi-Status","status":{MULTI_STATUS.value},'
+            f'"succeeded":{self.succeeded},"failed":{self._failed},"results":['
+        ).encode()
+
+        fragments = self._fragments
+        details = self._details
+        indexes = self._indexes
+        kinds = self._kinds
+        for start in range(0, len(indexes), chunk_size):
+            parts = []
+            for pos in range(start, min(start + chunk_size, len(indexes))):
+                detail = details.get(pos)
+                parts.append(
+                    b'{"index":%d%s%s}'
+                    % (
+                        indexes[pos],
+                        fragments[kinds[pos]],
+                        b',"details":' + detail if detail is not None else b"",
+                    ),
+                )
+            chunk = b",".join(parts)
+            yield b"," + chunk if start else chunk
+
+        yield b"]}"
+
+    def encode(self: typing.Self) -> bytes:
+        return b"".join(self.iter_encode())
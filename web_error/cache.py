@@ -0,0 +1,134 @@
+"""Bounded cache of rendered problem bodies.
+
+Many dynamic errors repeat with identical content (the same 404 detail from a
+router, the same upstream failure during an outage), caching the encoded body
+skips marshalling and encoding for repeats.
+"""
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+import threading
+import typing
+
+if typing.TYPE_CHECKING:
+    from web_error.error import HttpException
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    bypassed: int
+    size: int
+    maxsize: int
+
+
+def _freeze(value: object) -> typing.Hashable:
+    # Include the type so equal but differently rendered values (1, 1.0, True)
+    # do not share an entry.
+    hash(value)
+    return (type(value), value)
+
+
+class RenderCache:
+    """Opt-in LRU of encoded response bodies.
+
+    Keyed by (media type, render mode, type, title, status, details, extras),
+    where type is the rendered (resolved) type and the render mode is
+    (strip_debug, legacy), so a cache can be shared between handlers.
+    Exceptions with unhashable details or extras bypass the cache.
+    """
+
+    def __init__(self: typing.Self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._entries: collections.OrderedDict[typing.Hashable, bytes] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._bypassed = 0
+
+    @staticmethod
+    def key(  # noqa: PLR0913
+        exc: HttpException,
+        media_type: str,
+        title: str | None = None,
+        type_: str | None = None,
+        *,
+        strip_debug: bool = False,
+        legacy: bool = False,
+    ) -> typing.Hashable | None:
+        """Generate a cache key, None if the exception content is unhashable.
+
+        title overrides the exception title, i.e. when rendering a translation,
+        and type_ the exception type, i.e. when rendering it as a URI.
+        """
+        try:
+            return (
+                media_type,
+                strip_debug,
+                legacy,
+                exc.type if type_ is None else type_,
+                exc.title if title is None else title,
+                exc.status,
+                _freeze(exc.details),
+                frozenset((k, _freeze(v)) for k, v in exc.extras.items()),
+            )
+        except TypeError:
+            return None
+
+    def render(  # noqa: PLR0913
+        self: typing.Self,
+        exc: HttpException,
+        media_type: str,
+        render: typing.Callable[[], bytes],
+        title: str | None = None,
+        type_: str | None = None,
+        *,
+        strip_debug: bool = False,
+        legacy: bool = False,
+    ) -> bytes:
+        """Return the cached body for exc, rendering and storing it on a miss."""
+        key = self.key(exc, media_type, title, type_, strip_debug=strip_debug, legacy=legacy)
+        if key is None:
+            with self._lock:
+                self._bypassed += 1
+            return render()
+
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return body
+            self._misses += 1
+
+        body = render()
+
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+        return body
+
+    def stats(self: typing.Self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                bypassed=self._bypassed,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+            )
+
+    def clear(self: typing.Self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = self._bypassed = 0
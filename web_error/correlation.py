@@ -0,0 +1,58 @@
+"""Correlate problem responses and log records with a request id.
+
+The id is read from a single configurable header (a W3C `traceparent` header
+contributes its trace id), or generated when missing. Generated ids are a
+random per process prefix and a counter, avoiding a uuid4 per error.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import secrets
+import typing
+
+TRACE_ID_LENGTH = 32
+
+_prefix = secrets.token_hex(6)
+_counter = itertools.count()
+
+
+@dataclasses.dataclass(frozen=True)
+class CorrelationConfiguration:
+    """Configure request correlation.
+
+    Args:
+    ----
+        header: Request header to read the id from, i.e. "x-request-id" or "traceparent".
+        generate: Generate an id if the header is missing.
+        log_key: Log record attribute (`extra`) the id is stored under.
+    """
+
+    header: str = "x-request-id"
+    generate: bool = True
+    log_key: str = "request_id"
+
+
+def generate_request_id() -> str:
+    return f"{_prefix}{next(_counter):012x}"
+
+
+def trace_id(traceparent: str) -> str | None:
+    """Extract the trace id from a W3C traceparent (version-traceid-parentid-flags)."""
+    parts = traceparent.split("-")
+    if len(parts) >= 4 and len(parts[1]) == TRACE_ID_LENGTH:  # noqa: PLR2004
+        return parts[1]
+    return None
+
+
+def request_id(headers: typing.Mapping[str, str], config: CorrelationConfiguration) -> str | None:
+    """Look up (or generate) the request id with a single header lookup."""
+    value = headers.get(config.header)
+    if value and config.header.lower() == "traceparent":
+        value = trace_id(value)
+
+    if not value and config.generate:
+        value = generate_request_id()
+
+    return value
@@ -0,0 +1,95 @@
+"""Encode values that are not natively JSON serializable.
+
+Details and extras may carry datetimes, UUIDs, Decimals, dataclasses, Enums or
+pydantic models. DefaultEncoder is used as the `default` hook of the json and
+binary encoders, the conversion for each type is resolved once (walking the
+MRO) and cached in a dispatch table, unknown types fall back to `str` so
+rendering an error never fails.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import decimal
+import enum
+import pathlib
+import typing
+import uuid
+
+
+def _isoformat(value: datetime.date | datetime.time) -> str:
+    return value.isoformat()
+
+
+def _fields(cls: type) -> typing.Callable[[typing.Any], dict[str, typing.Any]]:
+    names = tuple(field.name for field in dataclasses.fields(cls))
+    return lambda value: {name: getattr(value, name) for name in names}
+
+
+ENCODERS: dict[type, typing.Callable[[typing.Any], typing.Any]] = {
+    datetime.datetime: _isoformat,
+    datetime.date: _isoformat,
+    datetime.time: _isoformat,
+    datetime.timedelta: datetime.timedelta.total_seconds,
+    uuid.UUID: str,
+    decimal.Decimal: str,
+    enum.Enum: lambda value: value.value,
+    set: list,
+    frozenset: list,
+    pathlib.PurePath: str,
+}
+
+
+class DefaultEncoder:
+    """Per type dispatch for the `default` hook of json/msgpack encoders.
+
+    Args:
+    ----
+        encoders: Additional {type: conversion}, subclasses use the conversion
+            of their closest registered base.
+        fallback: Conversion for unknown types.
+    """
+
+    def __init__(
+        self: typing.Self,
+        encoders: dict[type, typing.Callable[[typing.Any], typing.Any]] | None = None,
+        fallback: typing.Callable[[typing.Any], typing.Any] = str,
+    ) -> None:
+        self._encoders = {**ENCODERS, **(encoders or {})}
+        self._fallback = fallback
+        self._dispatch: dict[type, typing.Callable[[typing.Any], typing.Any]] = {}
+
+    def register(self: typing.Self, type_: type, encode: typing.Callable[[typing.Any], typing.Any]) -> None:
+        self._encoders[type_] = encode
+        self._dispatch = {}
+
+    def resolve(self: typing.Self, cls: type) -> typing.Callable[[typing.Any], typing.Any]:
+        """Find the conversion for cls, without caching."""
+        for base in cls.__mro__:
+            if base in self._encoders:
+                return self._encoders[base]
+
+        if dataclasses.is_dataclass(cls):
+            return _fields(cls)
+
+        if hasattr(cls, "model_dump"):
+            # pydantic v2
+            return lambda value: value.model_dump(mode="json")
+
+        if hasattr(cls, "__fields__") and hasattr(cls, "dict"):
+            # pydantic v1
+            return lambda value: value.dict()
+
+        return self._fallback
+
+    def __call__(self: typing.Self, value: object) -> object:
+        cls = type(value)
+        try:
+            encode = self._dispatch[cls]
+        except KeyError:
+            encode = self._dispatch[cls] = self.resolve(cls)
+        return encode(value)
+
+
+default = DefaultEncoder()
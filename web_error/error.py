@@ -8,6 +8,12 @@ from __future__ import annotations
 import re
 import typing
 
+from web_error.policy import policy_headers
+
+if typing.TYPE_CHECKING:
+    from web_error.policy import Headers
+    from web_error.type_uri import TypeResolver
+
 CONVERT_RE = re.compile(r"(?<!^)(?=[A-Z])")
 
 
@@ -18,6 +24,15 @@ class HttpException(Exception):  # noqa: N818
     this will allow all apps and libraries to maintain a common exception chain
     """
 
+    policy_headers: Headers = ()
+    # Problem type derived from the class name, precomputed per class.
+    type_slug: str = "http-exception"
+
+    def __init_subclass__(cls: type[HttpException], **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        type_ = cls.__name__.replace("Error", "")
+        cls.type_slug = CONVERT_RE.sub("-", type_).lower()
+
     def __init__(
         self: typing.Self,
         title: str,
@@ -35,20 +50,25 @@ class HttpException(Exception):  # noqa: N818
 
     @property
     def type(self: typing.Self) -> str:
-        type_ = self.__class__.__name__.replace("Error", "")
-        type_ = CONVERT_RE.sub("-", type_).lower()
-        return self._code if self._code else type_
+        return self._code if self._code else self.type_slug
 
-    def marshal(self: typing.Self, *, strip_debug: bool = False, legacy: bool = False) -> dict[str, typing.Any]:
+    def marshal(
+        self: typing.Self,
+        *,
+        strip_debug: bool = False,
+        legacy: bool = False,
+        types: TypeResolver | None = None,
+    ) -> dict[str, typing.Any]:
         """Generate a JSON compatible representation.
 
         Args:
         ----
             strip_debug: If true, remove anything that is not title/type.
             legacy: Render in pre RFC9547 format.
+            types: Render type as an absolute URI, legacy codes are left bare.
         """
         ret = {
-            "type": self.type,
+            "type": self.type if types is None else types.resolve(self),
             "title": self.title,
             "status": self.status,
         }
@@ -80,6 +100,14 @@ class HttpCodeException(HttpException):
     code = None
     title = "Base http exception."
     status = 500
+    # Response policies, i.e. cache_control = "public, max-age=60" to let CDNs
+    # absorb repeated 404s, or retry_after = 30 on 503s.
+    cache_control: str | None = None
+    retry_after: int | None = None
+
+    def __init_subclass__(cls: type[HttpCodeException], **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.policy_headers = policy_headers(cls.cache_control, cls.retry_after)
 
     def __init__(self: typing.Self, details: str | None = None, **kwargs) -> None:
         super().__init__(self.title, code=self.code, details=details, status=self.status, **kwargs)
@@ -0,0 +1,281 @@
+"""Batched asynchronous export of server error reports.
+
+Forwarding every 5xx to an error tracker inline adds network latency to
+failing requests. The handler only captures a compact report (a stack summary
+without source lines, no frames are retained) into a bounded queue, a
+background task formats and flushes batches to a sink on size/time triggers.
+Reports are dropped, and counted, when the queue is full.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import contextlib
+import dataclasses
+import hashlib
+import itertools
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+import traceback
+import typing
+import urllib.request
+
+from web_error.handler.util import truncate_details
+
+if typing.TYPE_CHECKING:
+    from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+# Bytes of the exception message kept per report.
+MESSAGE_LIMIT = 1024
+
+
+@dataclasses.dataclass(frozen=True)
+class ErrorReport:
+    timestamp: float
+    type: str
+    status: int
+    exception: str
+    message: str
+    stack: traceback.StackSummary
+    method: str | None = None
+    path: str | None = None
+    request_id: str | None = None
+
+    @property
+    def fingerprint(self: typing.Self) -> str:
+        """Identify the error by exception class and code location, ignoring the message."""
+        key = "|".join([self.exception, *(f"{f.filename}:{f.name}:{f.lineno}" for f in self.stack)])
+        return hashlib.sha1(key.encode(), usedforsecurity=False).hexdigest()[:16]
+
+    def as_dict(self: typing.Self) -> dict[str, typing.Any]:
+        return {
+            "timestamp": self.timestamp,
+            "type": self.type,
+            "status": self.status,
+            "fingerprint": self.fingerprint,
+            "exception": self.exception,
+            "message": self.message,
+            "traceback": "".join(self.stack.format()),
+            "method": self.method,
+            "path": self.path,
+            "request_id": self.request_id,
+        }
+
+
+def capture(  # noqa: PLR0913
+    exc: BaseException,
+    type_: str,
+    status: int,
+    request: Request | None = None,
+    request_id: str | None = None,
+    max_frames: int = 20,
+    message: str | None = None,
+) -> ErrorReport:
+    """Capture a compact report, the innermost max_frames frames are kept.
+
+    message defaults to str(exc), pass details already rendered for exc to
+    avoid computing it again.
+    """
+    frames = list(traceback.walk_tb(exc.__traceback__))[-max_frames:]
+    return ErrorReport(
+        timestamp=time.time(),
+        type=type_,
+        status=status,
+        exception=f"{type(exc).__module__}.{type(exc).__qualname__}",
+        message=truncate_details(str(exc) if message is None else message, MESSAGE_LIMIT),
+        stack=traceback.StackSummary.extract(frames, lookup_lines=False, capture_locals=False),
+        method=request.method if request is not None else None,
+        path=request.url.path if request is not None else None,
+        request_id=request_id,
+    )
+
+
+class Sink(typing.Protocol):
+    async def send(self: typing.Self, reports: list[dict[str, typing.Any]]) -> None: ...
+
+
+class HttpSink:
+    """POST batches as a json array to an error tracker endpoint."""
+
+    def __init__(
+        self: typing.Self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        timeout: float = 5.0,
+    ) -> None:
+        self.url = url
+        self.headers = {"content-type": "application/json", **(headers or {})}
+        self.timeout = timeout
+
+    def _post(self: typing.Self, body: bytes) -> None:
+        request = urllib.request.Request(self.url, data=body, headers=self.headers, method="POST")  # noqa: S310
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:  # noqa: S310
+            response.read()
+
+    async def send(self: typing.Self, reports: list[dict[str, typing.Any]]) -> None:
+        await asyncio.to_thread(self._post, json.dumps(reports).encode())
+
+
+class FileSpoolSink:
+    """Spool batches to json lines files, for a local agent to ship."""
+
+    def __init__(self: typing.Self, directory: str | os.PathLike) -> None:
+        self.directory = pathlib.Path(directory)
+        self._sequence = itertools.count()
+
+    def _write(self: typing.Self, reports: list[dict[str, typing.Any]]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{time.time_ns()}-{os.getpid()}-{next(self._sequence)}"
+        tmp = self.directory / f".{name}.tmp"
+        tmp.write_text("".join(json.dumps(report) + "\n" for report in reports))
+        # Rename so readers never see partial files.
+        tmp.replace(self.directory / f"{name}.jsonl")
+
+    async def send(self: typing.Self, reports: list[dict[str, typing.Any]]) -> None:
+        await asyncio.to_thread(self._write, reports)
+
+
+@dataclasses.dataclass(frozen=True)
+class ExporterStats:
+    submitted: int
+    dropped: int
+    exported: int
+    failed: int
+    queued: int
+
+
+class ErrorExporter:
+    """Queue error reports and flush them to a sink from a background task.
+
+    Args:
+    ----
+        sink: Destination for report batches.
+        max_queue: Reports queued before new reports are dropped.
+        batch_size: Reports per batch, a full batch triggers a flush.
+        flush_interval: Seconds between flushes of partial batches.
+        max_frames: Innermost traceback frames kept per report.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self: typing.Self,
+        sink: Sink,
+        *,
+        max_queue: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+        max_frames: int = 20,
+    ) -> None:
+        self.sink = sink
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_frames = max_frames
+        self._queue: collections.deque[ErrorReport] = collections.deque()
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self._pending = 0
+        self._submitted = 0
+        self._dropped = 0
+        self._exported = 0
+        self._failed = 0
+
+    def submit(  # noqa: PLR0913
+        self: typing.Self,
+        exc: BaseException,
+        type_: str,
+        status: int,
+        request: Request | None = None,
+        request_id: str | None = None,
+        message: str | None = None,
+    ) -> bool:
+        """Queue a report for exc, safe to call from any thread. Returns False if dropped."""
+        with self._lock:
+            self._submitted += 1
+            # Reports being captured hold a slot, so concurrent submitters can not overfill the queue.
+            if len(self._queue) + self._pending >= self.max_queue:
+                self._dropped += 1
+                return False
+            self._pending += 1
+
+        try:
+            report = capture(exc, type_, status, request, request_id, self.max_frames, message)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        with self._lock:
+            self._pending -= 1
+            self._queue.append(report)
+            full = len(self._queue) >= self.batch_size
+
+        if full and self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return True
+
+    def stats(self: typing.Self) -> ExporterStats:
+        with self._lock:
+            return ExporterStats(
+                submitted=self._submitted,
+                dropped=self._dropped,
+                exported=self._exported,
+                failed=self._failed,
+                queued=len(self._queue),
+            )
+
+    async def flush(self: typing.Self) -> None:
+        """Send all queued reports in batches."""
+        while True:
+            with self._lock:
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            if not batch:
+                return
+
+            try:
+                await self.sink.send([report.as_dict() for report in batch])
+            except asyncio.CancelledError:
+                # Requeued so the batch is flushed (or accounted for) later.
+                with self._lock:
+                    self._queue.extendleft(reversed(batch))
+                raise
+            except Exception:  # noqa: BLE001
+                logger.warning("Failed to export %d error reports.", len(batch), exc_info=True)
+                with self._lock:
+                    self._failed += len(batch)
+            else:
+                with self._lock:
+                    self._exported += len(batch)
+
+    async def _run(self: typing.Self) -> None:
+        while not self._stopping:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            self._wakeup.clear()
+            await self.flush()
+
+    async def start(self: typing.Self) -> None:
+        """Start the background flush task on the running loop, i.e. in app lifespan."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self: typing.Self) -> None:
+        """Stop the background task, letting an in-flight flush finish, and flush remaining reports."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        self._loop = None
+        await self.flush()
@@ -0,0 +1,146 @@
+"""Inject faults into requests to load test the error path.
+
+FaultInjectionMiddleware raises exceptions, before routing, for a configured
+share of requests, so handler throughput can be measured under a controlled
+error mix without writing failing routes. Decisions are drawn from a seeded
+generator, the same seed and request order inject the same faults.
+
+    add_fault_injection(
+        app,
+        FaultConfiguration(
+            faults=[http_code_fault(NotFoundException, 0.1), unhandled_fault(0.01)],
+            seed=1,
+        ),
+    )
+
+Faults are injected inside the routing layer, where routes raise. Middleware
+added with `app.add_middleware` runs outside starlette's ExceptionMiddleware,
+HTTPException and RequestValidationError faults raised there would bypass
+their handlers and reach the server.
+
+Do not enable in production traffic.
+"""
+
+from __future__ import annotations
+
+import bisect
+import dataclasses
+import itertools
+import random
+import typing
+
+from starlette.exceptions import HTTPException
+
+if typing.TYPE_CHECKING:
+    from starlette.applications import Starlette
+    from starlette.types import ASGIApp, Receive, Scope, Send
+
+    from web_error.error import HttpCodeException
+
+
+class InjectedFaultError(Exception):
+    """Unhandled exception raised by fault injection."""
+
+
+@dataclasses.dataclass(frozen=True)
+class Fault:
+    """
+    Args:
+    ----
+        rate: Share of requests, between 0 and 1, the fault is injected into.
+        factory: Create the exception raised.
+    """
+
+    rate: float
+    factory: typing.Callable[[], Exception]
+
+
+def http_code_fault(cls: type[HttpCodeException], rate: float, details: str = "Injected fault.") -> Fault:
+    return Fault(rate, lambda: cls(details))
+
+
+def http_fault(status: int, rate: float, detail: str | None = None) -> Fault:
+    """Raise starlette HTTPExceptions, converted by the handler (or unhandled_wrappers)."""
+    return Fault(rate, lambda: HTTPException(status, detail))
+
+
+def validation_fault(rate: float, errors: typing.Sequence[dict[str, typing.Any]] | None = None) -> Fault:
+    """Raise fastapi RequestValidationErrors, with a single missing field error by default."""
+    from fastapi.exceptions import RequestValidationError
+
+    errors = errors or [{"type": "missing", "loc": ("body", "name"), "msg": "Field required", "input": None}]
+    return Fault(rate, lambda: RequestValidationError(errors))
+
+
+def unhandled_fault(
+    rate: float,
+    exc_type: type[Exception] = InjectedFaultError,
+    message: str = "Injected fault.",
+) -> Fault:
+    return Fault(rate, lambda: exc_type(message))
+
+
+@dataclasses.dataclass(frozen=True)
+class FaultConfiguration:
+    """
+    Args:
+    ----
+        faults: Faults injected, rates must total at most 1.
+        seed: Seed for injection decisions, None to seed from the OS.
+        exclude_paths: Paths never injected into, i.e. health checks.
+    """
+
+    faults: typing.Sequence[Fault]
+    seed: int | None = 0
+    exclude_paths: frozenset[str] = frozenset()
+
+
+class FaultInjector:
+    """Choose the fault, if any, injected into each request.
+
+    A single draw per request is located in the cumulative rates, with
+    faults = [a (0.1), b (0.2)] draws below 0.1 inject a, below 0.3 inject b.
+    """
+
+    def __init__(self: typing.Self, config: FaultConfiguration) -> None:
+        rates = [fault.rate for fault in config.faults]
+        if any(not 0 <= rate <= 1 for rate in rates) or sum(rates) > 1:
+            msg = f"Fault rates must be between 0 and 1, and total at most 1, got {rates}"
+            raise ValueError(msg)
+
+        self.faults = tuple(config.faults)
+        self._thresholds = list(itertools.accumulate(rates))
+        self._random = random.Random(config.seed)  # noqa: S311
+        self.injected = [0] * len(self.faults)
+
+    def choose(self: typing.Self) -> Fault | None:
+        i = bisect.bisect_right(self._thresholds, self._random.random())
+        if i == len(self.faults):
+            return None
+        self.injected[i] += 1
+        return self.faults[i]
+
+
+class FaultInjectionMiddleware:
+    def __init__(self: typing.Self, app: ASGIApp, config: FaultConfiguration) -> None:
+        self.app = app
+        self.exclude_paths = config.exclude_paths
+        self.injector = FaultInjector(config)
+
+    async def __call__(self: typing.Self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] not in self.exclude_paths:
+            fault = self.injector.choose()
+            if fault is not None:
+                raise fault.factory()
+
+        await self.app(scope, receive, send)
+
+
+def add_fault_injection(app: Starlette, config: FaultConfiguration) -> FaultInjectionMiddleware:
+    """Inject faults into requests to app, inside its routing layer.
+
+    Returns the middleware, its injector counts the faults injected.
+    """
+    middleware = FaultInjectionMiddleware(app.router.middleware_stack, config)
+    app.router.middleware_stack = middleware
+    return middleware
@@ -0,0 +1,113 @@
+"""Render exception groups of HttpExceptions as a single problem.
+
+Concurrent validation (asyncio.TaskGroup) raises ExceptionGroups, where every
+member is an HttpException the group is rendered with each member marshalled
+into an `errors` array.
+
+ExceptionGroup is only available from python 3.11, on earlier versions the
+`exceptiongroup` backport is used if installed, otherwise groups are never
+detected.
+"""
+
+from __future__ import annotations
+
+import typing
+
+from web_error.error import HttpException
+
+if typing.TYPE_CHECKING:
+    from web_error.type_uri import TypeResolver
+
+try:
+    _BaseExceptionGroup = BaseExceptionGroup
+except NameError:  # pragma: no cover
+    try:
+        from exceptiongroup import BaseExceptionGroup as _BaseExceptionGroup
+    except ImportError:
+        _BaseExceptionGroup = None
+
+GROUP_TYPES: tuple[type[BaseException], ...] = (_BaseExceptionGroup,) if _BaseExceptionGroup else ()
+
+
+def is_exception_group(exc: BaseException) -> bool:
+    return isinstance(exc, GROUP_TYPES)
+
+
+def aggregate_status(statuses: typing.Iterable[int]) -> int:
+    """Select a single status for a set of member statuses.
+
+    Identical statuses are kept, otherwise the generic status of the most
+    severe class is used (e.g. 404 + 409 -> 400, 404 + 503 -> 500).
+    """
+    statuses = set(statuses)
+    if len(statuses) == 1:
+        return statuses.pop()
+
+    return max(statuses) // 100 * 100
+
+
+def _leaves(group: BaseException) -> typing.Iterator[BaseException]:
+    stack = [iter(group.exceptions)]
+    while stack:
+        for exc in stack[-1]:
+            if isinstance(exc, GROUP_TYPES):
+                stack.append(iter(exc.exceptions))
+                break
+            yield exc
+        else:
+            stack.pop()
+
+
+def group_status(group: BaseException) -> int | None:
+    """Return the aggregate status of a group, None if it is not all HttpExceptions."""
+    statuses = set()
+    for exc in _leaves(group):
+        if not isinstance(exc, HttpException):
+            return None
+        statuses.add(exc.status)
+
+    return aggregate_status(statuses) if statuses else None
+
+
+def convert_group(
+    group: BaseException,
+    *,
+    strip_debug: bool = False,
+    legacy: bool = False,
+    max_members: int = 100,
+    types: TypeResolver | None = None,
+) -> HttpException | None:
+    """Flatten a group of HttpExceptions into a single HttpException.
+
+    Members are marshalled in a single pass over the (nested) group, at most
+    `max_members` are rendered and the number omitted is reported. Returns
+    None if any member is not an HttpException.
+    """
+    errors = []
+    statuses = set()
+    first = None
+    total = 0
+    for exc in _leaves(group):
+        if not isinstance(exc, HttpException):
+            return None
+
+        total += 1
+        if first is None:
+            first = exc
+        statuses.add(exc.status)
+        if total <= max_members:
+            errors.append(exc.marshal(strip_debug=strip_debug, legacy=legacy, types=types))
+
+    if total <= 1:
+        return first
+
+    extras = {"details": errors} if legacy else {"errors": errors}
+    if total > max_members:
+        extras["omitted"] = total - max_members
+
+    return HttpException(
+        title="Multiple errors occurred.",
+        code="multiple-errors",
+        status=aggregate_status(statuses),
+        **extras,
+    )
@@ -1,131 +1,209 @@
 from __future__ import annotations
 
 import http
-import json
 import logging
 import typing
-from warnings import warn
 
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException
-from starlette.responses import JSONResponse
 
 from web_error.error import HttpCodeException, HttpException
-from web_error.handler.starlette import cors_wrapper_factory
-from web_error.handler.util import convert_status_code
+from web_error.handler import starlette
+from web_error.handler.starlette import (
+    DETAILS_LIMIT,
+    RELEASE_TRACEBACKS,
+    _build_handler,
+    _Conversion,
+    _exception_handler_factory,
+    _warn_legacy,
+)
 
 if typing.TYPE_CHECKING:
     from fastapi import FastAPI
-    from starlette.requests import Request
+    from starlette.responses import Response
 
+    from web_error.cache import RenderCache
+    from web_error.correlation import CorrelationConfiguration
     from web_error.cors import CorsConfiguration
+    from web_error.export import ErrorExporter
+    from web_error.handler.util import WrapperTable
+    from web_error.hooks import Hooks
+    from web_error.i18n import TitleCatalog
+    from web_error.negotiation import FormatConfiguration, ProblemEncoder
+    from web_error.policy import ResponsePolicy
+    from web_error.recent import RecentErrors
+    from web_error.shedding import SheddingConfiguration
+    from web_error.type_uri import TypeConfiguration, TypeResolver
+    from web_error.watchdog import SlowErrorWatchdog
 
 logger_ = logging.getLogger(__name__)
 
 
-def exception_handler_factory(
+def exception_status(exc: Exception, wrappers: WrapperTable) -> int:
+    """Determine the response status for exc without converting it."""
+    if isinstance(exc, RequestValidationError):
+        wrapper = wrappers.get(http.HTTPStatus.UNPROCESSABLE_ENTITY)
+        return wrapper.status if wrapper else http.HTTPStatus.UNPROCESSABLE_ENTITY
+
+    return starlette.exception_status(exc, wrappers)
+
+
+def convert_validation_error(
+    exc: RequestValidationError,
+    wrappers: WrapperTable,
+    *,
+    legacy: bool,
+) -> HttpException:
+    wrapper = wrappers.get(http.HTTPStatus.UNPROCESSABLE_ENTITY)
+    # Errors may contain values that are not JSON serializable, they are
+    # converted by the shared default encoder at render time.
+    errors = exc.errors()
+    kwargs = {"details": errors} if legacy else {"errors": errors}
+    return (
+        wrapper(**kwargs)
+        if wrapper
+        else HttpException(
+            title="Request validation error.",
+            code="request-validation-failed",
+            status=422,
+            **kwargs,
+        )
+    )
+
+
+def convert_exception(  # noqa: PLR0913
+    exc: Exception,
+    wrappers: WrapperTable,
+    *,
+    strip_debug: bool,
+    legacy: bool,
+    max_group_members: int,
+    details_limit: int | None = DETAILS_LIMIT,
+    include_details: bool = True,
+    types: TypeResolver | None = None,
+) -> tuple[HttpException, dict[str, str]]:
+    """Convert exc to an HttpException, and the response headers it carries."""
+    if isinstance(exc, RequestValidationError):
+        return convert_validation_error(exc, wrappers, legacy=legacy), {}
+
+    return starlette.convert_exception(
+        exc,
+        wrappers,
+        strip_debug=strip_debug,
+        legacy=legacy,
+        max_group_members=max_group_members,
+        details_limit=details_limit,
+        include_details=include_details,
+        types=types,
+    )
+
+
+_FASTAPI = _Conversion(
+    convert_exception,
+    exception_status,
+    default_keys=("default", "500"),
+    exceptions=(Exception, HTTPException, RequestValidationError),
+)
+
+
+def exception_handler_factory(  # noqa: PLR0913
     logger: logging.Logger,
     unhandled_wrappers: dict[str, type[HttpCodeException]],
     *,
     strip_debug: bool = False,
     legacy: bool = False,
-) -> typing.Callable[[Exception], JSONResponse]:
-    unhandled_wrappers = unhandled_wrappers or {}
-
-    def exception_handler(_request: Request, exc: Exception) -> JSONResponse:
-        wrapper = unhandled_wrappers.get("default", unhandled_wrappers.get("500"))
-        ret = (
-            wrapper(str(exc))
-            if wrapper
-            else HttpException(
-                title="Unhandled exception occurred.",
-                details=str(exc),
-                code="unhandled-exception",
-            )
-        )
-        headers = {}
-
-        if isinstance(exc, HTTPException):
-            wrapper = unhandled_wrappers.get(str(exc.status_code))
-            details = exc.detail
-            title, code = convert_status_code(exc.status_code)
-            ret = (
-                wrapper(details)
-                if wrapper
-                else HttpException(
-                    title=title,
-                    code=code,
-                    details=details,
-                    status=exc.status_code,
-                )
-            )
-            headers = exc.headers or headers
-
-        if isinstance(exc, RequestValidationError):
-            wrapper = unhandled_wrappers.get("422")
-            errors = json.loads(json.dumps(exc.errors(), default=str))
-            kwargs = {"details": errors} if legacy else {"errors": errors}
-            ret = (
-                wrapper(**kwargs)
-                if wrapper
-                else HttpException(
-                    title="Request validation error.",
-                    code="request-validation-failed",
-                    status=422,
-                    **kwargs,
-                )
-            )
-
-        if isinstance(exc, HttpException):
-            ret = exc
-
-        if ret.status >= http.HTTPStatus.INTERNAL_SERVER_ERROR:
-            logger.exception(ret.title, exc_info=(type(exc), exc, exc.__traceback__))
-
-        if strip_debug and (ret.details or ret.extras):
-            msg = "Stripping debug information from exception."
-            logger.debug(msg)
-
-            for k, v in {
-                "details": ret.details,
-                **ret.extras,
-            }.items():
-                msg = f"Removed {k}: {v}"
-                logger.debug(msg)
-
-        if not legacy:
-            headers["content-type"] = "application/problem+json"
-
-        return JSONResponse(
-            status_code=ret.status,
-            content=ret.marshal(strip_debug=strip_debug, legacy=legacy),
-            headers=headers,
-        )
-
-    return exception_handler
+    encoders: typing.Sequence[ProblemEncoder] | None = None,
+    render_cache: RenderCache | None = None,
+    shedding: SheddingConfiguration | None = None,
+    max_group_members: int = 100,
+    release_tracebacks: typing.Container[int] = RELEASE_TRACEBACKS,
+    policies: dict[int, ResponsePolicy] | None = None,
+    titles: TitleCatalog | None = None,
+    correlation: CorrelationConfiguration | None = None,
+    exporter: ErrorExporter | None = None,
+    recent: RecentErrors | None = None,
+    hooks: Hooks | None = None,
+    stream_threshold: int | None = None,
+    formats: FormatConfiguration | None = None,
+    watchdog: SlowErrorWatchdog | None = None,
+    details_limit: int | None = DETAILS_LIMIT,
+    types: TypeConfiguration | None = None,
+) -> typing.Callable[[Exception], Response]:
+    return _exception_handler_factory(
+        logger,
+        unhandled_wrappers,
+        _FASTAPI,
+        strip_debug=strip_debug,
+        legacy=legacy,
+        encoders=encoders,
+        render_cache=render_cache,
+        shedding=shedding,
+        max_group_members=max_group_members,
+        release_tracebacks=release_tracebacks,
+        policies=policies,
+        titles=titles,
+        correlation=correlation,
+        exporter=exporter,
+        recent=recent,
+        hooks=hooks,
+        stream_threshold=stream_threshold,
+        formats=formats,
+        watchdog=watchdog,
+        details_limit=details_limit,
+        types=types,
+    )
 
 
-def generate_handler(
+def generate_handler(  # noqa: PLR0913
     logger: logging.Logger = logger_,
     cors: CorsConfiguration | None = None,
     unhandled_wrappers: dict[str, type[HttpCodeException]] | None = None,
     *,
     strip_debug: bool = False,
     legacy: bool = False,
+    encoders: typing.Sequence[ProblemEncoder] | None = None,
+    render_cache: RenderCache | None = None,
+    shedding: SheddingConfiguration | None = None,
+    max_group_members: int = 100,
+    release_tracebacks: typing.Container[int] = RELEASE_TRACEBACKS,
+    policies: dict[int, ResponsePolicy] | None = None,
+    titles: TitleCatalog | None = None,
+    correlation: CorrelationConfiguration | None = None,
+    exporter: ErrorExporter | None = None,
+    recent: RecentErrors | None = None,
+    hooks: Hooks | None = None,
+    stream_threshold: int | None = None,
+    formats: FormatConfiguration | None = None,
+    watchdog: SlowErrorWatchdog | None = None,
+    details_limit: int | None = DETAILS_LIMIT,
+    types: TypeConfiguration | None = None,
 ) -> typing.Callable:
     if legacy:
-        warn(
-            "legacy format is deprecated, please convert errors to RFC9547",
-            DeprecationWarning,
-            stacklevel=2,
-        )
-    handler = exception_handler_factory(
-        logger=logger,
-        unhandled_wrappers=unhandled_wrappers,
+        _warn_legacy()
+    return _build_handler(
+        _FASTAPI,
+        logger,
+        cors,
+        unhandled_wrappers,
         strip_debug=strip_debug,
         legacy=legacy,
+        encoders=encoders,
+        render_cache=render_cache,
+        shedding=shedding,
+        max_group_members=max_group_members,
+        release_tracebacks=release_tracebacks,
+        policies=policies,
+        titles=titles,
+        correlation=correlation,
+        exporter=exporter,
+        recent=recent,
+        hooks=hooks,
+        stream_threshold=stream_threshold,
+        formats=formats,
+        watchdog=watchdog,
+        details_limit=details_limit,
+        types=types,
     )
-    return cors_wrapper_factory(cors, handler) if cors else handler
 
 
 def add_exception_handler(  # noqa: PLR0913
@@ -136,8 +214,48 @@ def add_exception_handler(  # noqa: PLR0913
     *,
     strip_debug: bool = False,
     legacy: bool = False,
+    encoders: typing.Sequence[ProblemEncoder] | None = None,
+    render_cache: RenderCache | None = None,
+    shedding: SheddingConfiguration | None = None,
+    max_group_members: int = 100,
+    release_tracebacks: typing.Container[int] = RELEASE_TRACEBACKS,
+    policies: dict[int, ResponsePolicy] | None = None,
+    titles: TitleCatalog | None = None,
+    correlation: CorrelationConfiguration | None = None,
+    exporter: ErrorExporter | None = None,
+    recent: RecentErrors | None = None,
+    hooks: Hooks | None = None,
+    stream_threshold: int | None = None,
+    formats: FormatConfiguration | None = None,
+    watchdog: SlowErrorWatchdog | None = None,
+    details_limit: int | None = DETAILS_LIMIT,
+    types: TypeConfiguration | None = None,
 ) -> None:
-    eh = generate_handler(logger, cors, unhandled_wrappers, strip_debug=strip_debug, legacy=legacy)
-    app.exception_handler(Exception)(eh)
-    app.exception_handler(HTTPException)(eh)
-    app.exception_handler(RequestValidationError)(eh)
+    if legacy:
+        _warn_legacy()
+    eh = _build_handler(
+        _FASTAPI,
+        logger,
+        cors,
+        unhandled_wrappers,
+        strip_debug=strip_debug,
+        legacy=legacy,
+        encoders=encoders,
+        render_cache=render_cache,
+        shedding=shedding,
+        max_group_members=max_group_members,
+        release_tracebacks=release_tracebacks,
+        policies=policies,
+        titles=titles,
+        correlation=correlation,
+        exporter=exporter,
+        recent=recent,
+        hooks=hooks,
+        stream_threshold=stream_threshold,
+        formats=formats,
+        watchdog=watchdog,
+        details_limit=details_limit,
+        types=types,
+    )
+    for exc_type in _FASTAPI.exceptions:
+        app.exception_handler(exc_type)(eh)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import dataclasses
 import http
 import logging
 import typing
@@ -7,25 +8,70 @@ from warnings import warn
 
 from starlette.exceptions import HTTPException
 from starlette.middleware.cors import CORSMiddleware
-from starlette.responses import JSONResponse
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
 
+from web_error.bulk import MULTI_STATUS
+from web_error.correlation import request_id
 from web_error.error import HttpCodeException, HttpException
-from web_error.handler.util import convert_status_code
+from web_error.group import convert_group, group_status, is_exception_group
+from web_error.handler.util import (
+    WrapperTable,
+    bounded_details,
+    check_details_limit,
+    convert_status_code,
+    release_traceback,
+)
+from web_error.negotiation import (
+    PROBLEM_JSON,
+    ContentNegotiator,
+    FormatNegotiator,
+    encode_json,
+    iter_encode_json,
+)
+from web_error.policy import apply_policy_headers
+from web_error.shedding import LoadShedder
+from web_error.type_uri import TypeResolver
 
 if typing.TYPE_CHECKING:
     from starlette.applications import Starlette
     from starlette.requests import Request
 
+    from web_error.bulk import BulkResult
+    from web_error.cache import RenderCache
+    from web_error.correlation import CorrelationConfiguration
     from web_error.cors import CorsConfiguration
+    from web_error.export import ErrorExporter
+    from web_error.hooks import Hooks, OnLogHook
+    from web_error.i18n import TitleCatalog
+    from web_error.negotiation import FormatConfiguration, ProblemEncoder
+    from web_error.policy import ResponsePolicy
+    from web_error.recent import RecentErrors
+    from web_error.shedding import SheddingConfiguration
+    from web_error.type_uri import TypeConfiguration
+    from web_error.watchdog import SlowErrorWatchdog
 
 logger_ = logging.getLogger(__name__)
 
+# Statuses that release exception tracebacks once rendered, only statuses that
+# are not logged (< 500) are released. Opt-in, exceptions handled for Exception
+# (i.e. HttpExceptions) are re-raised to the server by starlette's
+# ServerErrorMiddleware after the response is sent, releasing them drops the
+# frames the server logs. i.e. range(400, 500) where the server does not log them.
+RELEASE_TRACEBACKS: typing.Container[int] = ()
+
+# Entries encoded per chunk of a streamed response.
+STREAM_CHUNK_SIZE = 1000
+
+# Bytes of str(exc) rendered as details for unhandled exceptions.
+DETAILS_LIMIT = 8192
+
 
 def cors_wrapper_factory(
     cors: CorsConfiguration,
-    handler: typing.Callable[[Request, Exception], JSONResponse],
-) -> typing.Callable[[Request, Exception], JSONResponse]:
-    def wrapper(request: Request, exc: Exception) -> JSONResponse:
+    handler: typing.Callable[[Request, Exception], Response],
+) -> typing.Callable[[Request, Exception], Response]:
+    def wrapper(request: Request, exc: Exception) -> Response:
         response = handler(request, exc)
 
         # Since the CORSMiddleware is not executed when an unhandled server exception
@@ -71,94 +117,571 @@ def cors_wrapper_factory(
     return wrapper
 
 
-def exception_handler_factory(
+def log_exception(
     logger: logging.Logger,
-    unhandled_wrappers: dict[str, type[HttpCodeException]],
+    title: str,
+    exc: Exception,
+    extra: dict[str, typing.Any] | None = None,
+) -> None:
+    if extra:
+        logger.exception(title, exc_info=(type(exc), exc, exc.__traceback__), extra=extra)
+    else:
+        logger.exception(title, exc_info=(type(exc), exc, exc.__traceback__))
+
+
+def report_server_error(  # noqa: PLR0913
+    logger: logging.Logger,
+    request: Request,
+    ret: HttpException,
+    exc: Exception,
+    rid: str | None,
     *,
-    strip_debug: bool = False,
-    legacy: bool = False,
-) -> typing.Callable[[Exception], JSONResponse]:
-    unhandled_wrappers = unhandled_wrappers or {}
-
-    def exception_handler(_request: Request, exc: Exception) -> JSONResponse:
-        wrapper = unhandled_wrappers.get("default")
-        ret = (
-            wrapper(str(exc))
-            if wrapper
-            else HttpException(
-                title="Unhandled exception occurred.",
-                details=str(exc),
-                code="unhandled-exception",
-            )
-        )
-        headers = {}
-
-        if isinstance(exc, HTTPException):
-            wrapper = unhandled_wrappers.get(str(exc.status_code))
-            title, code = convert_status_code(exc.status_code)
-            details = exc.detail
-            ret = (
-                wrapper(details)
-                if wrapper
-                else HttpException(
-                    title=title,
-                    code=code,
-                    details=details,
-                    status=exc.status_code,
-                )
-            )
-            headers = exc.headers or headers
+    correlation: CorrelationConfiguration | None,
+    exporter: ErrorExporter | None,
+    on_log: OnLogHook | None = None,
+) -> None:
+    """Log a server error, and queue a report if an exporter is configured."""
+    log_exception(logger, ret.title, exc, {correlation.log_key: rid} if rid else None)
+    if exporter is not None:
+        # Converted unhandled exceptions carry str(exc) as details, already bounded.
+        message = ret.details if ret is not exc and isinstance(ret.details, str) else None
+        exporter.submit(exc, ret.type, ret.status, request, rid, message)
+    if on_log is not None:
+        on_log(request, exc, ret)
 
-        if isinstance(exc, HttpException):
-            ret = exc
 
-        if ret.status >= http.HTTPStatus.INTERNAL_SERVER_ERROR:
-            logger.exception(ret.title, exc_info=(type(exc), exc, exc.__traceback__))
+def request_route(request: Request) -> str | None:
+    """Return the matched route template, falling back to the request path."""
+    path = getattr(request.scope.get("route"), "path", None)
+    return path if isinstance(path, str) else request.url.path
+
 
-        if strip_debug and (ret.details or ret.extras):
-            msg = "Stripping debug information from exception."
+def log_stripped_debug(logger: logging.Logger, ret: HttpException) -> None:
+    if ret.details or ret.extras:
+        msg = "Stripping debug information from exception."
+        logger.debug(msg)
+
+        for k, v in {
+            "details": ret.details,
+            **ret.extras,
+        }.items():
+            msg = f"Removed {k}: {v}"
             logger.debug(msg)
 
-            for k, v in {
-                "details": ret.details,
-                **ret.extras,
-            }.items():
-                msg = f"Removed {k}: {v}"
-                logger.debug(msg)
 
-        if not legacy:
-            headers["content-type"] = "application/problem+json"
+def exception_headers(exc: Exception) -> dict[str, str]:
+    """Copy HTTPException headers, names lowercased to merge with policy and handler headers."""
+    if isinstance(exc, HTTPException) and exc.headers:
+        return {k.lower(): v for k, v in exc.headers.items()}
+    return {}
+
+
+def exception_status(exc: Exception, wrappers: WrapperTable) -> int:
+    """Determine the response status for exc without converting it."""
+    if isinstance(exc, HttpException):
+        return exc.status
+
+    if isinstance(exc, HTTPException):
+        wrapper = wrappers.get(exc.status_code)
+        return wrapper.status if wrapper else exc.status_code
+
+    status = group_status(exc) if is_exception_group(exc) else None
+    if status:
+        return status
+
+    return wrappers.default.status if wrappers.default else http.HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+def convert_exception(  # noqa: PLR0913
+    exc: Exception,
+    wrappers: WrapperTable,
+    *,
+    strip_debug: bool,
+    legacy: bool,
+    max_group_members: int,
+    details_limit: int | None = DETAILS_LIMIT,
+    include_details: bool = True,
+    types: TypeResolver | None = None,
+) -> tuple[HttpException, dict[str, str]]:
+    """Convert exc to an HttpException, and the response headers it carries."""
+    headers = exception_headers(exc)
+
+    if isinstance(exc, HttpException):
+        return exc, headers
+
+    if isinstance(exc, HTTPException):
+        wrapper = wrappers.get(exc.status_code)
+        if wrapper:
+            return wrapper(exc.detail), headers
+        title, code = convert_status_code(exc.status_code)
+        return HttpException(title=title, code=code, details=exc.detail, status=exc.status_code), headers
+
+    if is_exception_group(exc):
+        ret = convert_group(exc, strip_debug=strip_debug, legacy=legacy, max_members=max_group_members, types=types)
+        if ret is not None:
+            return ret, headers
+
+    # str(exc) can be expensive, skip it when details will be neither rendered nor logged.
+    details = bounded_details(exc, details_limit) if include_details else None
+    if wrappers.default:
+        return wrappers.default(details), headers
+    return HttpException(title="Unhandled exception occurred.", details=details, code="unhandled-exception"), headers
+
+
+@dataclasses.dataclass(frozen=True)
+class _Conversion:
+    """
+    Args:
+    ----
+        convert: Convert an exception to an HttpException and its response headers.
+        exception_status: Determine the response status without converting, while shedding load.
+        default_keys: unhandled_wrappers keys checked, in order, for unhandled exceptions.
+        exceptions: Exception classes the handler is registered for.
+    """
 
-        return JSONResponse(
+    convert: typing.Callable[..., tuple[HttpException, dict[str, str]]]
+    exception_status: typing.Callable[[Exception, WrapperTable], int]
+    default_keys: tuple[str, ...] = ("default",)
+    exceptions: tuple[type[Exception], ...] = (Exception, HTTPException)
+
+
+_STARLETTE = _Conversion(convert_exception, exception_status)
+
+
+def shed_response(
+    shedder: LoadShedder,
+    logger: logging.Logger,
+    exc: Exception,
+    status: int,
+    *,
+    legacy: bool,
+) -> Response:
+    """Render a minimal pre-encoded problem while shedding load."""
+    if status >= http.HTTPStatus.INTERNAL_SERVER_ERROR and shedder.should_log():
+        log_exception(logger, "Unhandled exception occurred.", exc)
+
+    headers = exception_headers(exc)
+    headers.setdefault("retry-after", shedder.retry_after)
+
+    media_type = "application/json" if legacy else PROBLEM_JSON
+    if not legacy:
+        headers["content-type"] = media_type
+
+    return Response(
+        status_code=status,
+        content=shedder.body(status, legacy=legacy),
+        headers=headers,
+        media_type=media_type,
+    )
+
+
+def add_vary(headers: dict[str, str], vary: str) -> None:
+    """Add vary to the Vary header, skipping values already present."""
+    current = headers.get("vary")
+    if not current:
+        headers["vary"] = vary
+        return
+
+    present = {v.strip().lower() for v in current.split(",")}
+    missing = [v.strip() for v in vary.split(",") if v.strip().lower() not in present]
+    if missing:
+        headers["vary"] = ", ".join([current, *missing])
+
+
+def localize(
+    request: Request,
+    ret: HttpException,
+    headers: dict[str, str],
+    titles: TitleCatalog,
+) -> str | None:
+    """Return the translated title for the negotiated locale, if any."""
+    locale = titles.negotiate(request.headers.get("accept-language"))
+    title = titles.translate(ret.title, locale)
+    add_vary(headers, "Accept-Language")
+    if title is not None:
+        headers["content-language"] = locale
+    return title
+
+
+def problem_content(  # noqa: PLR0913
+    ret: HttpException,
+    *,
+    strip_debug: bool,
+    legacy: bool,
+    title: str | None,
+    instance: str | None,
+    types: TypeResolver | None = None,
+) -> dict[str, typing.Any]:
+    content = ret.marshal(strip_debug=strip_debug, legacy=legacy, types=types)
+    if title is not None:
+        content["message" if legacy else "title"] = title
+    if instance is not None:
+        content["instance"] = instance
+    return content
+
+
+def streamed_key(ret: HttpException, *, strip_debug: bool, legacy: bool, threshold: int | None) -> str | None:
+    """Return the rendered key holding more than threshold entries, None if the response is not streamed."""
+    if threshold is None or strip_debug:
+        return None
+
+    key, entries = ("debug_message", ret.details) if legacy else ("errors", ret.extras.get("errors"))
+    return key if isinstance(entries, (list, tuple)) and len(entries) > threshold else None
+
+
+def problem_response(  # noqa: PLR0913
+    request: Request,
+    ret: HttpException,
+    headers: dict[str, str],
+    *,
+    strip_debug: bool,
+    legacy: bool,
+    negotiator: ContentNegotiator | None = None,
+    render_cache: RenderCache | None = None,
+    titles: TitleCatalog | None = None,
+    instance: str | None = None,
+    stream_threshold: int | None = None,
+    vary: str | None = None,
+    types: TypeResolver | None = None,
+) -> Response:
+    """Render ret in the negotiated format and locale, reusing cached bodies if enabled.
+
+    instance is added to RFC9457 responses after (cached) rendering, unless
+    ret provides its own. JSON responses with more than stream_threshold
+    errors are streamed.
+    """
+    if "instance" in ret.extras:
+        instance = None
+    if vary:
+        add_vary(headers, vary)
+
+    encoder = None
+    if negotiator:
+        encoder = negotiator.negotiate(request.headers.get("accept"))
+        add_vary(headers, "Accept")
+    if encoder:
+        encode, media_type = encoder.encode, encoder.media_type
+    else:
+        encode, media_type = encode_json, "application/json" if legacy else PROBLEM_JSON
+
+    if not legacy:
+        headers["content-type"] = media_type
+
+    title = localize(request, ret, headers, titles) if titles else None
+
+    def render(instance: str | None = None) -> bytes:
+        return encode(
+            problem_content(
+                ret,
+                strip_debug=strip_debug,
+                legacy=legacy,
+                title=title,
+                instance=instance,
+                types=types,
+            ),
+        )
+
+    key = streamed_key(ret, strip_debug=strip_debug, legacy=legacy, threshold=stream_threshold)
+    if key is not None and encoder is None:
+        content = problem_content(
+            ret,
+            strip_debug=strip_debug,
+            legacy=legacy,
+            title=title,
+            instance=instance,
+            types=types,
+        )
+        return StreamingResponse(
+            iter_encode_json(content, key, STREAM_CHUNK_SIZE),
             status_code=ret.status,
-            content=ret.marshal(strip_debug=strip_debug, legacy=legacy),
             headers=headers,
+            media_type=media_type,
+        )
+
+    if instance is not None and encoder is not None:
+        # Binary formats can not be extended in place.
+        body = render(instance)
+    else:
+        # Cached bodies are shared between handlers, key them by render mode and rendered type.
+        type_ = types.resolve(ret) if types is not None and not legacy else None
+        body = (
+            render_cache.render(ret, media_type, render, title, type_, strip_debug=strip_debug, legacy=legacy)
+            if render_cache
+            else render()
+        )
+        if instance is not None:
+            # Extend the rendered json object, keeping cached bodies reusable.
+            body = b'%s,"instance":%s}' % (body[:-1], encode_json(instance))
+
+    return Response(
+        status_code=ret.status,
+        content=body,
+        headers=headers,
+        media_type=media_type,
+    )
+
+
+def _exception_handler_factory(  # noqa: PLR0913
+    logger: logging.Logger,
+    unhandled_wrappers: dict[str, type[HttpCodeException]] | None,
+    conversion: _Conversion,
+    *,
+    strip_debug: bool = False,
+    legacy: bool = False,
+    encoders: typing.Sequence[ProblemEncoder] | None = None,
+    render_cache: RenderCache | None = None,
+    shedding: SheddingConfiguration | None = None,
+    max_group_members: int = 100,
+    release_tracebacks: typing.Container[int] = RELEASE_TRACEBACKS,
+    policies: dict[int, ResponsePolicy] | None = None,
+    titles: TitleCatalog | None = None,
+    correlation: CorrelationConfiguration | None = None,
+    exporter: ErrorExporter | None = None,
+    recent: RecentErrors | None = None,
+    hooks: Hooks | None = None,
+    stream_threshold: int | None = None,
+    formats: FormatConfiguration | None = None,
+    watchdog: SlowErrorWatchdog | None = None,
+    details_limit: int | None = DETAILS_LIMIT,
+    types: TypeConfiguration | None = None,
+) -> typing.Callable[[Exception], Response]:
+    check_details_limit(details_limit)
+    wrappers = WrapperTable(unhandled_wrappers, default_keys=conversion.default_keys)
+    # Binary formats are negotiated for RFC9457 responses only.
+    format_negotiator = FormatNegotiator(formats, legacy=legacy) if formats else None
+    formats_vary = format_negotiator.vary if format_negotiator else None
+    negotiator = ContentNegotiator(encoders) if encoders and (formats or not legacy) else None
+    type_resolver = TypeResolver(types) if types else None
+    shedder = LoadShedder(shedding, types=type_resolver) if shedding else None
+    status_policies = {status: policy.headers for status, policy in (policies or {}).items()}
+    on_log = hooks.on_log_stage() if hooks else None
+    convert, report, render = conversion.convert, report_server_error, problem_response
+    if watchdog:
+        convert = watchdog.stage("convert", convert)
+        report = watchdog.stage("report", report)
+        render = watchdog.stage("render", render)
+
+    pre_convert = hooks.pre_convert_stage() if hooks else None
+    post_render = hooks.post_render_stage() if hooks else None
+
+    def exception_handler(request: Request, exc: Exception) -> Response:
+        if pre_convert is not None:
+            exc = pre_convert(request, exc)
+
+        is_legacy = format_negotiator.negotiate(request.headers) if format_negotiator else legacy
+
+        if shedder and shedder.record():
+            status = conversion.exception_status(exc, wrappers)
+            response = shed_response(shedder, logger, exc, status, legacy=is_legacy)
+            return post_render(request, exc, response) if post_render is not None else response
+
+        ret, headers = convert(
+            exc,
+            wrappers,
+            strip_debug=strip_debug,
+            legacy=is_legacy,
+            max_group_members=max_group_members,
+            details_limit=details_limit,
+            include_details=not strip_debug or logger.isEnabledFor(logging.DEBUG),
+            types=type_resolver,
         )
 
+        if recent is not None:
+            recent.record(ret.status, ret.type, request_route(request), exc)
+
+        rid = request_id(request.headers, correlation) if correlation else None
+        if ret.status >= http.HTTPStatus.INTERNAL_SERVER_ERROR:
+            report(
+                logger,
+                request,
+                ret,
+                exc,
+                rid,
+                correlation=correlation,
+                exporter=exporter,
+                on_log=on_log,
+            )
+
+        if strip_debug:
+            log_stripped_debug(logger, ret)
+
+        apply_policy_headers(headers, ret.policy_headers, status_policies.get(ret.status, ()))
+
+        response = render(
+            request,
+            ret,
+            headers,
+            strip_debug=strip_debug,
+            legacy=is_legacy,
+            negotiator=None if is_legacy else negotiator,
+            vary=formats_vary,
+            render_cache=render_cache,
+            titles=titles,
+            instance=None if is_legacy else rid,
+            stream_threshold=stream_threshold,
+            types=type_resolver,
+        )
+
+        if post_render is not None:
+            response = post_render(request, exc, response)
+
+        # Logged exceptions keep their traceback, log handlers may format records later.
+        if ret.status < http.HTTPStatus.INTERNAL_SERVER_ERROR and ret.status in release_tracebacks:
+            release_traceback(exc)
+
+        return response
+
     return exception_handler
 
 
-def generate_handler(
+def recent_errors_route(recent: RecentErrors, path: str = "/_errors", limit: int = 50) -> Route:
+    """Create a diagnostics route serving recent error counts and records as problem+json.
+
+    Mount with `app.routes.append(recent_errors_route(recent))`, the number of
+    records can be set with `?limit=`.
+    """
+
+    def endpoint(request: Request) -> Response:
+        try:
+            n = int(request.query_params.get("limit", limit))
+        except ValueError:
+            n = limit
+        content = {"type": "recent-errors", "title": "Recent errors.", "status": 200, **recent.summary(n)}
+        return Response(encode_json(content), media_type=PROBLEM_JSON)
+
+    return Route(path, endpoint, methods=["GET"], include_in_schema=False)
+
+
+def bulk_response(result: BulkResult, chunk_size: int = 1000) -> StreamingResponse:
+    """Stream a 207 multi-status response for a bulk result."""
+    return StreamingResponse(
+        result.iter_encode(chunk_size),
+        status_code=MULTI_STATUS,
+        media_type="application/json",
+    )
+
+
+def _warn_legacy() -> None:
+    # Attributed to the caller of the public function warning.
+    warn(
+        "legacy format is deprecated, please convert errors to RFC9547",
+        DeprecationWarning,
+        stacklevel=3,
+    )
+
+
+def _build_handler(
+    conversion: _Conversion,
+    logger: logging.Logger,
+    cors: CorsConfiguration | None,
+    unhandled_wrappers: dict[str, type[HttpCodeException]] | None,
+    **options,
+) -> typing.Callable:
+    handler = _exception_handler_factory(logger, unhandled_wrappers, conversion, **options)
+    if cors:
+        handler = cors_wrapper_factory(cors, handler)
+    watchdog = options.get("watchdog")
+    return watchdog.wrap(handler) if watchdog else handler
+
+
+def exception_handler_factory(  # noqa: PLR0913
+    logger: logging.Logger,
+    unhandled_wrappers: dict[str, type[HttpCodeException]],
+    *,
+    strip_debug: bool = False,
+    legacy: bool = False,
+    encoders: typing.Sequence[ProblemEncoder] | None = None,
+    render_cache: RenderCache | None = None,
+    shedding: SheddingConfiguration | None = None,
+    max_group_members: int = 100,
+    release_tracebacks: typing.Container[int] = RELEASE_TRACEBACKS,
+    policies: dict[int, ResponsePolicy] | None = None,
+    titles: TitleCatalog | None = None,
+    correlation: CorrelationConfiguration | None = None,
+    exporter: ErrorExporter | None = None,
+    recent: RecentErrors | None = None,
+    hooks: Hooks | None = None,
+    stream_threshold: int | None = None,
+    formats: FormatConfiguration | None = None,
+    watchdog: SlowErrorWatchdog | None = None,
+    details_limit: int | None = DETAILS_LIMIT,
+    types: TypeConfiguration | None = None,
+) -> typing.Callable[[Exception], Response]:
+    return _exception_handler_factory(
+        logger,
+        unhandled_wrappers,
+        _STARLETTE,
+        strip_debug=strip_debug,
+        legacy=legacy,
+        encoders=encoders,
+        render_cache=render_cache,
+        shedding=shedding,
+        max_group_members=max_group_members,
+        release_tracebacks=release_tracebacks,
+        policies=policies,
+        titles=titles,
+        correlation=correlation,
+        exporter=exporter,
+        recent=recent,
+        hooks=hooks,
+        stream_threshold=stream_threshold,
+        formats=formats,
+        watchdog=watchdog,
+        details_limit=details_limit,
+        types=types,
+    )
+
+
+def generate_handler(  # noqa: PLR0913
     logger: logging.Logger = logger_,
     cors: CorsConfiguration | None = None,
     unhandled_wrappers: dict[str, type[HttpCodeException]] | None = None,
     *,
     strip_debug: bool = False,
     legacy: bool = False,
+    encoders: typing.Sequence[ProblemEncoder] | None = None,
+    render_cache: RenderCache | None = None,
+    shedding: SheddingConfiguration | None = None,
+    max_group_members: int = 100,
+    release_tracebacks: typing.Container[int] = RELEASE_TRACEBACKS,
+    policies: dict[int, ResponsePolicy] | None = None,
+    titles: TitleCatalog | None = None,
+    correlation: CorrelationConfiguration | None = None,
+    exporter: ErrorExporter | None = None,
+    recent: RecentErrors | None = None,
+    hooks: Hooks | None = None,
+    stream_threshold: int | None = None,
+    formats: FormatConfiguration | None = None,
+    watchdog: SlowErrorWatchdog | None = None,
+    details_limit: int | None = DETAILS_LIMIT,
+    types: TypeConfiguration | None = None,
 ) -> typing.Callable:
     if legacy:
-        warn(
-            "legacy format is deprecated, please convert errors to RFC9547",
-            DeprecationWarning,
-            stacklevel=2,
-        )
-    handler = exception_handler_factory(
-        logger=logger,
-        unhandled_wrappers=unhandled_wrappers,
+        _warn_legacy()
+    return _build_handler(
+        _STARLETTE,
+        logger,
+        cors,
+        unhandled_wrappers,
         strip_debug=strip_debug,
         legacy=legacy,
+        encoders=encoders,
+        render_cache=render_cache,
+        shedding=shedding,
+        max_group_members=max_group_members,
+        release_tracebacks=release_tracebacks,
+        policies=policies,
+        titles=titles,
+        correlation=correlation,
+        exporter=exporter,
+        recent=recent,
+        hooks=hooks,
+        stream_threshold=stream_threshold,
+        formats=formats,
+        watchdog=watchdog,
+        details_limit=details_limit,
+        types=types,
     )
-    return cors_wrapper_factory(cors, handler) if cors else handler
 
 
 def add_exception_handler(  # noqa: PLR0913
@@ -169,7 +692,48 @@ def add_exception_handler(  # noqa: PLR0913
     *,
     strip_debug: bool = False,
     legacy: bool = False,
+    encoders: typing.Sequence[ProblemEncoder] | None = None,
+    render_cache: RenderCache | None = None,
+    shedding: SheddingConfiguration | None = None,
+    max_group_members: int = 100,
+    release_tracebacks: typing.Container[int] = RELEASE_TRACEBACKS,
+    policies: dict[int, ResponsePolicy] | None = None,
+    titles: TitleCatalog | None = None,
+    correlation: CorrelationConfiguration | None = None,
+    exporter: ErrorExporter | None = None,
+    recent: RecentErrors | None = None,
+    hooks: Hooks | None = None,
+    stream_threshold: int | None = None,
+    formats: FormatConfiguration | None = None,
+    watchdog: SlowErrorWatchdog | None = None,
+    details_limit: int | None = DETAILS_LIMIT,
+    types: TypeConfiguration | None = None,
 ) -> None:
-    eh = generate_handler(logger, cors, unhandled_wrappers, strip_debug=strip_debug, legacy=legacy)
-    app.exception_handler(Exception)(eh)
-    app.exception_handler(HTTPException)(eh)
+    if legacy:
+        _warn_legacy()
+    eh = _build_handler(
+        _STARLETTE,
+        logger,
+        cors,
+        unhandled_wrappers,
+        strip_debug=strip_debug,
+        legacy=legacy,
+        encoders=encoders,
+        render_cache=render_cache,
+        shedding=shedding,
+        max_group_members=max_group_members,
+        release_tracebacks=release_tracebacks,
+        policies=policies,
+        titles=titles,
+        correlation=correlation,
+        exporter=exporter,
+        recent=recent,
+        hooks=hooks,
+        stream_threshold=stream_threshold,
+        formats=formats,
+        watchdog=watchdog,
+        details_limit=details_limit,
+        types=types,
+    )
+    for exc_type in _STARLETTE.exceptions:
+        app.exception_handler(exc_type)(eh)
@@ -1,11 +1,110 @@
 from __future__ import annotations
 
 import http
+import re
+import typing
+
+if typing.TYPE_CHECKING:
+    from web_error.error import HttpCodeException
+
+WRAPPER_KEY_RE = re.compile(r"^(default|[1-5][0-9][0-9]|[1-5]xx)$")
+MAX_STATUS = 600
+# Titles for statuses not in http.HTTPStatus, by status class.
+STATUS_CLASS_TITLES = {4: "Client Error", 5: "Server Error"}
+TRUNCATED_MARKER = "... (truncated)"
 
 
 def convert_status_code(status_code: int) -> tuple[str, str]:
-    """Convert an HTTP status code into a (title, type)."""
-    title = http.HTTPStatus(status_code).phrase
+    """Convert an HTTP status code into a (title, type).
+
+    Statuses not in http.HTTPStatus (i.e. 499) get a generic title for their
+    class and a type including the status.
+    """
+    try:
+        title = http.HTTPStatus(status_code).phrase
+    except ValueError:
+        return STATUS_CLASS_TITLES.get(status_code // 100, "Unknown Status"), f"http-{status_code}"
     code = "-".join(title.lower().split())
 
     return title, f"http-{code}"
+
+
+def release_traceback(exc: BaseException) -> None:
+    """Drop references to the frames and chained exceptions held by exc.
+
+    A traceback pins every frame on the call stack (and their locals), once a
+    response has been rendered for an exception that is not logged they are
+    no longer needed.
+    """
+    stack = [exc]
+    while stack:
+        exc = stack.pop()
+        exc.__traceback__ = None
+        exc.__context__ = None
+        exc.__cause__ = None
+        stack.extend(getattr(exc, "exceptions", ()))
+
+
+def bounded_details(exc: BaseException, limit: int | None) -> str:
+    """Render str(exc) as details, truncated to limit utf-8 encoded bytes."""
+    return truncate_details(str(exc), limit)
+
+
+def check_details_limit(limit: int | None) -> None:
+    """Reject limits that can not fit TRUNCATED_MARKER."""
+    if limit is not None and limit < len(TRUNCATED_MARKER):
+        msg = f"details_limit must fit the truncation marker ({len(TRUNCATED_MARKER)} bytes), got {limit}"
+        raise ValueError(msg)
+
+
+def truncate_details(details: str, limit: int | None) -> str:
+    """Truncate details to limit utf-8 encoded bytes.
+
+    Truncated details end with TRUNCATED_MARKER, the marker is included in limit
+    and left out if limit can not fit it.
+    """
+    # Each character encodes to at most 4 bytes, skip encoding short details.
+    if limit is None or len(details) * 4 <= limit:
+        return details
+
+    # Every character encodes to at least 1 byte, only the prefix can be kept.
+    encoded = details[:limit].encode()
+    if len(details) <= limit and len(encoded) <= limit:
+        return details
+
+    if limit < len(TRUNCATED_MARKER):
+        return encoded[:limit].decode(errors="ignore")
+    return encoded[: limit - len(TRUNCATED_MARKER)].decode(errors="ignore") + TRUNCATED_MARKER
+
+
+class WrapperTable:
+    """unhandled_wrappers normalised into a table indexed by status code.
+
+    Status keys ("404") take precedence over status class keys ("4xx"), the
+    default wrapper is the first of `default_keys` configured. Unknown keys
+    raise a ValueError when the handler is built.
+
+    Args:
+    ----
+        unhandled_wrappers: Mapping of "default", status or status class to wrapper.
+        default_keys: Keys checked, in order, for the unhandled exception wrapper.
+    """
+
+    def __init__(
+        self: typing.Self,
+        unhandled_wrappers: dict[str | int, type[HttpCodeException]] | None,
+        default_keys: tuple[str, ...] = ("default",),
+    ) -> None:
+        wrappers = {str(key).lower(): wrapper for key, wrapper in (unhandled_wrappers or {}).items()}
+        unknown = sorted(key for key in wrappers if not WRAPPER_KEY_RE.match(key))
+        if unknown:
+            msg = f"Unknown unhandled_wrappers keys {unknown}, expected 'default', a status or a status class."
+            raise ValueError(msg)
+
+        self._table: tuple[type[HttpCodeException] | None, ...] = tuple(
+            wrappers.get(str(status), wrappers.get(f"{status // 100}xx")) for status in range(MAX_STATUS)
+        )
+        self.default = next((wrappers[key] for key in default_keys if key in wrappers), None)
+
+    def get(self: typing.Self, status: int) -> type[HttpCodeException] | None:
+        return self._table[status] if 0 <= status < MAX_STATUS else None
@@ -0,0 +1,68 @@
+"""Extension hooks for exception handlers.
+
+Hooks are folded into a single callable per stage when the handler is built,
+the handler calls each stage directly and skips stages without hooks. A stage
+with a single hook is the hook itself.
+
+Stages:
+    pre_convert: `(request, exc) -> exc`, may replace the exception before conversion.
+    post_render: `(request, exc, response) -> response`, may modify or replace the response.
+    on_log: `(request, exc, ret) -> None`, called when a server error is logged.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import typing
+
+if typing.TYPE_CHECKING:
+    from starlette.requests import Request
+    from starlette.responses import Response
+
+    from web_error.error import HttpException
+
+    PreConvertHook = typing.Callable[[Request, Exception], Exception]
+    PostRenderHook = typing.Callable[[Request, Exception, Response], Response]
+    OnLogHook = typing.Callable[[Request, Exception, HttpException], None]
+
+
+@dataclasses.dataclass(frozen=True)
+class Hooks:
+    pre_convert: typing.Sequence[PreConvertHook] = ()
+    post_render: typing.Sequence[PostRenderHook] = ()
+    on_log: typing.Sequence[OnLogHook] = ()
+
+    def pre_convert_stage(self: typing.Self) -> PreConvertHook | None:
+        hooks = tuple(self.pre_convert)
+        if len(hooks) <= 1:
+            return hooks[0] if hooks else None
+
+        def pre_convert(request: Request, exc: Exception) -> Exception:
+            for hook in hooks:
+                exc = hook(request, exc)
+            return exc
+
+        return pre_convert
+
+    def post_render_stage(self: typing.Self) -> PostRenderHook | None:
+        hooks = tuple(self.post_render)
+        if len(hooks) <= 1:
+            return hooks[0] if hooks else None
+
+        def post_render(request: Request, exc: Exception, response: Response) -> Response:
+            for hook in hooks:
+                response = hook(request, exc, response)
+            return response
+
+        return post_render
+
+    def on_log_stage(self: typing.Self) -> OnLogHook | None:
+        hooks = tuple(self.on_log)
+        if len(hooks) <= 1:
+            return hooks[0] if hooks else None
+
+        def on_log(request: Request, exc: Exception, ret: HttpException) -> None:
+            for hook in hooks:
+                hook(request, exc, ret)
+
+        return on_log
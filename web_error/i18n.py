@@ -0,0 +1,71 @@
+"""Localized problem titles.
+
+Catalogs map locales to translated titles, keyed by the untranslated title
+(HttpCodeException.title, or the status phrase for converted starlette
+exceptions). Catalogs are compiled once into a flat table per locale, with
+region locales falling back to their base language, and Accept-Language
+negotiation is memoized per header value. Locales match case-insensitively,
+negotiation returns the tag as configured, for use as Content-Language.
+"""
+
+from __future__ import annotations
+
+import functools
+import typing
+
+from web_error.negotiation import parse_quality_values
+
+
+def parse_accept_language(accept_language: str) -> list[str]:
+    """Parse an Accept-Language header into language tags ordered by preference."""
+    return [tag for tag in parse_quality_values(accept_language) if tag != "*"]
+
+
+class TitleCatalog:
+    """Translate problem titles for the negotiated locale.
+
+    Args:
+    ----
+        catalogs: Mapping of locale (i.e. "de", "pt-BR") to {title: translated title}.
+        cache_size: Maximum number of distinct Accept-Language values memoized.
+    """
+
+    def __init__(self: typing.Self, catalogs: dict[str, dict[str, str]], cache_size: int = 256) -> None:
+        # Lowercased tag to the tag as configured.
+        self._locales = {locale.lower(): locale for locale in catalogs}
+        self._tables = {}
+        for locale, titles in catalogs.items():
+            base_locale = self._locales.get(locale.split("-", 1)[0].lower()) if "-" in locale else None
+            base = catalogs[base_locale] if base_locale is not None else {}
+            self._tables[locale] = {**base, **titles}
+
+        self.negotiate = functools.lru_cache(maxsize=cache_size)(self._negotiate)
+
+    def _negotiate(self: typing.Self, accept_language: str | None) -> str | None:
+        """Return the preferred catalog locale as configured, None if no catalog matches."""
+        if not accept_language:
+            return None
+
+        for tag in parse_accept_language(accept_language):
+            if tag in self._locales:
+                return self._locales[tag]
+            base = tag.split("-", 1)[0]
+            if base in self._locales:
+                return self._locales[base]
+
+        return None
+
+    def translate(self: typing.Self, title: str, locale: str | None) -> str | None:
+        """Return the translated title, None if there is no translation."""
+        if locale is None:
+            return None
+        return self._tables[locale].get(title)
+
+    def missing(self: typing.Self, titles: typing.Iterable[str]) -> dict[str, list[str]]:
+        """Report titles without a translation per locale, i.e. at app startup."""
+        titles = list(titles)
+        return {
+            locale: missing
+            for locale, table in self._tables.items()
+            if (missing := [title for title in titles if title not in table])
+        }
@@ -0,0 +1,227 @@
+"""Content negotiation for problem detail responses.
+
+Problem details default to `application/problem+json`, callers can request
+a binary representation (MessagePack/CBOR) via the `Accept` header when the
+relevant encoder is installed.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import json
+import typing
+
+from web_error.encoding import default
+
+PROBLEM_JSON = "application/problem+json"
+PROBLEM_MSGPACK = "application/problem+msgpack"
+PROBLEM_CBOR = "application/problem+cbor"
+
+JSON_MEDIA_TYPES = frozenset({PROBLEM_JSON, "application/json", "application/*", "*/*"})
+
+
+def encode_json(content: object) -> bytes:
+    """Encode content as starlette's JSONResponse does, with support for non JSON native values."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=default,
+    ).encode("utf-8")
+
+
+def iter_encode_json(content: dict[str, typing.Any], key: str, chunk_size: int = 1000) -> typing.Iterator[bytes]:
+    """Encode content incrementally, the (large) list under key is encoded chunk_size entries at a time.
+
+    The list is moved to the end of the object, only one chunk is encoded at a time.
+    """
+    entries = content.pop(key)
+    envelope = encode_json(content)
+    yield b"%s%s%s:[" % (envelope[:-1], b"," if content else b"", encode_json(key))
+    for start in range(0, len(entries), chunk_size):
+        chunk = encode_json(entries[start : start + chunk_size])
+        yield b"%s%s" % (b"," if start else b"", chunk[1:-1])
+    yield b"]}"
+
+
+@dataclasses.dataclass(frozen=True)
+class ProblemEncoder:
+    media_type: str
+    encode: typing.Callable[[typing.Any], bytes]
+    aliases: tuple[str, ...] = ()
+
+
+def msgpack_encoder() -> ProblemEncoder | None:
+    """Return a MessagePack encoder, or None if msgpack is not installed."""
+    try:
+        import msgpack
+    except ImportError:
+        return None
+
+    return ProblemEncoder(
+        media_type=PROBLEM_MSGPACK,
+        encode=functools.partial(msgpack.packb, default=default),
+        aliases=("application/msgpack", "application/x-msgpack"),
+    )
+
+
+def _cbor_default(encoder: typing.Any, value: object) -> None:  # noqa: ANN401
+    encoder.encode(default(value))
+
+
+def cbor_encoder() -> ProblemEncoder | None:
+    """Return a CBOR encoder, or None if cbor2 is not installed."""
+    try:
+        import cbor2
+    except ImportError:
+        return None
+
+    return ProblemEncoder(
+        media_type=PROBLEM_CBOR,
+        encode=functools.partial(cbor2.dumps, default=_cbor_default),
+        aliases=("application/cbor",),
+    )
+
+
+def available_encoders() -> list[ProblemEncoder]:
+    """Return all binary encoders installed in the current environment."""
+    return [encoder for encoder in (msgpack_encoder(), cbor_encoder()) if encoder is not None]
+
+
+def parse_quality_values(header: str) -> list[str]:
+    """Parse a comma separated header with q parameters into values ordered by preference.
+
+    Values with q=0 are dropped, ties keep header order.
+    """
+    values = []
+    for i, part in enumerate(header.split(",")):
+        value, *params = part.split(";")
+        value = value.strip().lower()
+        if not value:
+            continue
+
+        q = 1.0
+        for param in params:
+            key, _, q_value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(q_value)
+                except ValueError:
+                    q = 0.0
+
+        if q > 0:
+            values.append((-q, i, value))
+
+    return [value for _, _, value in sorted(values)]
+
+
+def parse_accept(accept: str) -> list[str]:
+    """Parse an Accept header into media types ordered by preference."""
+    return parse_quality_values(accept)
+
+
+class ContentNegotiator:
+    """Select a problem encoder for an Accept header.
+
+    Results are cached per distinct header value, the cache is bounded as
+    header values are client controlled.
+    """
+
+    def __init__(self: typing.Self, encoders: typing.Sequence[ProblemEncoder], cache_size: int = 256) -> None:
+        self._encoders = {}
+        for encoder in encoders:
+            self._encoders[encoder.media_type] = encoder
+            for alias in encoder.aliases:
+                self._encoders[alias] = encoder
+
+        self.negotiate = functools.lru_cache(maxsize=cache_size)(self._negotiate)
+
+    def _negotiate(self: typing.Self, accept: str | None) -> ProblemEncoder | None:
+        """Return the preferred binary encoder, None indicates json."""
+        if not accept or not self._encoders:
+            return None
+
+        for media_type in parse_accept(accept):
+            if media_type in self._encoders:
+                return self._encoders[media_type]
+            if media_type in JSON_MEDIA_TYPES:
+                return None
+
+        return None
+
+
+@dataclasses.dataclass(frozen=True)
+class FormatConfiguration:
+    """Choose legacy or RFC9457 output per request.
+
+    A version header takes precedence over Accept, where
+    `application/problem+*` selects RFC9457 and `application/json` selects
+    legacy output. Requests expressing no preference get the default.
+
+    Args:
+    ----
+        default_legacy: Render legacy output when the request has no preference, None
+            to follow the handler's legacy option.
+        version_header: Header selecting the format, i.e. "x-problem-version: 2".
+        legacy_versions: Header values selecting legacy output.
+        rfc_versions: Header values selecting RFC9457 output.
+        cache_size: Maximum number of distinct header values memoized.
+    """
+
+    default_legacy: bool | None = None
+    version_header: str | None = "x-problem-version"
+    legacy_versions: frozenset[str] = frozenset({"1", "legacy"})
+    rfc_versions: frozenset[str] = frozenset({"2", "rfc9457"})
+    cache_size: int = 256
+
+
+class FormatNegotiator:
+    """Decide per request whether to render legacy output, memoized per header values."""
+
+    def __init__(self: typing.Self, config: FormatConfiguration, *, legacy: bool = False) -> None:
+        self.config = config
+        self.default_legacy = legacy if config.default_legacy is None else config.default_legacy
+        self.vary = f"Accept, {config.version_header}" if config.version_header else "Accept"
+        self._version_key = config.version_header.lower().encode("latin-1") if config.version_header else None
+        self._negotiate_headers = functools.lru_cache(maxsize=config.cache_size)(self._negotiate)
+
+    def negotiate(self: typing.Self, headers: typing.Mapping[str, str]) -> bool:
+        """Return True if legacy output should be rendered."""
+        raw = getattr(headers, "raw", None)
+        if raw is None:
+            version = headers.get(self.config.version_header) if self.config.version_header else None
+            return self._negotiate_headers(headers.get("accept"), version)
+
+        # Single pass over starlette's raw headers, missing header lookups are
+        # comparatively expensive.
+        accept = version = None
+        for key, value in raw:
+            if key == b"accept":
+                accept = accept or value
+            elif key == self._version_key:
+                version = version or value
+        return self._negotiate_headers(accept, version)
+
+    def _negotiate(self: typing.Self, accept: str | bytes | None, version: str | bytes | None) -> bool:
+        if isinstance(accept, bytes):
+            accept = accept.decode("latin-1")
+        if isinstance(version, bytes):
+            version = version.decode("latin-1")
+
+        if version is not None:
+            version = version.strip().lower()
+            if version in self.config.legacy_versions:
+                return True
+            if version in self.config.rfc_versions:
+                return False
+
+        for media_type in parse_accept(accept or ""):
+            if media_type.startswith("application/problem+"):
+                return False
+            if media_type == "application/json":
+                return True
+
+        return self.default_legacy
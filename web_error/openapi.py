@@ -0,0 +1,176 @@
+"""Document problem detail responses in FastAPI OpenAPI schemas.
+
+A shared `ProblemDetails` component schema and one component response per
+status (with an example per documented HttpCodeException subclass) are
+generated once, operations reference them via `$ref` so large apps do not
+build schema dicts per route.
+"""
+
+from __future__ import annotations
+
+import functools
+import http
+import typing
+
+from web_error.error import HttpCodeException
+from web_error.handler.util import convert_status_code
+from web_error.negotiation import PROBLEM_JSON
+
+if typing.TYPE_CHECKING:
+    from fastapi import FastAPI
+
+PROBLEM_DETAILS = "ProblemDetails"
+PROBLEM_DETAILS_REF = f"#/components/schemas/{PROBLEM_DETAILS}"
+
+PROBLEM_DETAILS_SCHEMA = {
+    "title": PROBLEM_DETAILS,
+    "type": "object",
+    "properties": {
+        "type": {"type": "string", "title": "Type"},
+        "title": {"type": "string", "title": "Title"},
+        "status": {"type": "integer", "title": "Status"},
+        "details": {"title": "Details"},
+    },
+    "required": ["type", "title", "status"],
+    "additionalProperties": True,
+}
+
+VALIDATION_EXAMPLE = {
+    "type": "request-validation-failed",
+    "title": "Request validation error.",
+    "status": 422,
+    "errors": [{"type": "missing", "loc": ["body", "name"], "msg": "Field required", "input": {}}],
+}
+
+OPERATIONS = frozenset({"get", "put", "post", "delete", "options", "head", "patch", "trace"})
+
+
+def exception_classes(base: type[HttpCodeException] = HttpCodeException) -> tuple[type[HttpCodeException], ...]:
+    """Return all subclasses of base, in definition order."""
+    classes = []
+    stack = list(reversed(base.__subclasses__()))
+    while stack:
+        cls = stack.pop()
+        classes.append(cls)
+        stack.extend(reversed(cls.__subclasses__()))
+    return tuple(classes)
+
+
+def _example(cls: type[HttpCodeException]) -> dict[str, typing.Any]:
+    try:
+        value = cls().marshal()
+    except TypeError:
+        # Subclass requires constructor arguments.
+        value = {"title": cls.title, "status": cls.status}
+    return {"summary": cls.title, "value": value}
+
+
+@functools.lru_cache(maxsize=None)
+def _responses(exceptions: tuple[type[HttpCodeException], ...]) -> dict[int, dict[str, typing.Any]]:
+    examples: dict[int, dict[str, typing.Any]] = {}
+    for cls in exceptions:
+        examples.setdefault(cls.status, {})[cls.__name__] = _example(cls)
+
+    examples.setdefault(http.HTTPStatus.UNPROCESSABLE_ENTITY, {})["RequestValidationError"] = {
+        "summary": VALIDATION_EXAMPLE["title"],
+        "value": VALIDATION_EXAMPLE,
+    }
+
+    return {
+        status: {
+            "description": convert_status_code(status)[0],
+            "content": {
+                PROBLEM_JSON: {
+                    "schema": {"$ref": PROBLEM_DETAILS_REF},
+                    "examples": examples[status],
+                },
+            },
+        }
+        for status in sorted(examples)
+    }
+
+
+def problem_responses(*exceptions: type[HttpCodeException]) -> dict[int | str, dict[str, typing.Any]]:
+    """Generate route `responses=` entries for the provided exceptions.
+
+    Requires the `ProblemDetails` component, see add_openapi_problem_details.
+    """
+    responses = _responses(tuple(exceptions))
+    return {cls.status: responses[cls.status] for cls in exceptions}
+
+
+def _add_components(
+    schema: dict[str, typing.Any],
+    classes: tuple[type[HttpCodeException], ...],
+    *,
+    default: bool,
+) -> dict[str, dict[str, str]]:
+    """Register shared components, return the $ref per documented status."""
+    components = schema.setdefault("components", {})
+    components.setdefault("schemas", {})[PROBLEM_DETAILS] = PROBLEM_DETAILS_SCHEMA
+    component_responses = components.setdefault("responses", {})
+
+    refs = {}
+    for status, response in _responses(classes).items():
+        name = f"Problem{status}"
+        component_responses[name] = response
+        refs[str(status)] = {"$ref": f"#/components/responses/{name}"}
+
+    if default:
+        component_responses["Problem"] = {
+            "description": "Problem details",
+            "content": {PROBLEM_JSON: {"schema": {"$ref": PROBLEM_DETAILS_REF}}},
+        }
+        refs["default"] = {"$ref": "#/components/responses/Problem"}
+
+    return refs
+
+
+def add_openapi_problem_details(
+    app: FastAPI,
+    exceptions: typing.Iterable[type[HttpCodeException]] | None = None,
+    *,
+    default: bool = True,
+) -> None:
+    """Inject problem detail schemas and responses into `app.openapi()`.
+
+    Args:
+    ----
+        app: FastAPI application.
+        exceptions: Exceptions to document on every operation, i.e.
+            `exception_classes(MyAppError)`. Subclasses are not discovered
+            implicitly, as every imported library's exceptions would be added.
+        default: Document ProblemDetails as the default response of every operation.
+    """
+    original = app.openapi
+
+    def openapi() -> dict[str, typing.Any]:
+        if app.openapi_schema:
+            return app.openapi_schema
+
+        schema = original()
+        classes = tuple(exceptions or ())
+        refs = _add_components(schema, classes, default=default)
+
+        # FastAPI documents validation errors in its own format, the handler
+        # renders them as problem details. Only document 422 on operations
+        # that validate input, unless an exception uses the status.
+        validation_ref = refs["422"]
+        if not any(cls.status == http.HTTPStatus.UNPROCESSABLE_ENTITY for cls in classes):
+            del refs["422"]
+
+        # Operations share a single $ref dict per status.
+        for path in schema.get("paths", {}).values():
+            for method, operation in path.items():
+                if method not in OPERATIONS:
+                    continue
+                responses = operation.setdefault("responses", {})
+                if "422" in responses:
+                    responses["422"] = validation_ref
+                for status, ref in refs.items():
+                    responses.setdefault(status, ref)
+
+        app.openapi_schema = schema
+        return schema
+
+    app.openapi = openapi
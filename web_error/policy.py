@@ -0,0 +1,47 @@
+"""Response caching and retry policies for problem responses.
+
+Policies are rendered into header tuples once, when an exception class is
+defined or a handler is generated, so attaching them costs no string building
+per request.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import typing
+
+Headers = typing.Tuple[typing.Tuple[str, str], ...]
+
+
+def policy_headers(cache_control: str | None = None, retry_after: int | None = None) -> Headers:
+    headers = []
+    if cache_control is not None:
+        headers.append(("cache-control", cache_control))
+    if retry_after is not None:
+        headers.append(("retry-after", str(retry_after)))
+    return tuple(headers)
+
+
+@dataclasses.dataclass(frozen=True)
+class ResponsePolicy:
+    """Cache-Control and Retry-After applied to every response with a status.
+
+    Args:
+    ----
+        cache_control: Cache-Control header value, i.e. "public, max-age=60".
+        retry_after: Retry-After header value in seconds.
+    """
+
+    cache_control: str | None = None
+    retry_after: int | None = None
+
+    @property
+    def headers(self: typing.Self) -> Headers:
+        return policy_headers(self.cache_control, self.retry_after)
+
+
+def apply_policy_headers(headers: dict[str, str], *policies: Headers) -> None:
+    """Add policy headers, earlier policies and existing headers take precedence."""
+    for policy in policies:
+        for k, v in policy:
+            headers.setdefault(k, v)
@@ -0,0 +1,123 @@
+"""Fixed capacity buffer of recently handled errors.
+
+Records are stored in preallocated parallel arrays, appending overwrites the
+oldest slot so memory use is constant regardless of error volume. Errors are
+fingerprinted by exception class and the innermost frame, which is cheap
+enough to run for every handled error.
+"""
+
+from __future__ import annotations
+
+import array
+import collections
+import functools
+import hashlib
+import threading
+import time
+import typing
+
+
+@functools.lru_cache(maxsize=1024)
+def _fingerprint(name: str, filename: str, lineno: int) -> str:
+    return hashlib.sha1(f"{name}|{filename}:{lineno}".encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+def fingerprint(exc: BaseException) -> str:
+    """Identify an error by exception class and the location it was raised from."""
+    name = f"{type(exc).__module__}.{type(exc).__qualname__}"
+    tb = exc.__traceback__
+    if tb is None:
+        return _fingerprint(name, "", 0)
+    while tb.tb_next is not None:
+        tb = tb.tb_next
+    return _fingerprint(name, tb.tb_frame.f_code.co_filename, tb.tb_lineno)
+
+
+class RecentErrors:
+    """Ring buffer of the last `capacity` handled errors.
+
+    Args:
+    ----
+        capacity: Number of records retained.
+        clock: Timestamp source, defaults to wall clock time.
+    """
+
+    def __init__(self: typing.Self, capacity: int = 1024, clock: typing.Callable[[], float] = time.time) -> None:
+        if capacity < 1:
+            msg = "capacity must be positive"
+            raise ValueError(msg)
+
+        self.capacity = capacity
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._timestamps = array.array("d", [0.0]) * capacity
+        self._statuses = array.array("H", [0]) * capacity
+        self._types: list[str | None] = [None] * capacity
+        self._routes: list[str | None] = [None] * capacity
+        self._fingerprints: list[str | None] = [None] * capacity
+        self._next = 0
+        self._total = 0
+        # Bounded by the number of status codes.
+        self._status_totals: collections.Counter[int] = collections.Counter()
+
+    def record(self: typing.Self, status: int, type_: str, route: str | None, exc: BaseException) -> None:
+        fp = fingerprint(exc)
+        now = self._clock()
+        with self._lock:
+            i = self._next
+            self._timestamps[i] = now
+            self._statuses[i] = status
+            self._types[i] = type_
+            self._routes[i] = route
+            self._fingerprints[i] = fp
+            self._next = (i + 1) % self.capacity
+            self._total += 1
+            self._status_totals[status] += 1
+
+    def __len__(self: typing.Self) -> int:
+        return min(self._total, self.capacity)
+
+    def recent(self: typing.Self, limit: int | None = None) -> list[dict[str, typing.Any]]:
+        """Return buffered records, newest first."""
+        with self._lock:
+            size = min(self._total, self.capacity)
+            count = size if limit is None else max(0, min(limit, size))
+            slots = [(self._next - 1 - n) % self.capacity for n in range(count)]
+            return [
+                {
+                    "timestamp": self._timestamps[i],
+                    "status": self._statuses[i],
+                    "type": self._types[i],
+                    "route": self._routes[i],
+                    "fingerprint": self._fingerprints[i],
+                }
+                for i in slots
+            ]
+
+    def summary(self: typing.Self, limit: int | None = 50) -> dict[str, typing.Any]:
+        """Aggregate counts since startup, per type and fingerprint over the buffer, and recent records."""
+        with self._lock:
+            total = self._total
+            statuses = {str(status): count for status, count in sorted(self._status_totals.items())}
+            size = min(total, self.capacity)
+            types = collections.Counter(self._types[:size] if size < self.capacity else self._types)
+            fingerprints = collections.Counter(
+                self._fingerprints[:size] if size < self.capacity else self._fingerprints,
+            )
+
+        return {
+            "total": total,
+            "statuses": statuses,
+            "types": dict(types.most_common()),
+            "fingerprints": dict(fingerprints.most_common()),
+            "recent": self.recent(limit),
+        }
+
+    def clear(self: typing.Self) -> None:
+        with self._lock:
+            self._types[:] = [None] * self.capacity
+            self._routes[:] = [None] * self.capacity
+            self._fingerprints[:] = [None] * self.capacity
+            self._next = 0
+            self._total = 0
+            self._status_totals.clear()
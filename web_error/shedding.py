@@ -0,0 +1,130 @@
+"""Adaptive degradation of error rendering under high error rates.
+
+During incidents the error path itself becomes a hotspot, once the recent
+error rate crosses a threshold handlers switch to minimal pre-encoded
+responses until the rate recovers.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import threading
+import time
+import typing
+
+from web_error.handler.util import convert_status_code
+from web_error.negotiation import encode_json
+
+if typing.TYPE_CHECKING:
+    from web_error.type_uri import TypeResolver
+
+
+@dataclasses.dataclass
+class SheddingConfiguration:
+    """Configure overload shedding.
+
+    Args:
+    ----
+        threshold: Errors per second (over the window) that enable shedding.
+        recover_threshold: Errors per second below which shedding is disabled,
+            defaults to half the threshold.
+        window: Length of the rolling window in seconds.
+        buckets: Number of buckets the window is split into.
+        retry_after: Retry-After seconds sent with shed responses.
+        log_sample_rate: Fraction of server errors logged while shedding.
+        on_shed: Called with the current rate when shedding starts.
+        on_recover: Called with the current rate when shedding stops.
+    """
+
+    threshold: float
+    recover_threshold: float | None = None
+    window: float = 10.0
+    buckets: int = 10
+    retry_after: int = 5
+    log_sample_rate: float = 0.01
+    on_shed: typing.Callable[[float], None] | None = None
+    on_recover: typing.Callable[[float], None] | None = None
+
+
+class LoadShedder:
+    """Track the error rate in a bucketed rolling window."""
+
+    def __init__(
+        self: typing.Self,
+        config: SheddingConfiguration,
+        clock: typing.Callable[[], float] = time.monotonic,
+        types: TypeResolver | None = None,
+    ) -> None:
+        self.config = config
+        self._clock = clock
+        self._types = types
+        self._width = config.window / config.buckets
+        self._recover = config.threshold / 2 if config.recover_threshold is None else config.recover_threshold
+        self._counts = [0] * config.buckets
+        self._epochs = [-1] * config.buckets
+        self._log_every = max(1, round(1 / config.log_sample_rate)) if config.log_sample_rate > 0 else 0
+        self._shed_count = 0
+        self._lock = threading.Lock()
+        self._bodies: dict[tuple[int, bool], bytes] = {}
+        self.retry_after = str(config.retry_after)
+        self.shedding = False
+
+    def _rate(self: typing.Self, epoch: int) -> float:
+        oldest = epoch - self.config.buckets
+        total = sum(count for count, e in zip(self._counts, self._epochs) if e > oldest)
+        return total / self.config.window
+
+    def record(self: typing.Self) -> bool:
+        """Record an error, return True if the response should be shed."""
+        epoch = int(self._clock() // self._width)
+        slot = epoch % self.config.buckets
+        transition = None
+
+        with self._lock:
+            if self._epochs[slot] != epoch:
+                self._epochs[slot] = epoch
+                self._counts[slot] = 0
+            self._counts[slot] += 1
+
+            rate = self._rate(epoch)
+            if not self.shedding and rate >= self.config.threshold:
+                self.shedding = True
+                self._shed_count = 0
+                transition = self.config.on_shed
+            elif self.shedding and rate < self._recover:
+                self.shedding = False
+                transition = self.config.on_recover
+            shedding = self.shedding
+
+        if transition:
+            transition(rate)
+
+        return shedding
+
+    def rate(self: typing.Self) -> float:
+        """Return the current error rate in errors per second."""
+        with self._lock:
+            return self._rate(int(self._clock() // self._width))
+
+    def should_log(self: typing.Self) -> bool:
+        """Sample logging while shedding."""
+        if not self._log_every:
+            return False
+
+        with self._lock:
+            self._shed_count += 1
+            return (self._shed_count - 1) % self._log_every == 0
+
+    def body(self: typing.Self, status: int, *, legacy: bool = False) -> bytes:
+        """Return the pre-encoded minimal problem body for a status."""
+        key = (status, legacy)
+        body = self._bodies.get(key)
+        if body is None:
+            title, code = convert_status_code(status)
+            if legacy:
+                content = {"code": code, "message": title}
+            else:
+                type_ = code if self._types is None else self._types.uri(code)
+                content = {"type": type_, "title": title, "status": status}
+            body = self._bodies[key] = encode_json(content)
+        return body
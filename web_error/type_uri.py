@@ -0,0 +1,87 @@
+"""Resolve problem type slugs to absolute URIs.
+
+RFC9457 `type` is a URI reference clients can dereference for documentation,
+slugs are mapped once to `base_uri + slug`, or an explicit override, so
+rendering a problem does a single dict lookup. Overrides for a class apply to
+that class only, other classes deriving the same slug keep `base_uri + slug`.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import http
+import typing
+
+from web_error.error import HttpException
+from web_error.handler.util import convert_status_code
+
+# Slugs of problems created by the handlers rather than an exception class.
+HANDLER_TYPES = ("unhandled-exception", "multiple-errors")
+
+
+@dataclasses.dataclass(frozen=True)
+class TypeConfiguration:
+    """
+    Args:
+    ----
+        base_uri: Prefix for type slugs, i.e. "https://errors.example.com/problems/".
+        overrides: URIs for specific exception classes (excluding subclasses), or slugs, replacing base_uri + slug.
+        max_dynamic: Limit on slugs outside the precomputed map that are remembered.
+    """
+
+    base_uri: str
+    overrides: dict[type[HttpException] | str, str] = dataclasses.field(default_factory=dict)
+    max_dynamic: int = 1024
+
+
+def class_type(cls: type[HttpException]) -> str:
+    """Return the type rendered for instances of cls."""
+    return getattr(cls, "code", None) or cls.type_slug
+
+
+def exception_classes(base: type[HttpException] = HttpException) -> typing.Iterator[type[HttpException]]:
+    stack = [base]
+    while stack:
+        cls = stack.pop()
+        yield cls
+        stack.extend(cls.__subclasses__())
+
+
+class TypeResolver:
+    """Map problem type slugs to absolute URIs.
+
+    The map is precomputed for every HttpException subclass defined, the
+    HTTPException status codes and handler generated problems. Other slugs
+    (i.e. classes defined later, or per instance codes) are joined on first
+    use and remembered.
+    """
+
+    def __init__(self: typing.Self, config: TypeConfiguration) -> None:
+        self.base_uri = config.base_uri
+        self.max_dynamic = config.max_dynamic
+
+        slugs = [class_type(cls) for cls in exception_classes()]
+        slugs.extend(convert_status_code(status)[1] for status in http.HTTPStatus if status >= 400)  # noqa: PLR2004
+        slugs.extend(HANDLER_TYPES)
+        self._uris = {slug: self.base_uri + slug for slug in slugs}
+        self._precomputed = len(self._uris)
+
+        self._class_uris: dict[type, str] = {}
+        for key, uri in config.overrides.items():
+            if isinstance(key, str):
+                self._uris[key] = uri
+            else:
+                self._class_uris[key] = uri
+
+    def resolve(self: typing.Self, exc: HttpException) -> str:
+        """Return the URI for the type of exc, an override for its class takes precedence."""
+        uri = self._class_uris.get(type(exc))
+        return self.uri(exc.type) if uri is None else uri
+
+    def uri(self: typing.Self, slug: str) -> str:
+        uri = self._uris.get(slug)
+        if uri is None:
+            uri = self.base_uri + slug
+            if len(self._uris) < self._precomputed + self.max_dynamic:
+                self._uris[slug] = uri
+        return uri
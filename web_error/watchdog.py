@@ -0,0 +1,225 @@
+"""Capture context for errors that are slow to handle.
+
+The watchdog times each handled error and each handler stage. Errors handled
+slower than the threshold are recorded into a bounded buffer with payload
+sizes and a stack sampled by a monitor thread while the error was still being
+handled (e.g. inside a blocking log handler).
+
+The monitor thread is started by the first error handled and exits once no
+errors have been in flight for idle_timeout seconds, an idle application
+runs no watchdog thread.
+"""
+
+from __future__ import annotations
+
+import collections
+import sys
+import threading
+import time
+import traceback
+import typing
+
+from web_error.error import HttpException
+
+if typing.TYPE_CHECKING:
+    from starlette.requests import Request
+    from starlette.responses import Response
+
+    Handler = typing.Callable[[Request, Exception], Response]
+
+T = typing.TypeVar("T")
+
+
+class _Inflight:
+    __slots__ = ("start", "stages", "stack")
+
+    def __init__(self: typing.Self, start: float) -> None:
+        self.start = start
+        self.stages: dict[str, float] = {}
+        self.stack: list[str] | None = None
+
+
+def payload_sizes(exc: Exception, response: Response) -> dict[str, int | None]:
+    """Sizes that commonly make an error slow to handle, without calling str(exc)."""
+    errors = getattr(exc, "errors", None)
+    if callable(errors):
+        errors = errors()
+    elif isinstance(exc, HttpException):
+        errors = exc.extras.get("errors")
+
+    body = getattr(response, "body", None)
+    return {
+        "args": sum(len(arg) for arg in exc.args if isinstance(arg, (str, bytes))),
+        "errors": len(errors) if isinstance(errors, (list, tuple)) else None,
+        "body": len(body) if body is not None else None,
+    }
+
+
+class SlowErrorWatchdog:
+    """Record errors taking longer than threshold seconds to handle.
+
+    Args:
+    ----
+        threshold: Handling time, in seconds, above which errors are recorded.
+        capacity: Number of records retained.
+        sample_stacks: Sample the stack of slow handlers from a monitor thread.
+        max_frames: Frames kept per sampled stack.
+        idle_timeout: Seconds without errors in flight before the monitor thread exits.
+        clock: Monotonic clock used for timings.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self: typing.Self,
+        threshold: float = 0.01,
+        capacity: int = 100,
+        *,
+        sample_stacks: bool = True,
+        max_frames: int = 30,
+        idle_timeout: float = 1.0,
+        clock: typing.Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.threshold = threshold
+        self.sample_stacks = sample_stacks
+        self.max_frames = max_frames
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._records: collections.deque[dict[str, typing.Any]] = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._inflight: dict[int, _Inflight] = {}
+        self._monitor: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def stage(self: typing.Self, name: str, fn: typing.Callable[..., T]) -> typing.Callable[..., T]:
+        """Time calls to fn as a stage of the error being handled on this thread."""
+        clock = self._clock
+        inflight = self._inflight
+
+        def timed(*args: typing.Any, **kwargs: typing.Any) -> T:  # noqa: ANN401
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                entry = inflight.get(threading.get_ident())
+                if entry is not None:
+                    entry.stages[name] = entry.stages.get(name, 0.0) + clock() - start
+
+        return timed
+
+    def wrap(self: typing.Self, handler: Handler) -> Handler:
+        """Time handler, recording slow errors."""
+        clock = self._clock
+        inflight = self._inflight
+        sample_stacks = self.sample_stacks
+
+        def watched_handler(request: Request, exc: Exception) -> Response:
+            ident = threading.get_ident()
+            entry = inflight[ident] = _Inflight(clock())
+            # Checked after registering the entry, an idle monitor only exits with nothing in flight.
+            if sample_stacks and self._monitor is None:
+                self.start()
+            try:
+                response = handler(request, exc)
+            finally:
+                del inflight[ident]
+
+            duration = clock() - entry.start
+            if duration >= self.threshold:
+                self._record(entry, duration, request, exc, response)
+            return response
+
+        return watched_handler
+
+    def _record(  # noqa: PLR0913
+        self: typing.Self,
+        entry: _Inflight,
+        duration: float,
+        request: Request,
+        exc: Exception,
+        response: Response,
+    ) -> None:
+        record = {
+            "timestamp": time.time(),
+            "duration": duration,
+            "exception": f"{type(exc).__module__}.{type(exc).__qualname__}",
+            "status": getattr(response, "status_code", None),
+            "path": getattr(getattr(request, "url", None), "path", None),
+            "stages": dict(entry.stages),
+            "sizes": payload_sizes(exc, response),
+            "stack": entry.stack,
+        }
+        with self._lock:
+            self._records.append(record)
+
+    def _sample(self: typing.Self) -> None:
+        now = self._clock()
+        for ident, entry in list(self._inflight.items()):
+            if entry.stack is not None or now - entry.start < self.threshold:
+                continue
+            frame = sys._current_frames().get(ident)  # noqa: SLF001
+            if frame is not None:
+                summary = traceback.StackSummary.extract(
+                    traceback.walk_stack(frame),
+                    limit=self.max_frames,
+                    lookup_lines=False,
+                )
+                entry.stack = [f"{f.filename}:{f.lineno} in {f.name}" for f in summary]
+
+    def _run(self: typing.Self, stopped: threading.Event) -> None:
+        interval = max(self.threshold / 2, 0.001)
+        idle = 0.0
+        while not stopped.wait(interval):
+            if self._inflight:
+                idle = 0.0
+                self._sample()
+                continue
+            idle += interval
+            if idle >= self.idle_timeout and self._exit_idle():
+                return
+
+    def _exit_idle(self: typing.Self) -> bool:
+        current = threading.current_thread()
+        with self._lock:
+            if self._monitor is not current:
+                return True
+            # Cleared before checking, so a handler registering concurrently sees
+            # either an entry the monitor keeps running for, or no monitor.
+            self._monitor = None
+            if self._inflight:
+                self._monitor = current
+                return False
+            return True
+
+    def start(self: typing.Self) -> None:
+        """Start the stack sampling monitor thread, if not running.
+
+        Handlers start it when an error is handled, calling it directly is only
+        needed to sample before the first error.
+        """
+        with self._lock:
+            if self._monitor is None:
+                self._stopped = threading.Event()
+                self._monitor = threading.Thread(
+                    target=self._run,
+                    args=(self._stopped,),
+                    name="web-error-watchdog",
+                    daemon=True,
+                )
+                self._monitor.start()
+
+    def stop(self: typing.Self) -> None:
+        """Stop the monitor thread, i.e. on application shutdown, the next error handled starts it again."""
+        with self._lock:
+            monitor, self._monitor = self._monitor, None
+            stopped = self._stopped
+        if monitor is not None:
+            stopped.set()
+            monitor.join()
+
+    def dump(self: typing.Self) -> list[dict[str, typing.Any]]:
+        """Return recorded slow errors, oldest first."""
+        with self._lock:
+            return list(self._records)
+
+    def clear(self: typing.Self) -> None:
+        with self._lock:
+            self._records.clear()